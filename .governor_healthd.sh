@@ -2,6 +2,8 @@
 # ───────────────────────────────────────────────
 #  Governor AI — Health Daemon (Persistent Monitor)
 #  Keeps Flask and AI core alive even across Termux sessions
+#  (Not needed when agent_hub.py runs with HUB_SUPERVISE_GOVERNOR=1: the
+#   hub supervises governor.py itself and restarts it within a second.)
 # ───────────────────────────────────────────────
 
 APP_DIR="$HOME/governor_ai"
@@ -32,7 +34,8 @@ while true; do
   fi
 
   if command -v curl >/dev/null 2>&1; then
-    curl -s http://127.0.0.1:$PORT/health >/dev/null 2>&1
+    # -f: a non-2xx /health (e.g. 503 after a failed init) counts as a failure
+    curl -sf http://127.0.0.1:$PORT/health >/dev/null 2>&1
     if [ $? -ne 0 ]; then
       echo "[$(date)] Healthcheck failed — restarting Governor AI." >> "$LOG_DIR/healthd.log"
       restart_governor
@@ -8,67 +8,121 @@ Endpoints:
   POST /start/monitor
   POST /stop/monitor
   POST /restart/all
+  POST /start/<name>, /stop/<name>, /restart/<name>
+  GET  /metrics        (Prometheus text)
+  GET  /bus            (market bus channels: sequence, writer, latest per kind/tag)
+
+Agents are children of the hub (agents/supervisor.py): crashes are restarted
+with backoff as soon as they happen and /status comes from memory. The hub
+therefore runs as one process (threaded), never prefork.
 """
 
-import os
+import atexit
+import os, sys
+import threading
 from flask import Flask, jsonify
 from dotenv import load_dotenv
-from process_utils import start_process, stop_process, is_running, read_pid
 
 # Load .env from project root
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 load_dotenv(dotenv_path=os.path.join(PROJECT_ROOT, ".env"))
+sys.path.insert(0, PROJECT_ROOT)
+from modules.serving import serve, SERVE_MODE
+from modules import metrics
+from modules.market_bus import BusReader, channel_stats
+from supervisor import Child, Supervisor
 
 app = Flask(__name__)
+metrics.instrument_app(app, "agent_hub")
+supervisor = None
+
+RESTART_POLICY = os.getenv("HUB_RESTART_POLICY", "always")        # always | on-failure | never
+STOP_TIMEOUT = float(os.getenv("HUB_STOP_TIMEOUT", "5"))           # secs between SIGTERM and SIGKILL
+AUTOSTART = [n for n in os.getenv("HUB_AUTOSTART", "").split(",") if n]
+SUPERVISE_GOVERNOR = os.getenv("HUB_SUPERVISE_GOVERNOR", "0") == "1"  # replaces .governor_healthd.sh
+BUS_CHANNELS = [c for c in os.getenv("HUB_BUS_CHANNELS", "governor,arbitrage").split(",") if c]
+_bus_readers = {}
+_bus_lock = threading.Lock()  # readers are cursors: one request at a time
 
 # Agent names and commands
 AGENTS = {
     "arbitrage": ["python", os.path.join(PROJECT_ROOT, "agents", "arbitrage_agent.py")],
     "monitor":   ["python", os.path.join(PROJECT_ROOT, "agents", "arbitrage_monitor.py")],
 }
+if SUPERVISE_GOVERNOR:
+    AGENTS["governor"] = ["python", os.path.join(PROJECT_ROOT, "governor.py")]
+
 
-def agent_status(name: str):
-    return {
-        "running": is_running(name),
-        "pid": read_pid(name),
-    }
+def build_supervisor() -> Supervisor:
+    sup = Supervisor()
+    for name, cmd in AGENTS.items():
+        health = None
+        if name == "governor":
+            health = f"http://127.0.0.1:{os.getenv('PORT', '5050')}/health"
+        sup.add(Child(name, cmd, restart=RESTART_POLICY, stop_timeout=STOP_TIMEOUT, health_url=health))
+    return sup
+
+
+def _known(name: str):
+    if name not in AGENTS:
+        return jsonify({"error": f"unknown agent {name}"}), 404
+    return None
 
 @app.get("/status")
 def status():
-    return jsonify({
-        "arbitrage": agent_status("arbitrage"),
-        "monitor": agent_status("monitor"),
-    })
-
-@app.post("/start/arbitrage")
-def start_arbitrage():
-    pid = start_process("arbitrage", AGENTS["arbitrage"])
-    return jsonify({"started": True, "pid": pid})
-
-@app.post("/stop/arbitrage")
-def stop_arbitrage():
-    ok = stop_process("arbitrage")
-    return jsonify({"stopped": ok})
-
-@app.post("/start/monitor")
-def start_monitor():
-    pid = start_process("monitor", AGENTS["monitor"])
-    return jsonify({"started": True, "pid": pid})
-
-@app.post("/stop/monitor")
-def stop_monitor():
-    ok = stop_process("monitor")
-    return jsonify({"stopped": ok})
-
-@app.post("/restart/all")
+    return jsonify(supervisor.status())
+
+@app.post("/start/<name>")
+def start_agent(name):
+    err = _known(name)
+    if err:
+        return err
+    pid = supervisor.start(name)
+    return jsonify({"started": pid is not None, "pid": pid})
+
+@app.post("/stop/<name>")
+def stop_agent(name):
+    err = _known(name)
+    if err:
+        return err
+    return jsonify(supervisor.stop(name))
+
+@app.post("/restart/<name>")
+def restart_agent(name):
+    if name == "all":
+        return restart_all()
+    err = _known(name)
+    if err:
+        return err
+    pid = supervisor.restart(name)
+    return jsonify({"restarted": pid is not None, "pid": pid})
+
+@app.get("/bus")
+def bus_status():
+    # One cursor per channel, kept across requests, so "latest" covers everything seen
+    out = {}
+    with _bus_lock:
+        for channel in BUS_CHANNELS:
+            reader = _bus_readers.setdefault(channel, BusReader(channel, start="oldest"))
+            out[channel] = channel_stats(channel, reader)
+    return jsonify(out)
+
 def restart_all():
-    stop_process("arbitrage")
-    stop_process("monitor")
-    pid_a = start_process("arbitrage", AGENTS["arbitrage"])
-    pid_m = start_process("monitor", AGENTS["monitor"])
-    return jsonify({"restarted": True, "arbitrage_pid": pid_a, "monitor_pid": pid_m})
+    pids = {f"{name}_pid": supervisor.restart(name) for name in AGENTS}
+    return jsonify({"restarted": True, **pids})
+
+def create_app():
+    global supervisor
+    if supervisor is None:
+        supervisor = build_supervisor()
+        atexit.register(supervisor.close)
+        for name in AUTOSTART:
+            if name in AGENTS:
+                supervisor.start(name)
+    return app
 
 if __name__ == "__main__":
     # Default to 5060 so it doesn't conflict with Governor (5050)
     port = int(os.getenv("HUB_PORT", "5060"))
-    app.run(host="0.0.0.0", port=port)
+    # The supervisor must live in exactly one process
+    serve(create_app, port, mode="dev" if SERVE_MODE == "dev" else "threaded")
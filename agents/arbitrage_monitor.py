@@ -4,51 +4,53 @@ Arbitrage Monitor
 - Reads arbitrage.log produced by arbitrage_agent.py.
 - Calculates simulated P&L (profit/loss) and strategy performance.
 - Outputs real-time metrics and saves summary to monitor_report.json.
+- Follows the log incrementally (byte offset + inode), so each poll only
+  parses newly appended lines; survives rotation and truncation.
+- Fills are kept as NumPy columns and matched FIFO (modules/trade_analytics.py):
+  realized/unrealized P&L, drawdown, rolling win rate and per-hour stats.
+- ARB_MONITOR_SOURCE=bus: takes fills straight from the shared-memory market
+  bus (modules/market_bus.py) as they are published, instead of the log.
+  Only fills still in the ring when the monitor starts are replayed.
+  ARB_BUS_FILLS picks which fills are counted: sim (default, the same dry-run
+  fills the log holds), live or all; the report names it as fills_source.
 """
 
 import os
+import sys
 import json
-import re
 import time
 from datetime import datetime, timezone
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from modules.trade_analytics import Fills, analyze, fifo_match, load_fills, parse_fills  # noqa: E402
+from modules.market_bus import BusReader, FILL, FLAG_SIM  # noqa: E402
+
 LOG_PATH = os.getenv("ARB_LOG_PATH", "./logs/arbitrage.log")
 REPORT_PATH = os.getenv("ARB_REPORT_PATH", "./logs/monitor_report.json")
 POLL_INTERVAL = float(os.getenv("ARB_MONITOR_INTERVAL", "30.0"))
-
-# Regex to capture simulated trades from arbitrage_agent.py
-BUY_PATTERN = re.compile(r"\[Arb\]\[SIM\] BUY (\d+\.\d+) XRP @ (\d+\.\d+)")
-SELL_PATTERN = re.compile(r"\[Arb\]\[SIM\] SELL (\d+\.\d+) XRP @ (\d+\.\d+)")
+WIN_RATE_WINDOW = int(os.getenv("ARB_WIN_RATE_WINDOW", "100"))  # round trips
+SOURCE = os.getenv("ARB_MONITOR_SOURCE", "log")  # log | bus
+BUS_CHANNEL = os.getenv("ARB_BUS_CHANNEL", "arbitrage")
+BUS_FILLS = os.getenv("ARB_BUS_FILLS", "sim")  # sim | live | all
+REPORT_MIN_SECS = float(os.getenv("ARB_REPORT_MIN_SECS", "1.0"))  # bus mode: at most one report per this
 
 def now_iso():
     return datetime.now(timezone.utc).isoformat()
 
 def parse_trades(log_path):
-    """Parse simulated trades and compute round-trip profits."""
-    trades = []
+    """Parse simulated trades into FIFO round trips (one dict per matched lot)."""
     if not os.path.exists(log_path):
-        return trades
-    with open(log_path, "r") as f:
-        lines = f.readlines()
-    current = {}
-    for line in lines:
-        buy_match = BUY_PATTERN.search(line)
-        sell_match = SELL_PATTERN.search(line)
-        if buy_match:
-            qty, price = map(float, buy_match.groups())
-            current = {"side": "buy", "qty": qty, "price": price, "time": line[:26]}
-        elif sell_match and current:
-            qty, price = map(float, sell_match.groups())
-            pnl = (price - current["price"]) * qty
-            trades.append({
-                "buy_price": current["price"],
-                "sell_price": price,
-                "qty": qty,
-                "profit": pnl,
-                "timestamp": line[:26]
-            })
-            current = {}
-    return trades
+        return []
+    fills = load_fills(log_path)
+    m = fifo_match(fills.side, fills.qty, fills.price)
+    closes = fills.ts[[max(b, s) for b, s in zip(m["buy"], m["sell"])]] if len(m["pnl"]) else []
+    return [{
+        "buy_price": float(fills.price[b]),
+        "sell_price": float(fills.price[s]),
+        "qty": float(q),
+        "profit": float(p),
+        "timestamp": datetime.fromtimestamp(t, timezone.utc).isoformat() if t == t else None,
+    } for b, s, q, p, t in zip(m["buy"], m["sell"], m["qty"], m["pnl"], closes)]
 
 def summarize(trades):
     """Summarize total profit, average profit per trade, success rate."""
@@ -64,22 +66,146 @@ def summarize(trades):
         "last_updated": now_iso()
     }
 
+class TradeTail:
+    """
+    Incremental follower for the arbitrage log.
+    - Remembers the open file, its inode and byte offset; each poll() reads
+      only bytes appended since the last one.
+    - Rotation (path now points at a new inode): drains the old file, then
+      switches to the new one from offset 0. Truncation: restarts at 0.
+    - Appends parsed fills to NumPy columns; summary() runs the vectorized
+      FIFO analytics and is cached until new fills arrive.
+    """
+
+    def __init__(self, log_path, chunk_size=1 << 20, window=WIN_RATE_WINDOW):
+        self.log_path = log_path
+        self.chunk_size = chunk_size
+        self.window = window
+        self._fh = None
+        self._inode = None
+        self._partial = b""
+        self.fills = Fills()
+        self.bytes_read = 0
+        self._report = None
+
+    def poll(self):
+        """Parses newly appended lines; returns how many lines were read."""
+        if self._fh is None and not self._open():
+            return 0
+        n = self._drain()
+        try:
+            st = os.stat(self.log_path)
+        except FileNotFoundError:
+            return n  # rotated away, new file not created yet
+        if st.st_ino != self._inode:
+            self._close()
+            if self._open():
+                n += self._drain()
+        elif st.st_size < self._fh.tell():
+            # Truncated in place: start over from the top
+            self._fh.seek(0)
+            self._partial = b""
+            n += self._drain()
+        return n
+
+    def summary(self):
+        if self._report is None or self._report["fills"] != len(self.fills):
+            self._report = analyze(self.fills, window=self.window)
+        return self._report
+
+    def _open(self):
+        try:
+            self._fh = open(self.log_path, "rb")
+        except FileNotFoundError:
+            return False
+        self._inode = os.fstat(self._fh.fileno()).st_ino
+        self._partial = b""
+        return True
+
+    def _close(self):
+        if self._fh is not None:
+            self._fh.close()
+        self._fh = None
+
+    def _drain(self):
+        lines = 0
+        while True:
+            chunk = self._fh.read(self.chunk_size)
+            if not chunk:
+                return lines
+            self.bytes_read += len(chunk)
+            data = self._partial + chunk
+            cut = data.rfind(b"\n") + 1
+            self._partial = data[cut:]
+            lines += data.count(b"\n", 0, cut)
+            if data.find(b"[Arb][SIM]", 0, cut) != -1:
+                self.fills.extend(*parse_fills(data[:cut]))
+
+class BusTail:
+    """
+    Same interface as TradeTail, fed by FILL records from the market bus.
+    - poll() blocks up to wait_secs for the next records, so a fill is in
+      the columns as soon as it is published; nothing is parsed.
+    - Starts with whatever is still in the ring; overruns (records lost
+      because the monitor fell a whole ring behind) are reported.
+    - fills: "sim" keeps only FLAG_SIM fills, "live" only executed ones, "all" both.
+    """
+
+    def __init__(self, channel, wait_secs=POLL_INTERVAL, window=WIN_RATE_WINDOW, fills=BUS_FILLS):
+        if fills not in ("sim", "live", "all"):
+            raise ValueError(f"fills must be sim, live or all, not {fills!r}")
+        self.reader = BusReader(channel, start="oldest", max_sleep=0.05)
+        self.wait_secs = wait_secs
+        self.window = window
+        self.fills_source = fills
+        self.fills = Fills()
+        self._report = None
+
+    def poll(self):
+        """Appends newly published fills; returns how many records were read."""
+        events = self.reader.wait(self.wait_secs)
+        fills = [ev for ev in events if ev.kind == FILL and self._wanted(ev)]
+        if fills:
+            self.fills.extend([ev.ts for ev in fills], [ev.side for ev in fills],
+                              [ev.values[0] for ev in fills], [ev.values[1] for ev in fills])
+        return len(events)
+
+    def _wanted(self, ev):
+        if self.fills_source == "all":
+            return True
+        return bool(ev.flags & FLAG_SIM) == (self.fills_source == "sim")
+
+    def summary(self):
+        if self._report is None or self._report["fills"] != len(self.fills):
+            self._report = analyze(self.fills, window=self.window)
+            self._report["fills_source"] = self.fills_source
+            self._report["bus_overruns"] = self.reader.overruns
+        return self._report
+
 def monitor_loop():
-    print(f"[Monitor] Watching {LOG_PATH} ...")
+    if SOURCE == "bus":
+        print(f"[Monitor] Following market bus channel '{BUS_CHANNEL}' ({BUS_FILLS} fills) ...")
+        tail = BusTail(BUS_CHANNEL)
+    else:
+        print(f"[Monitor] Watching {LOG_PATH} ...")
+        tail = TradeTail(LOG_PATH)
     last_report = {}
     while True:
         try:
-            trades = parse_trades(LOG_PATH)
-            summary = summarize(trades)
-            if summary != last_report:
-                with open(REPORT_PATH, "w") as f:
+            tail.poll()
+            summary = tail.summary()
+            if summary is not last_report:
+                tmp = REPORT_PATH + ".tmp"
+                with open(tmp, "w") as f:
                     json.dump(summary, f, indent=2)
+                os.replace(tmp, REPORT_PATH)
                 print(f"[Monitor] {now_iso()} | Trades={summary['total_trades']} "
-                      f"Profit={summary['total_profit']:.6f} XRP | WinRate={summary['win_rate']:.1f}%")
+                      f"Profit={summary['total_profit']:.6f} | Unrealized={summary.get('unrealized_pnl', 0.0):.6f} "
+                      f"| MaxDD={summary.get('max_drawdown', 0.0):.6f} | WinRate={summary['win_rate']:.1f}%")
                 last_report = summary
         except Exception as e:
             print(f"[Monitor] Error: {e}")
-        time.sleep(POLL_INTERVAL)
+        time.sleep(REPORT_MIN_SECS if SOURCE == "bus" else POLL_INTERVAL)
 
 if __name__ == "__main__":
     monitor_loop()
@@ -1,34 +1,130 @@
-from flask import Flask, request, jsonify
-from xrpl.clients import JsonRpcClient
+from flask import Flask, Response, request, jsonify
 from xrpl.models.requests import AccountInfo, AccountTx
-import os, json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import os, sys, json, time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+from modules.ledger_cache import get_cached_client
+from modules.rpc_pool import get_client
+from modules.serving import serve
+from modules.tx_export import iter_pages, ndjson_line
 
 app = Flask(__name__)
 
 XRPL_RPC_URL = os.getenv("XRPL_RPC_URL", "https://s.altnet.rippletest.net:51234")
-client = JsonRpcClient(XRPL_RPC_URL)
+client = None
+
+# Shared pool: bounds upstream parallelism across all batch requests (per worker)
+BATCH_WORKERS = int(os.getenv("AUDITOR_BATCH_WORKERS", "8"))
+BATCH_MAX_ADDRESSES = int(os.getenv("AUDITOR_BATCH_MAX", "1000"))
+BATCH_MAX_TX_LIMIT = 100  # per-address AccountTx rows in a batch snapshot
+batch_pool = None
+
+def create_app():
+    # Per worker process: pools and stream threads must not cross a fork
+    global client, batch_pool
+    client = get_cached_client(XRPL_RPC_URL)
+    batch_pool = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix="snapshot")
+    return app
+
+def account_snapshot(address, tx_limit=5):
+    # Account info
+    info = client.request(AccountInfo(account=address, ledger_index="validated"))
+    balance = info.result["account_data"]["Balance"]
+
+    # Last few transactions
+    txs = client.request(AccountTx(account=address, limit=tx_limit))
+    return {
+        "status": "ok",
+        "balance_drops": balance,
+        "recent_txs": txs.result.get("transactions", [])
+    }
+
+def _timed_snapshot(address, tx_limit):
+    t0 = time.perf_counter()
+    try:
+        row = {"address": address, **account_snapshot(address, tx_limit)}
+    except Exception as e:
+        row = {"address": address, "error": str(e)}
+    row["elapsed_ms"] = round((time.perf_counter() - t0) * 1000.0, 2)
+    return row
 
 @app.route("/")
 def home():
     return jsonify({"status": "Auditor Agent online ✅"})
 
+@app.route("/health")
+def health():
+    return jsonify({"status": "ok"})
+
+@app.route("/cache")
+def cache_stats():
+    return jsonify(client.stats())
+
 @app.route("/snapshot/<address>")
 def snapshot(address):
     try:
-        # Account info
-        info = client.request(AccountInfo(account=address, ledger_index="validated"))
-        balance = info.result["account_data"]["Balance"]
-
-        # Last few transactions
-        txs = client.request(AccountTx(account=address, limit=5))
-        return jsonify({
-            "status": "ok",
-            "balance_drops": balance,
-            "recent_txs": txs.result.get("transactions", [])
-        })
+        return jsonify(account_snapshot(address))
     except Exception as e:
         return jsonify({"error": str(e)})
 
+@app.route("/snapshot/batch", methods=["POST"])
+def snapshot_batch():
+    """
+    Body: {"addresses": [...], "tx_limit": 5} (or a bare JSON list).
+    Streams one NDJSON line per address, in completion order.
+    """
+    body = request.get_json(silent=True)
+    if isinstance(body, list):
+        body = {"addresses": body}
+    if not isinstance(body, dict):
+        return jsonify({"error": "expected a JSON object or list"}), 400
+    addresses = body.get("addresses")
+    if not isinstance(addresses, list) or not addresses or not all(isinstance(a, str) for a in addresses):
+        return jsonify({"error": "expected a non-empty 'addresses' list of strings"}), 400
+    if len(addresses) > BATCH_MAX_ADDRESSES:
+        return jsonify({"error": f"too many addresses (max {BATCH_MAX_ADDRESSES})"}), 400
+    tx_limit = body.get("tx_limit", 5)
+    if type(tx_limit) is not int or not 1 <= tx_limit <= BATCH_MAX_TX_LIMIT:
+        return jsonify({"error": f"'tx_limit' must be an integer from 1 to {BATCH_MAX_TX_LIMIT}"}), 400
+
+    def generate():
+        futures = [batch_pool.submit(_timed_snapshot, addr, tx_limit) for addr in dict.fromkeys(addresses)]
+        try:
+            for fut in as_completed(futures):
+                yield json.dumps(fut.result()) + "\n"
+        finally:
+            # Client went away: drop lookups that have not started yet
+            for fut in futures:
+                fut.cancel()
+
+    return Response(generate(), mimetype="application/x-ndjson")
+
+@app.route("/export/<address>")
+def export_history(address):
+    """
+    Streams the full AccountTx history as NDJSON, oldest first.
+    After each page a {"marker": ...} line is emitted; pass it back as
+    ?marker=<json> to resume an interrupted export.
+    ?page_size is clamped to 1..400 (default 200).
+    """
+    try:
+        marker = json.loads(request.args["marker"]) if request.args.get("marker") else None
+        page_size = max(1, min(int(request.args.get("page_size", 200)), 400))
+    except ValueError as e:
+        return jsonify({"error": f"bad query: {e}"}), 400
+
+    def generate():
+        try:
+            for txs, next_marker in iter_pages(get_client(XRPL_RPC_URL), address, marker=marker, page_size=page_size):
+                yield "".join(ndjson_line(t) for t in txs)
+                yield ndjson_line({"marker": next_marker})
+        except Exception as e:
+            yield ndjson_line({"error": str(e)})
+
+    return Response(generate(), mimetype="application/x-ndjson")
+
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5002)
+    serve(create_app, int(os.getenv("AUDITOR_PORT", "5002")))
 
@@ -2,6 +2,7 @@
 import os
 import signal
 import subprocess
+import time
 from typing import Optional
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -80,11 +81,7 @@ def stop_process(name: str, graceful_secs: int = 5) -> bool:
         if not is_running(name):
             remove_pid(name)
             return True
-        try:
-            os.kill(pid, 0)
-        except Exception:
-            remove_pid(name)
-            return True
+        time.sleep(0.1)
 
     # force kill
     try:
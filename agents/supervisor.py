@@ -0,0 +1,316 @@
+# ~/governor_ai/agents/supervisor.py
+"""
+In-process supervisor for the hub's agents.
+- The hub owns its children (Popen, own session); exits are seen the moment
+  they happen via pidfd (Linux >= 5.3) or SIGCHLD, with a 1s poll as backstop.
+- Restart policy per agent: "always", "on-failure" or "never", with
+  exponential backoff that resets once a child stays up for stable_secs.
+- stop(): SIGTERM to the process group, SIGKILL after stop_timeout; the
+  time it took and whether it had to be killed are recorded.
+- Optional health_url: a child that fails health_failures checks in a row
+  is restarted (covers hung processes, not just dead ones).
+- status() is in-memory; PID files in run/ are still written for scripts.
+"""
+
+import os
+import selectors
+import signal
+import subprocess
+import threading
+import time
+import urllib.request
+from typing import Optional, Dict, Any, List
+
+from process_utils import BASE_DIR, _log_paths, read_pid, remove_pid, write_pid
+
+POLICIES = ("always", "on-failure", "never")
+
+
+class Child:
+    def __init__(self, name: str, cmd: List[str], env: Optional[Dict[str, str]] = None,
+                 restart: str = "always", backoff_base: float = 0.5, backoff_max: float = 30.0,
+                 stable_secs: float = 10.0, stop_timeout: float = 5.0,
+                 health_url: Optional[str] = None, health_interval: float = 15.0, health_failures: int = 3):
+        if restart not in POLICIES:
+            raise ValueError(f"restart must be one of {', '.join(POLICIES)}")
+        self.name = name
+        self.cmd = cmd
+        self.env = env
+        self.restart = restart
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stable_secs = stable_secs
+        self.stop_timeout = stop_timeout
+        self.health_url = health_url
+        self.health_interval = health_interval
+        self.health_failures = health_failures
+
+        self.proc: Optional[subprocess.Popen] = None
+        self.pidfd: Optional[int] = None
+        self.state = "stopped"  # stopped | running | backoff | stopping | failed
+        self.wanted = False
+        self.started_at: Optional[float] = None
+        self.restarts = 0
+        self.backoff = 0.0
+        self.restart_at: Optional[float] = None
+        self.exited = threading.Event()
+        self.last_exit: Optional[Dict[str, Any]] = None
+        self.last_stop: Optional[Dict[str, Any]] = None
+        self.last_restart_ms: Optional[float] = None
+        self.died_at: Optional[float] = None
+        self.health_misses = 0
+        self.next_health = 0.0
+
+    def status(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "running": self.state == "running",
+            "state": self.state,
+            "pid": self.proc.pid if self.proc is not None and self.state in ("running", "stopping") else None,
+            "uptime_secs": round(now - self.started_at, 1) if self.started_at and self.state == "running" else None,
+            "restarts": self.restarts,
+            "policy": self.restart,
+            "next_restart_in": round(max(0.0, self.restart_at - time.monotonic()), 2) if self.restart_at else None,
+            "last_exit": self.last_exit,
+            "last_stop": self.last_stop,
+            "last_restart_ms": self.last_restart_ms,
+            "health_misses": self.health_misses if self.health_url else None,
+        }
+
+
+class Supervisor:
+    """
+    Owns child processes and keeps them in their wanted state.
+    One reaper thread waits on every child's pidfd plus a wake pipe; a
+    restart is scheduled on the same thread when its backoff expires.
+    """
+
+    def __init__(self, poll_secs: float = 1.0):
+        self.children: Dict[str, Child] = {}
+        self.poll_secs = poll_secs
+        self._lock = threading.RLock()
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+        self._stopped = False
+        self._use_pidfd = hasattr(os, "pidfd_open")
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGCHLD, lambda *_: self._wake())
+        self._thread = threading.Thread(target=self._run, name="supervisor", daemon=True)
+        self._thread.start()
+
+    # ---- Public API ---------------------------------------------------------
+
+    def add(self, child: Child) -> Child:
+        with self._lock:
+            self.children[child.name] = child
+        return child
+
+    def start(self, name: str) -> Optional[int]:
+        with self._lock:
+            child = self.children[name]
+            child.wanted = True
+            if child.state in ("running", "stopping"):
+                return child.proc.pid
+            child.backoff = 0.0
+            child.restart_at = None
+            self._spawn(child)
+            return child.proc.pid if child.state == "running" else None
+
+    def stop(self, name: str) -> Dict[str, Any]:
+        """
+        SIGTERM, then SIGKILL after stop_timeout. Blocks until the child is reaped.
+        """
+        with self._lock:
+            child = self.children[name]
+            child.wanted = False
+            child.restart_at = None
+            proc = child.proc
+            if proc is None or child.state not in ("running", "stopping"):
+                child.state = "stopped"
+                return {"stopped": False, "reason": "not running"}
+            child.state = "stopping"
+        t0 = time.monotonic()
+        self._signal(proc, signal.SIGTERM)
+        killed = not child.exited.wait(child.stop_timeout)
+        if killed:
+            self._signal(proc, signal.SIGKILL)
+            child.exited.wait(5.0)
+        child.last_stop = {"graceful": not killed, "stop_ms": round((time.monotonic() - t0) * 1000.0, 1),
+                           "at": time.time()}
+        return {"stopped": True, **child.last_stop}
+
+    def restart(self, name: str) -> Optional[int]:
+        self.stop(name)
+        return self.start(name)
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {name: child.status() for name, child in self.children.items()}
+
+    def close(self):
+        for name in list(self.children):
+            self.stop(name)
+        self._stopped = True
+        self._wake()
+
+    # ---- Internals ----------------------------------------------------------
+
+    def _spawn(self, child: Child):
+        self._adopt_orphan(child)
+        stdout_path, stderr_path = _log_paths(child.name)
+        try:
+            with open(stdout_path, "a") as out, open(stderr_path, "a") as err:
+                child.proc = subprocess.Popen(child.cmd, cwd=BASE_DIR, stdout=out, stderr=err,
+                                              stdin=subprocess.DEVNULL, env=child.env or os.environ.copy(),
+                                              start_new_session=True)
+        except OSError as e:
+            print(f"[Supervisor] {child.name} failed to start: {e}")
+            child.last_exit = {"error": str(e), "at": time.time()}
+            self._schedule_restart(child)
+            return
+        child.exited.clear()
+        child.state = "running"
+        child.started_at = time.time()
+        child.health_misses = 0
+        child.next_health = time.monotonic() + child.health_interval
+        write_pid(child.name, child.proc.pid)
+        if self._use_pidfd:
+            try:
+                child.pidfd = os.pidfd_open(child.proc.pid)
+                self._selector.register(child.pidfd, selectors.EVENT_READ, child.name)
+            except OSError:
+                self._use_pidfd = False  # e.g. blocked by seccomp; SIGCHLD + polling
+                child.pidfd = None
+        self._wake()
+        print(f"[Supervisor] {child.name} started (pid {child.proc.pid})")
+
+    def _adopt_orphan(self, child: Child):
+        # A previous hub's child still running from its PID file: stop it, or we'd run two
+        pid = read_pid(child.name)
+        if not pid or (child.proc is not None and pid == child.proc.pid):
+            return
+        try:
+            with open(f"/proc/{pid}/cmdline", "rb") as f:
+                cmdline = f.read().split(b"\0")
+        except OSError:
+            remove_pid(child.name)
+            return
+        if child.cmd[-1].encode() in cmdline:
+            print(f"[Supervisor] Stopping orphaned {child.name} (pid {pid}) from a previous hub")
+            try:
+                os.killpg(pid, signal.SIGTERM)
+            except OSError:
+                pass
+        remove_pid(child.name)
+
+    def _signal(self, proc: subprocess.Popen, sig: int):
+        try:
+            os.killpg(proc.pid, sig)
+        except OSError:
+            pass
+
+    def _wake(self):
+        try:
+            os.write(self._wake_w, b"x")
+        except (BlockingIOError, OSError):
+            pass
+
+    def _run(self):
+        while not self._stopped:
+            timeout = self._next_timeout()
+            for key, _ in self._selector.select(timeout):
+                if key.fd == self._wake_r:
+                    try:
+                        while os.read(self._wake_r, 4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+            with self._lock:
+                self._reap()
+                self._due_restarts()
+            self._check_health()
+
+    def _next_timeout(self) -> float:
+        now = time.monotonic()
+        timeout = self.poll_secs
+        with self._lock:
+            for child in self.children.values():
+                if child.restart_at is not None:
+                    timeout = min(timeout, child.restart_at - now)
+                if child.health_url and child.state == "running":
+                    timeout = min(timeout, child.next_health - now)
+        return max(0.0, timeout)
+
+    def _reap(self):
+        for child in self.children.values():
+            if child.proc is None or child.state not in ("running", "stopping"):
+                continue
+            code = child.proc.poll()  # waitpid(pid, WNOHANG)
+            if code is None:
+                continue
+            if child.pidfd is not None:
+                self._selector.unregister(child.pidfd)
+                os.close(child.pidfd)
+                child.pidfd = None
+            remove_pid(child.name)
+            died_at = time.monotonic()
+            child.last_exit = {
+                "code": code if code >= 0 else None,
+                "signal": signal.Signals(-code).name if code < 0 else None,
+                "uptime_secs": round(time.time() - child.started_at, 1),
+                "at": time.time(),
+            }
+            stopping = child.state == "stopping"
+            child.state = "stopped"
+            child.exited.set()
+            if stopping or not child.wanted:
+                continue
+            print(f"[Supervisor] {child.name} (pid {child.proc.pid}) exited: {child.last_exit}")
+            if child.restart == "never" or (child.restart == "on-failure" and code == 0):
+                child.wanted = False
+                continue
+            self._schedule_restart(child, died_at=died_at)
+
+    def _schedule_restart(self, child: Child, died_at: Optional[float] = None):
+        lived = time.time() - child.started_at if child.started_at else 0.0
+        if lived >= child.stable_secs:
+            child.backoff = 0.0  # was healthy for a while: restart right away
+        delay = child.backoff   # 0, then backoff_base doubling up to backoff_max
+        child.backoff = min(child.backoff_max, max(child.backoff_base, child.backoff * 2))
+        child.state = "backoff"
+        child.restart_at = time.monotonic() + delay
+        child.died_at = died_at if died_at is not None else time.monotonic()
+
+    def _due_restarts(self):
+        now = time.monotonic()
+        for child in self.children.values():
+            if child.restart_at is None or child.restart_at > now or not child.wanted:
+                continue
+            child.restart_at = None
+            child.restarts += 1
+            self._spawn(child)
+            if child.state == "running":
+                child.last_restart_ms = round((time.monotonic() - child.died_at) * 1000.0, 1)
+
+    def _check_health(self):
+        now = time.monotonic()
+        for child in list(self.children.values()):
+            if not child.health_url or child.state != "running" or now < child.next_health:
+                continue
+            child.next_health = now + child.health_interval
+            if time.time() - child.started_at < child.health_interval:
+                continue  # still booting
+            try:
+                with urllib.request.urlopen(child.health_url, timeout=5) as resp:
+                    ok = resp.status == 200
+            except Exception:
+                ok = False
+            child.health_misses = 0 if ok else child.health_misses + 1
+            if child.health_misses >= child.health_failures:
+                print(f"[Supervisor] {child.name} failed {child.health_misses} health checks; restarting")
+                child.health_misses = 0
+                child.restarts += 1
+                threading.Thread(target=self.restart, args=(child.name,), daemon=True).start()
@@ -1,5 +1,8 @@
 from flask import Flask, jsonify
-import os
+import os, sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from modules.serving import serve
 
 app = Flask(__name__)
 
@@ -11,6 +14,9 @@ def home():
 def health():
     return jsonify({"status": "healthy"})
 
+def create_app():
+    return app
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
-    app.run(host="0.0.0.0", port=port)
+    serve(create_app, port)
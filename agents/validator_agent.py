@@ -1,17 +1,35 @@
 from flask import Flask, jsonify
-from xrpl.clients import JsonRpcClient
 from xrpl.models.requests import Ledger, AccountInfo
-import os, json
+import os, sys, json
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+from modules.ledger_cache import get_cached_client
+from modules.serving import serve
 
 app = Flask(__name__)
 
 XRPL_RPC_URL = os.getenv("XRPL_RPC_URL", "https://s.altnet.rippletest.net:51234")
-client = JsonRpcClient(XRPL_RPC_URL)
+client = None
+
+def create_app():
+    # Per worker process: the client pool and ledger stream thread must not cross a fork
+    global client
+    client = get_cached_client(XRPL_RPC_URL)
+    return app
 
 @app.route("/")
 def home():
     return jsonify({"status": "Validator Agent online ✅"})
 
+@app.route("/health")
+def health():
+    return jsonify({"status": "ok"})
+
+@app.route("/cache")
+def cache_stats():
+    return jsonify(client.stats())
+
 @app.route("/ledger")
 def ledger_status():
     try:
@@ -29,4 +47,4 @@ def account_info(address):
         return jsonify({"error": str(e)})
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5001)
+    serve(create_app, int(os.getenv("VALIDATOR_PORT", "5001")))
@@ -1,39 +1,81 @@
 # ~/governor_ai/governor.py
 import os
 import time
-import threading
 from datetime import datetime, timezone
-from flask import Flask, jsonify
-from dotenv import load_dotenv
+
+from modules import startup  # first, so it clocks everything after it (GET /startup)
 
 import json
-import urllib.request
+from flask import Flask, jsonify
+from dotenv import load_dotenv
 
 # Load .env early
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), ".env"))
 
-from modules.wallet import WalletService
-from modules.receipts import ReceiptHandler
-from modules.intel import AIStrategy
+from modules import metrics
+# xrpl-py (via modules.wallet / receipts / intel / scheduler) is imported in
+# initialize_governor(), off the serving path, so /health answers first.
 # If you're already using arbitrage, re-enable these two lines later
 # from modules.arbitrage import ArbitrageEngine
 
 app = Flask(__name__)
+metrics.instrument_app(app, "governor")  # GET /metrics
+startup.mark("imports")
 
 wallet = None
 receipts = None
 ai_strategy = None
+scheduler = None
+init_error = None
+background_error = None  # set if the background loop dies; /health then fails
+bus = None
+cycles = 0
 # arb = None
 
+# Comma-separated list = route each RPC to the fastest healthy node (modules/node_router.py)
 XRPL_RPC_URL = os.getenv("XRPL_RPC_URL", "https://s.altnet.rippletest.net:51234")
 TRADER_SEED = os.getenv("TRADER_SEED")
 XRPL_NETWORK = os.getenv("XRPL_NETWORK", "testnet")
 AUTO_FAUCET = os.getenv("AUTO_FAUCET", "0") == "1"
+FAUCET_WAIT_SECS = float(os.getenv("FAUCET_WAIT_SECS", "30"))  # max wait for faucet funds to validate
+MARKET_BUS = os.getenv("MARKET_BUS", "0") == "1"  # heartbeats (and arb data) on the shared-memory bus
+CYCLE_MIN_INTERVAL = float(os.getenv("CYCLE_MIN_INTERVAL", "1.0"))   # secs between cycles, at most
+CYCLE_MAX_STALENESS = float(os.getenv("CYCLE_MAX_STALENESS", "10"))  # secs without events before a cycle runs anyway
+LEDGER_POLL_SECS = float(os.getenv("LEDGER_POLL_SECS", "3.5"))  # no XRPL_WS_URL: validated-ledger poll period
 
 
 @app.route("/health", methods=["GET"])
 def health():
-    return jsonify({"status": "ok", "time": datetime.now(timezone.utc).isoformat()}), 200
+    # Liveness: answers while the wallet is still initializing; "ready" tells them apart
+    # (governor.py always serves threaded, so wallet/init_error are this process's own)
+    startup.mark("first_health")
+    error = f"initialization failed: {init_error}" if init_error else background_error
+    if error:
+        # Serving but doing nothing: fail the check so a supervisor restarts us
+        return jsonify({
+            "status": "error",
+            "ready": False,
+            "error": error,
+            "time": datetime.now(timezone.utc).isoformat(),
+        }), 503
+    return jsonify({
+        "status": "ok",
+        "ready": wallet is not None,
+        "error": None,
+        "time": datetime.now(timezone.utc).isoformat(),
+    }), 200
+
+
+@app.route("/startup", methods=["GET"])
+def startup_report():
+    return jsonify(startup.report()), 200
+
+
+@app.route("/scheduler", methods=["GET"])
+def scheduler_stats():
+    if scheduler is None:
+        return jsonify({"error": "scheduler not running"}), 503
+    return jsonify(scheduler.stats()), 200
 
 
 def fund_testnet_if_needed(address: str):
@@ -44,6 +86,8 @@ def fund_testnet_if_needed(address: str):
     if XRPL_NETWORK != "testnet" or not AUTO_FAUCET:
         return
 
+    import urllib.request
+
     try:
         url = "https://faucet.altnet.rippletest.net/accounts"
         body = json.dumps({"destination": address}).encode()
@@ -55,29 +99,62 @@ def fund_testnet_if_needed(address: str):
         print(f"[Governor AI] Testnet faucet request failed: {e}")
 
 
+def wait_for_balance(wallet_service, timeout: float = FAUCET_WAIT_SECS, interval: float = 0.5):
+    """
+    Polls until the balance is positive or timeout passes; returns the last value.
+    get_balance() is cached per validated ledger, so polls between closes are free.
+    """
+    deadline = time.monotonic() + timeout
+    bal = wallet_service.get_balance()
+    while not bal and time.monotonic() < deadline:
+        time.sleep(interval)
+        bal = wallet_service.get_balance()
+    return bal
+
+
 def initialize_governor():
-    global wallet, receipts, ai_strategy
+    global wallet, receipts, ai_strategy, bus
     print("[Governor AI] Initializing core modules...")
 
     if not TRADER_SEED:
         raise RuntimeError("TRADER_SEED missing in .env file.")
 
-    wallet = WalletService(xrpl_url=XRPL_RPC_URL, seed=TRADER_SEED)
-    receipts = ReceiptHandler(log_path="./logs/receipts.log")
-    ai_strategy = AIStrategy(state_path="./.state")
+    with startup.phase("import_core"):
+        WalletService = startup.timed_import("modules.wallet").WalletService
+        ReceiptHandler = startup.timed_import("modules.receipts").ReceiptHandler
+        AIStrategy = startup.timed_import("modules.intel").AIStrategy
+
+    with startup.phase("wallet"):
+        wallet_service = WalletService(xrpl_url=XRPL_RPC_URL, seed=TRADER_SEED)
+    with startup.phase("receipts"):
+        receipts = ReceiptHandler(
+            log_path="./logs/receipts.log",
+            fsync=os.getenv("RECEIPTS_FSYNC", "batch"),  # never | batch | always
+            max_bytes=int(os.getenv("RECEIPTS_MAX_MB", "50")) * 1024 * 1024,
+            rotate_secs=float(os.getenv("RECEIPTS_ROTATE_SECS", "0")),
+            store_dir="./logs/receipts.d",  # typed records: python -m modules.receipt_store
+        )
+    with startup.phase("strategy"):
+        ai_strategy = AIStrategy(state_path="./.state")
 
-    # Auto-fund if needed (testnet only)
-    bal = wallet.get_balance()
-    if (bal is None or bal == 0.0) and XRPL_NETWORK == "testnet" and AUTO_FAUCET:
-        print(f"[Governor AI] No balance detected. Attempting testnet funding for {wallet.address}...")
-        fund_testnet_if_needed(wallet.address)
-        # Give the network a moment, then re-check
-        time.sleep(3)
-        bal = wallet.get_balance()
-        print(f"[Governor AI] Post-faucet balance: {bal}")
+    # Auto-fund if needed (testnet only); the balance is only fetched here when it matters
+    if XRPL_NETWORK == "testnet" and AUTO_FAUCET:
+        with startup.phase("faucet"):
+            bal = wallet_service.get_balance()
+            if bal is None or bal == 0.0:
+                print(f"[Governor AI] No balance detected. Attempting testnet funding for {wallet_service.address}...")
+                fund_testnet_if_needed(wallet_service.address)
+                bal = wait_for_balance(wallet_service)
+                print(f"[Governor AI] Post-faucet balance: {bal}")
 
+    if MARKET_BUS:
+        from modules.market_bus import get_writer
+        bus = get_writer("governor")  # python -m modules.market_bus governor
+
+    wallet = wallet_service  # /health reports ready from here on
+    t = startup.mark("initialized")
     print(f"[Governor AI] Wallet loaded: {wallet.address}")
-    print("[Governor AI] Initialization complete.")
+    print(f"[Governor AI] Initialization complete ({t:.2f}s after process start).")
 
     # (Optional) Enable arbitrage later when you have a live IOU with liquidity
     # global arb
@@ -88,35 +165,118 @@ def initialize_governor():
     #     min_spread_bps=int(os.getenv("ARB_MIN_SPREAD_BPS", "30")),
     #     max_slippage_bps=int(os.getenv("ARB_MAX_SLIPPAGE_BPS", "20")),
     #     dry_run=os.getenv("ARB_DRY_RUN", "1") == "1",
+    #     stream_url=os.getenv("XRPL_WS_URL"),  # e.g. wss://s.altnet.rippletest.net:51233
+    #     record_path=os.getenv("ARB_RECORD_PATH"),  # replay with python -m modules.backtest
+    #     bus_channel="arbitrage" if MARKET_BUS else None,  # top of book + fills for other processes
     # )
     # print(f"[Governor AI] Arbitrage engine ready (DRY_RUN={arb.dry_run})")
+    #
+    # Or watch many pairs at once (ARB_PAIRS="USD:rIssuerA,EUR:rIssuerB"):
+    # from modules.scanner import MultiPairScanner, parse_pairs, parse_cross_pairs
+    # arb = MultiPairScanner(
+    #     XRPL_RPC_URL,
+    #     parse_pairs(os.getenv("ARB_PAIRS")),
+    #     max_concurrency=int(os.getenv("ARB_SCAN_CONCURRENCY", "8")),
+    #     cross_pairs=parse_cross_pairs(os.getenv("ARB_CROSS_PAIRS")),  # "USD:rA/EUR:rB"
+    #     dry_run=os.getenv("ARB_DRY_RUN", "1") == "1",
+    #     bus_channel="arbitrage" if MARKET_BUS else None,
+    # )
 
 
-def ai_background_loop():
-    while True:
-        try:
-            now = datetime.now(timezone.utc).isoformat()
-            print(f"[Governor AI] Running background loop at {now}")
+_last_wallet_ledger = None
+
+
+def has_news(reasons):
+    """
+    A bare ledger close only matters if it touched the wallet; book changes,
+    startup and the staleness fallback always run.
+    """
+    global _last_wallet_ledger
+    if reasons != {"ledger"}:
+        return True
+    changed = wallet.last_changed_ledger()
+    if changed is not None and changed == _last_wallet_ledger:
+        return False
+    _last_wallet_ledger = changed
+    return True
+
+
+def run_cycle(reasons):
+    global cycles
+    try:
+        now = datetime.now(timezone.utc).isoformat()
+        print(f"[Governor AI] Running background cycle at {now} ({', '.join(sorted(reasons))})")
+        with metrics.timer("governor_stage_seconds", "Background cycle stages", stage="strategy"):
             ai_strategy.run_strategy(wallet, receipts)
 
-            # If arbitrage wired and you have a liquid pair:
-            # ref_price = None
-            # arb.cycle(wallet, receipts, ref_price_xrp_in_quote=ref_price)
+        # If arbitrage wired and you have a liquid pair:
+        # ref_price = None
+        # with metrics.timer("governor_stage_seconds", stage="arbitrage"):
+        #     arb.cycle(wallet, receipts, ref_price_xrp_in_quote=ref_price)
+
+    except Exception as e:
+        receipts.log(f"[Governor AI] Error in background loop: {e}")
+    cycles += 1
+    if bus is not None:
+        bus.heartbeat("governor", cycles, startup.elapsed())
+
+
+def ai_background_loop():
+    """
+    Event-driven: cycles on validated ledger closes (XRPL_WS_URL ledger stream)
+    and, once arbitrage is wired, on book changes; falls back to one cycle every
+    CYCLE_MAX_STALENESS secs when no events arrive.
+    Without XRPL_WS_URL, ledger closes come from a poll every LEDGER_POLL_SECS
+    on its own thread (not from the cycle's own lookups, which would make
+    every cycle trigger the next one).
+    """
+    global scheduler
+    from modules.scheduler import EventScheduler
+
+    scheduler = EventScheduler(run_cycle, min_interval=CYCLE_MIN_INTERVAL,
+                               max_staleness=CYCLE_MAX_STALENESS, should_run=has_news)
+    tracker = wallet.cache.tracker
+    tracker.add_listener(lambda ledger_index: scheduler.trigger("ledger"))
+    tracker.start_polling(LEDGER_POLL_SECS)  # no-op with a ledger stream
+    # if arb is not None and arb.stream is not None:
+    #     arb.stream.on_update = lambda kind: scheduler.trigger("book")
+    scheduler.trigger("start")
+    scheduler.run()
 
-        except Exception as e:
-            receipts.log(f"[Governor AI] Error in background loop: {e}")
-        time.sleep(10)
+
+def create_app():
+    startup.mark("app_created")
+    return app
+
+
+def run_background():
+    """
+    Wallet init + event loop, on a thread next to the server (threaded mode).
+    """
+    global init_error, background_error
+    try:
+        initialize_governor()
+    except Exception as e:
+        init_error = str(e)
+        raise
+    try:
+        ai_background_loop()
+    except Exception as e:
+        background_error = f"background loop stopped: {e}"
+        raise
 
 
 if __name__ == "__main__":
-    # Ensure state/log folders exist
+    from modules.serving import serve, SERVE_MODE
+
+    # Ensure log folder exists (state lives in ./.state.db by default, see modules/state_store.py)
     os.makedirs("./logs", exist_ok=True)
-    if not os.path.exists("./.state"):
-        with open("./.state", "w") as f:
-            f.write("{}")
-
-    initialize_governor()
-    t = threading.Thread(target=ai_background_loop, daemon=True)
-    t.start()
-    print("[Governor AI] Flask server starting on port 5050...")
-    app.run(host="0.0.0.0", port=int(os.getenv("PORT", "5050")))
+
+    port = int(os.getenv("PORT", "5050"))
+    print(f"[Governor AI] Flask server starting on port {port}...")
+    # Always one process: the wallet, scheduler and background metrics live in
+    # this process's globals, which prefork workers would never see
+    mode = "dev" if SERVE_MODE == "dev" else "threaded"
+    if SERVE_MODE == "prefork":
+        print("[Governor AI] SERVE_MODE=prefork is not supported for governor.py; serving threaded")
+    serve(create_app, port, background=run_background, mode=mode)
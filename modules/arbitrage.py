@@ -1,24 +1,34 @@
 # ~/governor_ai/modules/arbitrage.py
 import os
+import time
 from datetime import datetime, timezone
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple
 
-from xrpl.clients import JsonRpcClient
+from xrpl.models.currencies import XRP, IssuedCurrency
 from xrpl.models.requests import BookOffers
 from xrpl.models.transactions import OfferCreate
-from xrpl.transaction import submit_and_wait
-from xrpl.utils import xrp_to_drops
+from xrpl.utils import get_balance_changes, xrp_to_drops
 
-# Helper: Issued Currency object for JSON-RPC
-def _ic(currency: str, issuer: str) -> Dict[str, str]:
-    return {"currency": currency, "issuer": issuer}
+from modules import metrics
+from modules.book_stream import BookStream
+from modules.order_pipeline import OrderPipeline, OrderTicket
+from modules.orderbook import OrderBook, BookSide
+from modules.rpc_pool import get_client
 
 class ArbitrageEngine:
     """
     Minimal XRPL DEX arbitrage skeleton.
     - DRY_RUN by default (no real orders).
     - Fetches best bid/ask from the XRPL book (XRP vs Issued Currency).
-    - If external/reference price indicates edge, prepares (or places) an offer.
+    - If external/reference price indicates edge, prepares (or places) an offer,
+      sized against book depth so the fill stays within max_slippage_bps.
+    - With stream_url set, keeps a websocket-fed local book and only polls
+      BookOffers while the stream is down.
+    - Live offers go through an OrderPipeline: the cycle returns as soon as the
+      offer is queued, and validation is recorded when the tracker sees it.
+    - record_path: append each priced snapshot for modules/backtest.py.
+    - bus_channel: publish top of book and fills to a shared-memory ring
+      (modules/market_bus.py) for other processes.
     """
 
     def __init__(self,
@@ -28,14 +38,41 @@ class ArbitrageEngine:
                  quote_issuer: Optional[str] = None,
                  min_spread_bps: int = 30,
                  max_slippage_bps: int = 20,
-                 dry_run: bool = True):
-        self.client = JsonRpcClient(rpc_url)
+                 dry_run: bool = True,
+                 stream_url: Optional[str] = None,
+                 order_size_xrp: float = 5.0,
+                 book_depth: int = 20,
+                 max_in_flight: int = 16,
+                 record_path: Optional[str] = None,
+                 bus_channel: Optional[str] = None):
+        self.client = get_client(rpc_url)
         self.base = base  # "XRP"
         self.quote_currency = quote_currency  # e.g., "USD"
         self.quote_issuer = quote_issuer      # rXXXX issuer of USD IOU on XRPL
         self.min_spread_bps = min_spread_bps
         self.max_slippage_bps = max_slippage_bps
         self.dry_run = dry_run
+        self.order_size_xrp = order_size_xrp
+        self.book_depth = book_depth  # offers per side when polling
+        self.max_in_flight = max_in_flight
+        self.pipeline: Optional[OrderPipeline] = None
+
+        self.recorder = None
+        if record_path:
+            from modules.backtest import SnapshotRecorder  # numpy only when recording
+            self.recorder = SnapshotRecorder(record_path, depth=book_depth)
+
+        self.bus = None
+        if bus_channel:
+            from modules.market_bus import get_writer  # one writer per channel per process
+            self.bus = get_writer(bus_channel)
+        # Ring records carry a 16-byte tag: currency plus the start of the issuer
+        self.bus_tag = f"{quote_currency}:{quote_issuer}"[:16] if quote_currency else ""
+
+        self.stream = None
+        if stream_url and quote_currency and quote_issuer:
+            self.stream = BookStream(stream_url, quote_currency, quote_issuer)
+            self.stream.start()
 
     # ---- Public API ---------------------------------------------------------
 
@@ -54,107 +91,194 @@ class ArbitrageEngine:
             receipts.log(f"[Arb] {ts} | Pair not configured. Set QUOTE_CURRENCY & QUOTE_ISSUER in .env")
             return
 
-        best = self._best_bid_ask()
+        book = self._order_book()
+        best = book.best_bid_ask() if book is not None else None
         if best is None:
             receipts.log(f"[Arb] {ts} | No orderbook data available.")
             return
 
         best_bid_xrp, best_ask_xrp = best  # prices in QUOTE per 1 XRP
+        self.publish_top(book)
         receipts.log(f"[Arb] {ts} | XRPL best bid {best_bid_xrp:.6f} {self.quote_currency}/XRP, "
                      f"best ask {best_ask_xrp:.6f} {self.quote_currency}/XRP")
 
         # If no external price, just stop here (market-making modules can be added later)
         if ref_price_xrp_in_quote is None:
             return
+        if self.recorder is not None:
+            self.recorder.record(book, ref_price_xrp_in_quote)
 
-        # Simple edge checks (buy if XRPL ask is cheap vs ref; sell if XRPL bid is rich vs ref)
-        buy_edge_bps = 10000.0 * (ref_price_xrp_in_quote - best_ask_xrp) / ref_price_xrp_in_quote
-        sell_edge_bps = 10000.0 * (best_bid_xrp - ref_price_xrp_in_quote) / ref_price_xrp_in_quote
+        side, amount_xrp, limit_price, buy_edge_bps, sell_edge_bps = self.evaluate(book, ref_price_xrp_in_quote)
 
-        if buy_edge_bps >= self.min_spread_bps:
+        if side is None:
+            receipts.log(f"[Arb] {ts} | No actionable edge (buy {buy_edge_bps:.1f}bps / sell {sell_edge_bps:.1f}bps).")
+            return
+        self.execute(wallet_service, receipts, side, amount_xrp, limit_price)
+
+    def execute(self, wallet_service, receipts, side: str, amount_xrp: float, limit_price: float):
+        """
+        Prepares (or places) the offer chosen by evaluate().
+        """
+        if side == "buy":
             # BUY XRP (pay QUOTE)
-            self._place_buy_xrp(wallet_service, receipts, amount_xrp=5.0, limit_price=best_ask_xrp)
-        elif sell_edge_bps >= self.min_spread_bps:
+            self._place_buy_xrp(wallet_service, receipts, amount_xrp=amount_xrp, limit_price=limit_price)
+        elif side == "sell":
             # SELL XRP (receive QUOTE)
-            self._place_sell_xrp(wallet_service, receipts, amount_xrp=5.0, limit_price=best_bid_xrp)
-        else:
-            receipts.log(f"[Arb] {ts} | No actionable edge (buy {buy_edge_bps:.1f}bps / sell {sell_edge_bps:.1f}bps).")
+            self._place_sell_xrp(wallet_service, receipts, amount_xrp=amount_xrp, limit_price=limit_price)
+
+    @metrics.timed("arb_decision_seconds", "ArbitrageEngine.evaluate on one book snapshot")
+    def evaluate(self, book: OrderBook, ref_price_xrp_in_quote: float):
+        """
+        Decision step on a book snapshot, no I/O.
+        Order size is capped by the depth within max_slippage_bps of the touch, and
+        edges are measured on the volume-weighted fill price for that size.
+        Returns (side, amount_xrp, limit_price, buy_edge_bps, sell_edge_bps);
+        side is "buy", "sell" or None.
+        """
+        ref = ref_price_xrp_in_quote
+        buy = self._sized_fill(book.asks)
+        sell = self._sized_fill(book.bids)
+
+        # Simple edge checks (buy if XRPL ask is cheap vs ref; sell if XRPL bid is rich vs ref)
+        buy_edge_bps = 10000.0 * (ref - buy[1]) / ref if buy else float("-inf")
+        sell_edge_bps = 10000.0 * (sell[1] - ref) / ref if sell else float("-inf")
+
+        if buy_edge_bps >= self.min_spread_bps:
+            return ("buy", buy[0], buy[2], buy_edge_bps, sell_edge_bps)
+        if sell_edge_bps >= self.min_spread_bps:
+            return ("sell", sell[0], sell[2], buy_edge_bps, sell_edge_bps)
+        return (None, 0.0, None, buy_edge_bps, sell_edge_bps)
+
+    def publish_top(self, book: OrderBook):
+        """
+        Best bid/ask and their sizes to the market bus, if one is configured.
+        """
+        if self.bus is None:
+            return
+        bid, ask = book.bids.levels(1), book.asks.levels(1)
+        if bid and ask:
+            self.bus.book_top(self.bus_tag, bid[0][0], ask[0][0], bid[0][1], ask[0][1])
 
     # ---- Internals ----------------------------------------------------------
 
-    def _best_bid_ask(self) -> Optional[Tuple[float, float]]:
+    def _sized_fill(self, side: BookSide) -> Optional[Tuple[float, float, float]]:
         """
-        Returns (best_bid_price, best_ask_price) for XRP quoted in the IOU: QUOTE/XRP.
-        Price is QUOTE per 1 XRP.
+        Returns (amount_xrp, vwap, worst_price) for the largest order up to
+        order_size_xrp that stays within max_slippage_bps, or None.
         """
+        amount = min(self.order_size_xrp, side.depth_within(self.max_slippage_bps))
+        if amount <= 0:
+            return None
+        fill = side.fill(amount)
+        if fill is None:
+            return None
+        return (amount, fill[0], fill[1])
+
+    def _order_book(self) -> Optional[OrderBook]:
+        """
+        Current XRP/QUOTE book (prices in QUOTE per 1 XRP).
+        Uses the streamed local book when live, otherwise polls BookOffers over RPC.
+        """
+        if self.stream is not None and self.stream.is_live():
+            with metrics.timer("arb_book_fetch_seconds", "Order book fetch", source="stream"):
+                return self.stream.snapshot()
+        with metrics.timer("arb_book_fetch_seconds", "Order book fetch", source="poll"):
+            return self._poll_order_book()
+
+    def _poll_order_book(self) -> Optional[OrderBook]:
         try:
             # Book where taker GETS XRP and PAYS QUOTE -> asks (people selling XRP for QUOTE)
             asks = self.client.request(BookOffers(
-                taker_gets={"currency": "XRP"},
-                taker_pays=_ic(self.quote_currency, self.quote_issuer),
-                limit=5
+                taker_gets=XRP(),
+                taker_pays=IssuedCurrency(currency=self.quote_currency, issuer=self.quote_issuer),
+                limit=self.book_depth
             )).result.get("offers", [])
 
             # Book where taker GETS QUOTE and PAYS XRP -> bids (people buying XRP with QUOTE)
             bids = self.client.request(BookOffers(
-                taker_gets=_ic(self.quote_currency, self.quote_issuer),
-                taker_pays={"currency": "XRP"},
-                limit=5
+                taker_gets=IssuedCurrency(currency=self.quote_currency, issuer=self.quote_issuer),
+                taker_pays=XRP(),
+                limit=self.book_depth
             )).result.get("offers", [])
 
-            def _price_quote_per_xrp(offer: Dict[str, Any], side: str) -> Optional[float]:
-                # Offers have "TakerGets" and "TakerPays"
-                gets = offer.get("taker_gets")
-                pays = offer.get("taker_pays")
-
-                # Normalize to dict forms
-                if isinstance(gets, str):
-                    gets = {"currency": "XRP", "value": gets}  # drops for XRP
-                if isinstance(pays, str):
-                    pays = {"currency": "XRP", "value": pays}
-
-                # Convert to numeric amounts
-                def _amt(a):
-                    if a.get("currency") == "XRP":
-                        return float(a["value"]) / 1_000_000.0  # drops -> XRP
-                    else:
-                        # IOU: expect "value" as string float
-                        return float(a["value"])
-
-                try:
-                    if side == "ask":
-                        # taker pays QUOTE (IOU), gets XRP
-                        xrp = _amt(gets)   # XRP the taker gets
-                        quote = _amt(pays) # QUOTE the taker pays
-                    else:  # "bid"
-                        # taker pays XRP, gets QUOTE
-                        xrp = _amt(pays)   # XRP the taker pays
-                        quote = _amt(gets) # QUOTE the taker gets
-
-                    return quote / xrp if xrp > 0 else None
-                except Exception:
-                    return None
-
-            best_ask = min([_price_quote_per_xrp(o, "ask") for o in asks if _price_quote_per_xrp(o, "ask")], default=None)
-            best_bid = max([_price_quote_per_xrp(o, "bid") for o in bids if _price_quote_per_xrp(o, "bid")], default=None)
-
-            if best_bid is None or best_ask is None:
-                return None
-            return (best_bid, best_ask)
+            return OrderBook.from_offers(asks, bids)
         except Exception:
             return None
 
+    def _pipeline_for(self, wallet_service) -> OrderPipeline:
+        if self.pipeline is None:
+            self.pipeline = OrderPipeline(self.client, wallet_service.wallet, max_in_flight=self.max_in_flight)
+        return self.pipeline
+
+    def _submit_offer(self, wallet_service, receipts, tx, side: str, amount_xrp: float, limit_price: float,
+                      ts: str, t0: float) -> OrderTicket:
+        """
+        Queues the offer and returns its ticket; receipts are written from the
+        pipeline threads when rippled accepts it and when it settles.
+        """
+        def submitted(ticket: OrderTicket):
+            receipts.record("submitted", f"[Arb] {ts} | {side} submitted {ticket.tx_hash} "
+                            f"seq {ticket.sequence} ({ticket.engine_result})", side=side, qty=amount_xrp,
+                            price=limit_price, tx_hash=ticket.tx_hash, latency_ms=(time.perf_counter() - t0) * 1000.0)
+
+        def done(ticket: OrderTicket):
+            latency_ms = (time.perf_counter() - t0) * 1000.0
+            if ticket.status == "validated":
+                # Validated only means the offer was placed: report what crossed, from the metadata
+                xrp, quote = self._executed(ticket, tx.account)
+                rest = f", rest {amount_xrp - xrp:.4f} XRP on book" if xrp < amount_xrp - 1e-6 else ""
+                if xrp > 0:
+                    price = quote / xrp
+                    if self.bus is not None:
+                        self.bus.fill(self.bus_tag, 1 if side == "BUY" else -1, xrp, price)
+                    receipts.record("filled", f"[Arb] {ts} | {side} {ticket.tx_hash} filled {xrp:.6f} XRP "
+                                    f"@ {price:.6f} in ledger {ticket.ledger_index}{rest}", side=side, qty=xrp,
+                                    price=price, tx_hash=ticket.tx_hash, latency_ms=latency_ms)
+                else:
+                    receipts.record("placed", f"[Arb] {ts} | {side} {ticket.tx_hash} placed in ledger "
+                                    f"{ticket.ledger_index}, nothing filled{rest}", side=side, qty=amount_xrp,
+                                    price=limit_price, tx_hash=ticket.tx_hash, latency_ms=latency_ms)
+            else:
+                receipts.record("error", f"[Arb] {ts} | {side} {ticket.status}: {ticket.result or ticket.error}",
+                                side=side, qty=amount_xrp, price=limit_price, tx_hash=ticket.tx_hash,
+                                latency_ms=latency_ms)
+
+        return self._pipeline_for(wallet_service).submit(tx, on_submitted=submitted, on_done=done)
+
+    def _executed(self, ticket: OrderTicket, account: str) -> Tuple[float, float]:
+        """
+        (XRP, QUOTE) that actually changed hands for account in a validated
+        OfferCreate, from its balance changes; the fee is taken out of the XRP.
+        """
+        xrp = quote = 0.0
+        if not ticket.meta:
+            return xrp, quote
+        for change in get_balance_changes(ticket.meta):
+            if change["account"] != account:
+                continue
+            for bal in change["balances"]:
+                if bal["currency"] == "XRP":
+                    xrp += float(bal["value"])
+                elif bal["currency"] == self.quote_currency and bal.get("issuer") == self.quote_issuer:
+                    quote += float(bal["value"])
+        xrp += (ticket.fee_drops or 0) / 1_000_000.0  # the XRP delta includes -fee
+        return abs(xrp) if abs(xrp) > 1e-9 else 0.0, abs(quote)
+
     def _place_buy_xrp(self, wallet_service, receipts, amount_xrp: float, limit_price: float):
         """
         BUY XRP: pay QUOTE IOU, receive XRP.
         """
+        t0 = time.perf_counter()
         ts = datetime.now(timezone.utc).isoformat()
         addr = getattr(getattr(wallet_service, "wallet", wallet_service), "classic_address", "unknown")
         spend_quote = amount_xrp * limit_price  # QUOTE units
 
         if self.dry_run:
-            receipts.log(f"[Arb] {ts} | DRY_RUN BUY {amount_xrp:.4f} XRP @≤ {limit_price:.6f} "
-                         f"spend ~{spend_quote:.2f} {self.quote_currency} from {addr}")
+            receipts.record("dry_run", f"[Arb] {ts} | DRY_RUN BUY {amount_xrp:.4f} XRP @≤ {limit_price:.6f} "
+                            f"spend ~{spend_quote:.2f} {self.quote_currency} from {addr}",
+                            side="BUY", qty=amount_xrp, price=limit_price)
+            if self.bus is not None:
+                self.bus.fill(self.bus_tag, 1, amount_xrp, limit_price, sim=True)
             return
 
         try:
@@ -167,22 +291,25 @@ class ArbitrageEngine:
                 },
                 taker_pays=xrp_to_drops(amount_xrp),  # taker gets XRP
             )
-            result = submit_and_wait(tx, self.client, wallet=wallet_service.wallet)
-            receipts.log(f"[Arb] {ts} | BUY submitted {result.result.get('hash')}")
+            self._submit_offer(wallet_service, receipts, tx, "BUY", amount_xrp, limit_price, ts, t0)
         except Exception as e:
-            receipts.log(f"[Arb] {ts} | BUY error: {e}")
+            receipts.record("error", f"[Arb] {ts} | BUY error: {e}", side="BUY", qty=amount_xrp, price=limit_price)
 
     def _place_sell_xrp(self, wallet_service, receipts, amount_xrp: float, limit_price: float):
         """
         SELL XRP: receive QUOTE IOU, pay XRP.
         """
+        t0 = time.perf_counter()
         ts = datetime.now(timezone.utc).isoformat()
         addr = getattr(getattr(wallet_service, "wallet", wallet_service), "classic_address", "unknown")
         receive_quote = amount_xrp * limit_price  # QUOTE units
 
         if self.dry_run:
-            receipts.log(f"[Arb] {ts} | DRY_RUN SELL {amount_xrp:.4f} XRP @≥ {limit_price:.6f} "
-                         f"receive ~{receive_quote:.2f} {self.quote_currency} to {addr}")
+            receipts.record("dry_run", f"[Arb] {ts} | DRY_RUN SELL {amount_xrp:.4f} XRP @≥ {limit_price:.6f} "
+                            f"receive ~{receive_quote:.2f} {self.quote_currency} to {addr}",
+                            side="SELL", qty=amount_xrp, price=limit_price)
+            if self.bus is not None:
+                self.bus.fill(self.bus_tag, -1, amount_xrp, limit_price, sim=True)
             return
 
         try:
@@ -195,7 +322,6 @@ class ArbitrageEngine:
                     "value": f"{receive_quote:.6f}",
                 },
             )
-            result = submit_and_wait(tx, self.client, wallet=wallet_service.wallet)
-            receipts.log(f"[Arb] {ts} | SELL submitted {result.result.get('hash')}")
+            self._submit_offer(wallet_service, receipts, tx, "SELL", amount_xrp, limit_price, ts, t0)
         except Exception as e:
-            receipts.log(f"[Arb] {ts} | SELL error: {e}")
+            receipts.record("error", f"[Arb] {ts} | SELL error: {e}", side="SELL", qty=amount_xrp, price=limit_price)
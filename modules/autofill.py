@@ -0,0 +1,197 @@
+# ~/governor_ai/modules/autofill.py
+import os
+import threading
+from typing import Optional, Dict, Any, List, Tuple
+
+from xrpl.ledger import get_fee
+from xrpl.models.requests import AccountInfo, ServerInfo
+from xrpl.models.transactions import Transaction
+from xrpl.models.transactions.types import TransactionType
+from xrpl.transaction import autofill, sign
+
+from modules.ledger_cache import LedgerTracker, get_cached_client
+
+# Transaction types whose cost is not the plain reference fee; autofill() prices them
+_SPECIAL_FEE_TYPES = {TransactionType.ACCOUNT_DELETE, TransactionType.AMM_CREATE,
+                      TransactionType.ESCROW_FINISH, TransactionType.BATCH}
+
+# Network IDs above this must be signed into every transaction
+_RESTRICTED_NETWORKS = 1024
+
+
+class AutofillManager:
+    """
+    Local autofill + signing for one account.
+    - Sequence: fetched once from the current ledger, then counted locally.
+    - Fee: open-ledger fee from a `fee` request sampled every fee_interval secs
+      on a background thread, capped at max_fee_drops.
+    - LastLedgerSequence: validated ledger from a LedgerTracker (ledger stream
+      when XRPL_WS_URL is set) + ledger_offset.
+    - Once warm, prepare()/sign()/presign() make no network calls.
+    - resync() after a gap (a sequence that was never consumed) refetches the
+      sequence before the next allocation.
+    """
+
+    def __init__(self,
+                 client,
+                 wallet,
+                 tracker: Optional[LedgerTracker] = None,
+                 fee_interval: float = 10.0,
+                 ledger_offset: int = 20,
+                 max_fee_drops: int = 2_000_000):
+        self.client = client
+        self.wallet = wallet
+        self.account = wallet.classic_address
+        self.tracker = tracker or get_cached_client(client.url).tracker
+        self.fee_interval = fee_interval
+        self.ledger_offset = ledger_offset
+        self.max_fee_drops = max_fee_drops
+        self.fee_drops: Optional[str] = None
+        self.network_id: Optional[int] = None
+        self.resyncs = 0
+        self.allocated = 0
+
+        self._next_seq: Optional[int] = None
+        self._network_checked = False
+        self._lock = threading.Lock()
+        self._fee_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._sampler = threading.Thread(target=self._sample_fees, name="fee-sampler", daemon=True)
+        self._sampler.start()
+
+    # ---- Public API ---------------------------------------------------------
+
+    def warm(self):
+        """
+        Fetches everything up front so the first signature is local too.
+        """
+        with self._lock:
+            self._sync_sequence()
+        self._fee()
+        self._network()
+        self._last_ledger_sequence()
+
+    def prepare(self, tx: Transaction) -> Transaction:
+        """
+        tx with Sequence, Fee, LastLedgerSequence (and NetworkID) filled in;
+        fields already set are kept.
+        """
+        return self._prepare_many([tx])[0]
+
+    def sign(self, tx: Transaction) -> Transaction:
+        return sign(self.prepare(tx), self.wallet)
+
+    def presign(self, txs: List[Transaction]) -> List[Transaction]:
+        """
+        Signs a batch on consecutive sequences. If one of them fails without
+        consuming its sequence, call resync() and re-sign the rest.
+        """
+        return [sign(tx, self.wallet) for tx in self._prepare_many(txs)]
+
+    def resync(self):
+        with self._lock:
+            self._next_seq = None
+            self.resyncs += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "account": self.account,
+            "next_sequence": self._next_seq,
+            "fee_drops": self.fee_drops,
+            "ledger_index": self.tracker.ledger_index,
+            "allocated": self.allocated,
+            "resyncs": self.resyncs,
+        }
+
+    def close(self):
+        self._stopped.set()
+
+    # ---- Internals ----------------------------------------------------------
+
+    def _prepare_many(self, txs: List[Transaction]) -> List[Transaction]:
+        fee = self._fee()
+        network_id = self._network()
+        last_ledger = self._last_ledger_sequence()
+        with self._lock:
+            seqs = self._allocate(sum(1 for tx in txs if tx.sequence is None and tx.ticket_sequence is None))
+        out, seqs = [], iter(seqs)
+        for tx in txs:
+            fields = tx.to_dict()
+            if "sequence" not in fields:
+                fields["sequence"] = 0 if "ticket_sequence" in fields else next(seqs)
+            fields.setdefault("last_ledger_sequence", last_ledger)
+            if network_id is not None:
+                fields.setdefault("network_id", network_id)
+            if tx.transaction_type in _SPECIAL_FEE_TYPES:
+                out.append(autofill(Transaction.from_dict(fields), self.client))
+                continue
+            fields.setdefault("fee", fee)
+            out.append(Transaction.from_dict(fields))
+        return out
+
+    def _allocate(self, n: int) -> Tuple[int, ...]:
+        if n == 0:
+            return ()
+        if self._next_seq is None:
+            self._sync_sequence()
+        first = self._next_seq
+        self._next_seq += n
+        self.allocated += n
+        return tuple(range(first, first + n))
+
+    def _sync_sequence(self):
+        resp = self.client.request(AccountInfo(account=self.account, ledger_index="current"))
+        if not resp.is_successful():
+            raise RuntimeError(f"account_info failed: {resp.result.get('error')}")
+        self._next_seq = resp.result["account_data"]["Sequence"]
+
+    def _fee(self) -> str:
+        if self.fee_drops is None:
+            self._refresh_fee()
+        return self.fee_drops
+
+    def _refresh_fee(self):
+        with self._fee_lock:
+            self.fee_drops = get_fee(self.client, max_fee=self.max_fee_drops / 1_000_000, fee_type="open")
+
+    def _sample_fees(self):
+        while not self._stopped.wait(self.fee_interval):
+            try:
+                self._refresh_fee()
+            except Exception as e:
+                print(f"[AutofillManager] Fee sample failed: {e}")
+
+    def _network(self) -> Optional[int]:
+        if not self._network_checked:
+            info = self.client.request(ServerInfo()).result.get("info", {})
+            network_id = info.get("network_id")
+            self.network_id = network_id if network_id and network_id > _RESTRICTED_NETWORKS else None
+            self._network_checked = True
+        return self.network_id
+
+    def _last_ledger_sequence(self) -> int:
+        ledger = self.tracker.current()
+        if ledger is None:
+            raise RuntimeError("No validated ledger index available")
+        return ledger + self.ledger_offset
+
+
+_managers: Dict[Tuple[str, str], AutofillManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_autofill_manager(client, wallet) -> AutofillManager:
+    """
+    Process-wide AutofillManager per (node, account), so every component
+    signing for the same wallet draws from one sequence counter.
+    Fee sampling interval from XRPL_FEE_INTERVAL (secs).
+    """
+    key = (client.url, wallet.classic_address)
+    manager = _managers.get(key)
+    if manager is None:
+        with _managers_lock:
+            manager = _managers.get(key)
+            if manager is None:
+                manager = _managers[key] = AutofillManager(
+                    client, wallet, fee_interval=float(os.getenv("XRPL_FEE_INTERVAL", "10")))
+    return manager
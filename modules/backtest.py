@@ -0,0 +1,398 @@
+# ~/governor_ai/modules/backtest.py
+"""
+Replay backtester for ArbitrageEngine.
+
+Recorded snapshots (one JSON line per cycle: ts, ref, top-N asks/bids as
+[price, xrp]) are loaded into padded NumPy arrays, and the engine's decision
+step (depth-capped size, VWAP edge vs. reference, min spread) is evaluated
+for every snapshot at once. Parameter grids fan out over a process pool.
+
+  ArbitrageEngine(..., record_path="./logs/snapshots.jsonl")   # record while running
+  python -m modules.backtest ./logs/snapshots.jsonl --spread 10,20,30 --slippage 5,10,20 --size 5,10,25
+  python -m modules.backtest --synthetic 1000000 --workers 4 --check 2000
+
+Fill model: the chosen side fills in full at its VWAP against the recorded
+book (no queueing, no impact on the next snapshot), less fee_xrp per order.
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Dict, Any, List
+
+import numpy as np
+
+from modules.orderbook import OrderBook
+
+PARAMS = ("min_spread_bps", "max_slippage_bps", "order_size_xrp")
+DEFAULT_FEE_XRP = 0.000012  # 12 drops per OfferCreate
+
+
+class SnapshotRecorder:
+    """
+    Appends (ts, ref, top-depth levels per side) per cycle as JSON lines.
+    """
+
+    def __init__(self, path: str, depth: int = 20, flush_every: int = 64):
+        self.path = path
+        self.depth = depth
+        self.flush_every = flush_every
+        self.recorded = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "a")
+
+    def record(self, book: OrderBook, ref_price: float, ts: Optional[float] = None):
+        row = {
+            "ts": time.time() if ts is None else ts,
+            "ref": ref_price,
+            "asks": book.asks.levels(self.depth),
+            "bids": book.bids.levels(self.depth),
+        }
+        self._file.write(json.dumps(row, separators=(",", ":")) + "\n")
+        self.recorded += 1
+        if self.recorded % self.flush_every == 0:
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class Snapshots:
+    """
+    Column arrays for N snapshots, levels padded to depth D (price nan, size 0).
+    Prefix sums per side are computed once and shared by every parameter set.
+    """
+
+    def __init__(self, ts, ref, ask_px, ask_sz, bid_px, bid_sz):
+        self.ts = ts
+        self.ref = ref
+        self.ask_px, self.ask_sz = ask_px, ask_sz
+        self.bid_px, self.bid_sz = bid_px, bid_sz
+        self.ask_cum_x, self.ask_cum_q = _prefix(ask_px, ask_sz)
+        self.bid_cum_x, self.bid_cum_q = _prefix(bid_px, bid_sz)
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def book(self, i: int) -> OrderBook:
+        """
+        Snapshot i as an OrderBook (for checking against ArbitrageEngine.evaluate).
+        """
+        book = OrderBook()
+        for side, px, sz in ((book.asks, self.ask_px[i], self.ask_sz[i]), (book.bids, self.bid_px[i], self.bid_sz[i])):
+            for n, (p, s) in enumerate(zip(px, sz)):
+                if s > 0:
+                    side.upsert(str(n), float(p), float(s))
+        return book
+
+    def save(self, path: str):
+        np.savez(path, ts=self.ts, ref=self.ref, ask_px=self.ask_px, ask_sz=self.ask_sz,
+                 bid_px=self.bid_px, bid_sz=self.bid_sz)
+
+
+def _prefix(px, sz):
+    return np.cumsum(sz, axis=1), np.cumsum(np.nan_to_num(px) * sz, axis=1)
+
+
+def load_snapshots(path: str, depth: Optional[int] = None) -> Snapshots:
+    """
+    Reads a recorder file (or an .npz written by Snapshots.save). A parsed
+    copy is cached next to the JSON lines as <path>.npz and reused while newer.
+    """
+    if path.endswith(".npz"):
+        return _from_npz(path, depth)
+    cache = path + ".npz"
+    if os.path.exists(cache) and os.path.getmtime(cache) >= os.path.getmtime(path):
+        return _from_npz(cache, depth)
+
+    rows = []
+    with open(path) as f:
+        for line in f:
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                continue  # torn line from a crash
+    rows = [r for r in rows if r.get("ref")]
+    width = max([len(r["asks"]) for r in rows] + [len(r["bids"]) for r in rows] + [1])
+    n = len(rows)
+    ask_px, bid_px = np.full((n, width), np.nan), np.full((n, width), np.nan)
+    ask_sz, bid_sz = np.zeros((n, width)), np.zeros((n, width))
+    for i, r in enumerate(rows):
+        for px, sz, levels in ((ask_px, ask_sz, r["asks"]), (bid_px, bid_sz, r["bids"])):
+            if levels:
+                arr = np.asarray(levels, dtype=float)
+                px[i, :len(arr)], sz[i, :len(arr)] = arr[:, 0], arr[:, 1]
+    snaps = Snapshots(np.array([r["ts"] for r in rows], dtype=float), np.array([r["ref"] for r in rows], dtype=float),
+                      ask_px, ask_sz, bid_px, bid_sz)
+    try:
+        snaps.save(cache)
+    except OSError as e:
+        print(f"[Backtest] Could not write cache {cache}: {e}")
+    return _truncate(snaps, depth)
+
+
+def _from_npz(path: str, depth: Optional[int]) -> Snapshots:
+    with np.load(path) as z:
+        snaps = Snapshots(z["ts"], z["ref"], z["ask_px"], z["ask_sz"], z["bid_px"], z["bid_sz"])
+    return _truncate(snaps, depth)
+
+
+def _truncate(snaps: Snapshots, depth: Optional[int]) -> Snapshots:
+    if depth is None or depth >= snaps.ask_px.shape[1]:
+        return snaps
+    return Snapshots(snaps.ts, snaps.ref, snaps.ask_px[:, :depth], snaps.ask_sz[:, :depth],
+                     snaps.bid_px[:, :depth], snaps.bid_sz[:, :depth])
+
+
+def synthetic_snapshots(n: int, depth: int = 20, seed: int = 0, mid: float = 0.5) -> Snapshots:
+    """
+    Random-walk mid with a noisy reference and exponentially sized levels.
+    """
+    rng = np.random.default_rng(seed)
+    mids = mid * np.exp(np.cumsum(rng.normal(0, 2e-4, n)))
+    ref = mids * (1 + rng.normal(0, 2e-3, n))
+    half = mids * rng.uniform(2e-4, 2e-3, n)
+    steps = np.cumsum(rng.uniform(1e-4, 6e-4, (n, depth)), axis=1) * mids[:, None]
+    ask_px = (mids + half)[:, None] + steps
+    bid_px = (mids - half)[:, None] - steps
+    ask_sz = rng.exponential(15.0, (n, depth))
+    bid_sz = rng.exponential(15.0, (n, depth))
+    ts = time.time() - (n - np.arange(n)) * 4.0
+    return Snapshots(ts, ref, ask_px, ask_sz, bid_px, bid_sz)
+
+
+# ---- Vectorized decision step ----------------------------------------------
+
+def _sized_fill(px, sz, cum_x, cum_q, ascending: bool, slippage_bps: float, size: float):
+    """
+    BookSide.depth_within + fill per row: (amount, vwap, worst); nan where no fill.
+    """
+    best = px[:, 0]
+    factor = slippage_bps / 10000.0
+    if ascending:
+        within = px <= (best * (1.0 + factor))[:, None]
+    else:
+        within = px >= (best * (1.0 - factor))[:, None]
+    depth = np.where(within & (sz > 0), sz, 0.0).sum(axis=1)
+    amount = np.minimum(size, depth)
+
+    j = (cum_x < (amount - 1e-12)[:, None]).sum(axis=1)
+    ok = (amount > 0) & (j < px.shape[1])
+    jj = np.minimum(j, px.shape[1] - 1)[:, None]
+    prev = np.maximum(jj - 1, 0)
+    has_prev = (jj > 0)[:, 0]
+    prev_x = np.where(has_prev, np.take_along_axis(cum_x, prev, axis=1)[:, 0], 0.0)
+    prev_q = np.where(has_prev, np.take_along_axis(cum_q, prev, axis=1)[:, 0], 0.0)
+    worst = np.take_along_axis(px, jj, axis=1)[:, 0]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        vwap = (prev_q + (amount - prev_x) * worst) / amount
+    return np.where(ok, amount, 0.0), np.where(ok, vwap, np.nan), np.where(ok, worst, np.nan)
+
+
+def evaluate_batch(snaps: Snapshots, min_spread_bps: float, max_slippage_bps: float,
+                   order_size_xrp: float) -> Dict[str, np.ndarray]:
+    """
+    ArbitrageEngine.evaluate over every snapshot. side: 1 buy, -1 sell, 0 none.
+    """
+    ref = snaps.ref
+    buy = _sized_fill(snaps.ask_px, snaps.ask_sz, snaps.ask_cum_x, snaps.ask_cum_q, True,
+                      max_slippage_bps, order_size_xrp)
+    sell = _sized_fill(snaps.bid_px, snaps.bid_sz, snaps.bid_cum_x, snaps.bid_cum_q, False,
+                       max_slippage_bps, order_size_xrp)
+    buy_edge = np.where(buy[0] > 0, 10000.0 * (ref - buy[1]) / ref, -np.inf)
+    sell_edge = np.where(sell[0] > 0, 10000.0 * (sell[1] - ref) / ref, -np.inf)
+
+    is_buy = buy_edge >= min_spread_bps
+    is_sell = ~is_buy & (sell_edge >= min_spread_bps)
+    side = np.where(is_buy, 1, np.where(is_sell, -1, 0)).astype(np.int8)
+    return {
+        "side": side,
+        "amount": np.where(is_buy, buy[0], np.where(is_sell, sell[0], 0.0)),
+        "vwap": np.where(is_buy, buy[1], np.where(is_sell, sell[1], np.nan)),
+        "limit": np.where(is_buy, buy[2], np.where(is_sell, sell[2], np.nan)),
+        "buy_edge_bps": buy_edge,
+        "sell_edge_bps": sell_edge,
+    }
+
+
+def simulate(snaps: Snapshots, min_spread_bps: float = 30, max_slippage_bps: float = 20,
+             order_size_xrp: float = 5.0, fee_xrp: float = DEFAULT_FEE_XRP) -> Dict[str, Any]:
+    """
+    Fills and P&L for one parameter set. P&L is in QUOTE:
+    - edge_pnl: sum of amount * (ref - vwap) for buys, (vwap - ref) for sells
+    - mtm_pnl: cash + final position marked at the last reference, less fees
+    """
+    t0 = time.perf_counter()
+    d = evaluate_batch(snaps, min_spread_bps, max_slippage_bps, order_size_xrp)
+    side, amount, vwap, ref = d["side"], d["amount"], d["vwap"], snaps.ref
+    filled = side != 0
+    signed = side * amount                       # +XRP bought, -XRP sold
+    cash = -np.sum(signed[filled] * vwap[filled])
+    position = np.cumsum(signed)
+    fees = np.sum(fee_xrp * ref[filled])
+    edge = np.sum(signed[filled] * (ref[filled] - vwap[filled]))
+    final = float(position[-1]) if len(position) else 0.0
+    last_ref = float(ref[-1]) if len(ref) else 0.0
+    elapsed = time.perf_counter() - t0
+
+    fills = int(filled.sum())
+    volume = float(amount[filled].sum())
+    return {
+        "min_spread_bps": min_spread_bps,
+        "max_slippage_bps": max_slippage_bps,
+        "order_size_xrp": order_size_xrp,
+        "snapshots": len(snaps),
+        "fills": fills,
+        "buys": int((side == 1).sum()),
+        "sells": int((side == -1).sum()),
+        "volume_xrp": round(volume, 6),
+        "avg_edge_bps": round(10000.0 * edge / np.sum(amount[filled] * ref[filled]), 2) if fills else 0.0,
+        "edge_pnl": round(float(edge - fees), 6),
+        "mtm_pnl": round(float(cash + final * last_ref - fees), 6),
+        "fees": round(float(fees), 6),
+        "final_position_xrp": round(final, 6),
+        "max_position_xrp": round(float(np.abs(position).max()), 6) if len(position) else 0.0,
+        "elapsed_ms": round(elapsed * 1000.0, 2),
+        "snapshots_per_sec": round(len(snaps) / elapsed) if elapsed > 0 else None,
+    }
+
+
+# ---- Parameter sweeps ------------------------------------------------------
+
+_SNAPS: Optional[Snapshots] = None
+
+
+def _init_worker(path: str, depth: Optional[int]):
+    global _SNAPS
+    _SNAPS = load_snapshots(path, depth)
+
+
+def _run_one(args):
+    params, fee_xrp = args
+    return simulate(_SNAPS, fee_xrp=fee_xrp, **params)
+
+
+def param_grid(**values) -> List[Dict[str, Any]]:
+    """
+    param_grid(min_spread_bps=[10, 20], order_size_xrp=[5, 25]) -> every combination.
+    """
+    keys = [k for k in PARAMS if k in values]
+    unknown = set(values) - set(PARAMS)
+    if unknown:
+        raise ValueError(f"unknown parameters: {', '.join(sorted(unknown))}")
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(values[k] for k in keys))]
+
+
+def sweep(snaps: Snapshots, grid: List[Dict[str, Any]], workers: int = os.cpu_count() or 1,
+          fee_xrp: float = DEFAULT_FEE_XRP, path: Optional[str] = None,
+          depth: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Runs simulate() for every parameter set, workers processes wide.
+    Workers inherit the loaded arrays through fork; where fork is unavailable
+    they load path themselves. Results are sorted by mtm_pnl, best first.
+    """
+    global _SNAPS
+    t0 = time.perf_counter()
+    jobs = [(params, fee_xrp) for params in grid]
+    if workers <= 1 or len(grid) <= 1:
+        _SNAPS = snaps
+        results = [_run_one(job) for job in jobs]
+    else:
+        if "fork" in multiprocessing.get_all_start_methods():
+            _SNAPS = snaps
+            pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("fork"))
+        elif path is not None:
+            pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(path, depth))
+        else:
+            raise ValueError("sweep needs path= on platforms without fork")
+        with pool:
+            chunk = max(1, len(jobs) // (workers * 4))
+            results = list(pool.map(_run_one, jobs, chunksize=chunk))
+    wall = time.perf_counter() - t0
+    results.sort(key=lambda r: r["mtm_pnl"], reverse=True)
+    return {
+        "snapshots": len(snaps),
+        "param_sets": len(grid),
+        "workers": workers,
+        "wall_s": round(wall, 3),
+        "snapshots_per_sec": round(len(snaps) * len(grid) / wall) if wall > 0 else None,
+        "results": results,
+    }
+
+
+def check_against_engine(snaps: Snapshots, params: Dict[str, Any], sample: int = 1000, seed: int = 0) -> int:
+    """
+    Replays a random sample through ArbitrageEngine.evaluate itself and
+    returns how many decisions differ from evaluate_batch (expected 0).
+    """
+    from modules.arbitrage import ArbitrageEngine
+
+    engine = ArbitrageEngine("http://127.0.0.1:1", **params)  # evaluate() does no I/O
+    batch = evaluate_batch(snaps, params.get("min_spread_bps", 30), params.get("max_slippage_bps", 20),
+                           params.get("order_size_xrp", 5.0))
+    idx = np.random.default_rng(seed).choice(len(snaps), size=min(sample, len(snaps)), replace=False)
+    names = {1: "buy", -1: "sell", 0: None}
+    mismatches = 0
+    for i in idx:
+        side, amount, limit, _, _ = engine.evaluate(snaps.book(i), float(snaps.ref[i]))
+        want = names[int(batch["side"][i])]
+        if side != want or (side and not (np.isclose(amount, batch["amount"][i])
+                                          and np.isclose(limit, batch["limit"][i]))):
+            mismatches += 1
+    return mismatches
+
+
+def _floats(spec: str) -> List[float]:
+    return [float(x) for x in spec.split(",") if x]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("path", nargs="?", help="snapshots .jsonl (from SnapshotRecorder) or .npz")
+    ap.add_argument("--synthetic", type=int, help="generate N random snapshots instead of reading path")
+    ap.add_argument("--depth", type=int, help="levels per side to use")
+    ap.add_argument("--spread", default="10,20,30,50", help="min_spread_bps values")
+    ap.add_argument("--slippage", default="5,10,20", help="max_slippage_bps values")
+    ap.add_argument("--size", default="5", help="order_size_xrp values")
+    ap.add_argument("--fee-xrp", type=float, default=DEFAULT_FEE_XRP)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--top", type=int, default=10)
+    ap.add_argument("--check", type=int, default=0, help="verify N sampled snapshots against ArbitrageEngine.evaluate")
+    ap.add_argument("--json", help="write the full report here")
+    args = ap.parse_args()
+
+    if args.synthetic:
+        snaps = synthetic_snapshots(args.synthetic, depth=args.depth or 20)
+    elif args.path:
+        t0 = time.perf_counter()
+        snaps = load_snapshots(args.path, args.depth)
+        print(f"[Backtest] Loaded {len(snaps)} snapshots in {time.perf_counter() - t0:.2f}s")
+    else:
+        ap.error("path or --synthetic required")
+
+    grid = param_grid(min_spread_bps=_floats(args.spread), max_slippage_bps=_floats(args.slippage),
+                      order_size_xrp=_floats(args.size))
+    if args.check:
+        bad = check_against_engine(snaps, grid[0], sample=args.check)
+        print(f"[Backtest] Engine check on {min(args.check, len(snaps))} snapshots ({grid[0]}): {bad} mismatches")
+
+    report = sweep(snaps, grid, workers=args.workers, fee_xrp=args.fee_xrp, path=args.path, depth=args.depth)
+    print(f"{report['snapshots']} snapshots x {report['param_sets']} parameter sets on {report['workers']} workers: "
+          f"{report['wall_s']}s, {report['snapshots_per_sec']:,} snapshot-evals/sec")
+    print(f"{'spread':>7} {'slip':>6} {'size':>7} {'fills':>8} {'buys':>7} {'sells':>7} {'vol XRP':>11} "
+          f"{'edge bps':>9} {'edge P&L':>11} {'MTM P&L':>11} {'snap/s':>11}")
+    for r in report["results"][:args.top]:
+        print(f"{r['min_spread_bps']:7g} {r['max_slippage_bps']:6g} {r['order_size_xrp']:7g} {r['fills']:8d} "
+              f"{r['buys']:7d} {r['sells']:7d} {r['volume_xrp']:11.2f} {r['avg_edge_bps']:9.2f} "
+              f"{r['edge_pnl']:11.4f} {r['mtm_pnl']:11.4f} {r['snapshots_per_sec']:11,}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# ~/governor_ai/modules/book_stream.py
+import json
+import threading
+import time
+from typing import Optional, Tuple, Dict, Any, Callable
+
+from websockets.sync.client import connect
+from xrpl.asyncio.clients.utils import request_to_websocket
+from xrpl.models.currencies import XRP, IssuedCurrency
+from xrpl.models.requests import Subscribe, StreamParameter
+from xrpl.models.requests.subscribe import SubscribeBook
+
+from modules.orderbook import OrderBook, offer_side
+
+# Neutral taker for book subscriptions (ACCOUNT_ZERO)
+_NEUTRAL_TAKER = "rrrrrrrrrrrrrrrrrrrrrhoLvTp"
+
+
+class BookStream:
+    """
+    Streaming XRP/QUOTE order book over the rippled websocket API.
+    - Subscribes with `books` (snapshot + both sides) and the ledger stream.
+    - Applies Offer create/modify/delete nodes from validated transactions
+      to a local OrderBook.
+    - Reconnects with backoff; is_live() turns False while the stream is down
+      or silent so callers can fall back to RPC polling.
+    """
+
+    def __init__(self,
+                 ws_url: str,
+                 quote_currency: str,
+                 quote_issuer: str,
+                 stale_after: float = 15.0,
+                 recv_timeout: float = 5.0,
+                 max_backoff: float = 30.0,
+                 on_update: Optional[Callable[[str], None]] = None):
+        self.ws_url = ws_url
+        self.quote_currency = quote_currency
+        self.quote_issuer = quote_issuer
+        self.stale_after = stale_after
+        self.recv_timeout = recv_timeout
+        self.max_backoff = max_backoff
+        self.on_update = on_update  # called with "snapshot" | "book" | "ledger"
+
+        self._lock = threading.Lock()
+        self._book = OrderBook()
+        self._connected = False
+        self._last_msg = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._ws = None
+        self.ledger_index: Optional[int] = None
+        self.reconnects = 0
+
+    # ---- Public API ---------------------------------------------------------
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="book-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        ws = self._ws
+        if ws is not None:
+            try:
+                ws.close()
+            except Exception:
+                pass
+        if self._thread:
+            self._thread.join(timeout=self.recv_timeout + 1.0)
+
+    def is_live(self) -> bool:
+        return self._connected and (time.monotonic() - self._last_msg) < self.stale_after
+
+    def best_bid_ask(self) -> Optional[Tuple[float, float]]:
+        """
+        Returns (best_bid, best_ask) in QUOTE per 1 XRP from the local book, or None.
+        """
+        with self._lock:
+            return self._book.best_bid_ask()
+
+    def snapshot(self) -> OrderBook:
+        """
+        Returns a private copy of the local book, safe to read off the stream thread.
+        """
+        with self._lock:
+            return self._book.copy()
+
+    # ---- Internals ----------------------------------------------------------
+
+    def _subscribe_request(self) -> Dict[str, Any]:
+        book = SubscribeBook(
+            taker_gets=XRP(),
+            taker_pays=IssuedCurrency(currency=self.quote_currency, issuer=self.quote_issuer),
+            taker=_NEUTRAL_TAKER,
+            snapshot=True,
+            both=True,
+        )
+        req = request_to_websocket(Subscribe(books=[book], streams=[StreamParameter.LEDGER]))
+        req["id"] = "book-stream"
+        return req
+
+    def _run(self):
+        backoff = 1.0
+        while not self._stop.is_set():
+            try:
+                with connect(self.ws_url, open_timeout=self.recv_timeout) as ws:
+                    self._ws = ws
+                    ws.send(json.dumps(self._subscribe_request()))
+                    backoff = 1.0
+                    while not self._stop.is_set():
+                        try:
+                            raw = ws.recv(timeout=self.recv_timeout)
+                        except TimeoutError:
+                            if not self.is_live():
+                                break  # silent stream: reconnect
+                            continue
+                        self._handle(json.loads(raw))
+            except Exception as e:
+                if not self._stop.is_set():
+                    print(f"[BookStream] Stream error: {e}")
+            finally:
+                self._ws = None
+                self._connected = False
+
+            if self._stop.is_set():
+                break
+            self.reconnects += 1
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2.0, self.max_backoff)
+
+    def _notify(self, kind: str):
+        if self.on_update is not None:
+            try:
+                self.on_update(kind)
+            except Exception as e:
+                print(f"[BookStream] on_update hook failed: {e}")
+
+    def _handle(self, msg: Dict[str, Any]):
+        self._last_msg = time.monotonic()
+
+        if msg.get("type") == "response":
+            if msg.get("status") != "success":
+                raise RuntimeError(f"subscribe rejected: {msg.get('error')}")
+            result = msg.get("result", {})
+            # With both=true rippled returns the subscribed book under "bids" and its
+            # reverse under "asks"; classify each offer like the streamed updates instead
+            book = OrderBook()
+            for n, offer in enumerate(result.get("bids", []) + result.get("asks", []) + result.get("offers", [])):
+                side = offer_side(offer, self.quote_currency, self.quote_issuer)
+                if side is not None:
+                    book.apply(side, offer.get("index", f"{side}-{n}"), offer)
+            with self._lock:
+                self._book = book
+            self._connected = True
+            self._notify("snapshot")
+            return
+
+        if msg.get("type") == "ledgerClosed":
+            self.ledger_index = msg.get("ledger_index")
+            self._notify("ledger")
+            return
+
+        if msg.get("type") == "transaction" and msg.get("validated"):
+            if self._apply_meta(msg.get("meta", {})):
+                self._notify("book")
+
+    def _apply_meta(self, meta: Dict[str, Any]) -> bool:
+        touched = False
+        with self._lock:
+            for node in meta.get("AffectedNodes", []):
+                kind, body = next(iter(node.items()))
+                if body.get("LedgerEntryType") != "Offer":
+                    continue
+                fields = body.get("NewFields") or body.get("FinalFields") or {}
+                side = offer_side(fields, self.quote_currency, self.quote_issuer)
+                if side is None:
+                    continue
+                key = body.get("LedgerIndex")
+                if kind == "DeletedNode":
+                    self._book.remove(side, key)
+                else:
+                    self._book.apply(side, key, fields)
+                touched = True
+        return touched
@@ -1,36 +1,95 @@
 # ~/governor_ai/modules/intel.py
-import json
-import os
+import atexit
 from datetime import datetime, timezone
 
+from modules.state_store import StateStore, open_state_store
+
+
+class _TrackedState(dict):
+    """
+    dict that remembers which top-level keys were assigned or deleted.
+    In-place changes to nested values need mark_dirty(key).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.dirty = set()
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.dirty.add(key)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.dirty.add(key)
+
+    def update(self, *args, **kwargs):
+        other = dict(*args, **kwargs)
+        super().update(other)
+        self.dirty.update(other)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *default):
+        if key in self:
+            self.dirty.add(key)
+        return super().pop(key, *default)
+
+    def mark_dirty(self, key):
+        self.dirty.add(key)
+
+
 class AIStrategy:
     """
     Governor AI intelligence core (placeholder).
     Persists state and logs a heartbeat each cycle.
+    - state is a plain dict to callers; save_state() hands only the keys changed
+      since the last save to a StateStore (sqlite/journal/json, STATE_BACKEND).
+    - last_balance is kept as history: balance_history(since, until).
     """
 
-    def __init__(self, state_path="./.state"):
+    HISTORY_KEYS = ("last_balance",)
+
+    def __init__(self, state_path="./.state", store: StateStore = None):
         self.state_path = state_path
+        self.store = store or open_state_store(state_path, history_keys=self.HISTORY_KEYS)
         self.state = self._load_state()
+        atexit.register(self.close)
 
     def _load_state(self):
-        if not os.path.exists(self.state_path):
-            return {}
         try:
-            with open(self.state_path, "r") as f:
-                raw = f.read().strip()
-                return json.loads(raw) if raw else {}
+            return _TrackedState(self.store.load())
         except Exception as e:
             print(f"[AIStrategy] Failed to load state: {e}")
-            return {}
+            return _TrackedState()
 
     def save_state(self):
         try:
-            with open(self.state_path, "w") as f:
-                json.dump(self.state, f, indent=2)
+            dirty = set(self.state.dirty)
+            changes = {}
+            for key in dirty:
+                if key in self.state:
+                    changes[key] = self.state[key]
+                else:
+                    self.store.delete(key)
+            self.store.put(changes)
+            self.state.dirty -= dirty  # keys marked again meanwhile stay dirty
         except Exception as e:
             print(f"[AIStrategy] Failed to save state: {e}")
 
+    def balance_history(self, since=None, until=None, limit=None):
+        """
+        Iterator of (unix ts, balance XRP or None), oldest first, read from disk.
+        """
+        return self.store.history("last_balance", since, until, limit)
+
+    def close(self):
+        self.save_state()
+        self.store.close()
+
     def run_strategy(self, wallet, receipts):
         try:
             ts = datetime.now(timezone.utc).isoformat()
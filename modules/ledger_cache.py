@@ -0,0 +1,218 @@
+# ~/governor_ai/modules/ledger_cache.py
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+from websockets.sync.client import connect
+from xrpl.models.requests import Ledger
+from xrpl.models.requests.request import Request
+from xrpl.models.response import Response
+
+from modules.rpc_pool import get_client
+
+# Methods whose validated answer can only change when a new ledger validates
+_VALIDATED_METHODS = {"account_info", "account_lines", "account_objects", "ledger", "account_tx"}
+
+
+class LedgerTracker:
+    """
+    Tracks the latest validated ledger index.
+    - With ws_url: follows the rippled ledger stream (no per-request cost).
+    - Otherwise: probes Ledger(validated) at most once per probe_interval,
+      on demand from current(); or, after start_polling(), from its own
+      thread on a fixed interval, so listeners fire independently of
+      whoever reads the cache.
+    - add_listener(fn) calls fn(ledger_index) whenever the index advances.
+    """
+
+    def __init__(self, client, ws_url: Optional[str] = None, probe_interval: float = 1.0):
+        self.client = client
+        self.ws_url = ws_url
+        self.probe_interval = probe_interval
+        self.ledger_index: Optional[int] = None
+        self.probes = 0
+        self._last_probe = 0.0
+        self._streaming = False
+        self._polling = False
+        self._lock = threading.Lock()
+        self._listeners = []
+        if ws_url:
+            threading.Thread(target=self._follow, name="ledger-tracker", daemon=True).start()
+
+    def current(self) -> Optional[int]:
+        if (self._streaming or self._polling) and self.ledger_index is not None:
+            return self.ledger_index
+        if time.monotonic() - self._last_probe >= self.probe_interval:
+            with self._lock:
+                if time.monotonic() - self._last_probe >= self.probe_interval:
+                    self._probe()
+        return self.ledger_index
+
+    def advance(self, ledger_index: Optional[int]):
+        """
+        Feeds a validated ledger index from elsewhere (e.g. a BookStream ledger event).
+        """
+        if ledger_index is not None and (self.ledger_index is None or ledger_index > self.ledger_index):
+            self.ledger_index = ledger_index
+            for fn in self._listeners:
+                try:
+                    fn(ledger_index)
+                except Exception as e:
+                    print(f"[LedgerTracker] Listener failed: {e}")
+
+    def add_listener(self, fn):
+        self._listeners.append(fn)
+
+    def start_polling(self, interval: float):
+        """
+        Probes Ledger(validated) every interval secs from a background thread
+        (no-op when following a ledger stream). current() then serves the
+        polled index instead of probing on demand.
+        """
+        if self.ws_url or self._polling:
+            return
+        self._polling = True
+        threading.Thread(target=self._poll, args=(interval,), name="ledger-poller", daemon=True).start()
+
+    def _poll(self, interval: float):
+        while True:
+            with self._lock:
+                self._probe()
+            time.sleep(interval)
+
+    def _probe(self):
+        self._last_probe = time.monotonic()
+        self.probes += 1
+        try:
+            resp = self.client.request(Ledger(ledger_index="validated"))
+            self.advance(resp.result.get("ledger_index"))
+        except Exception as e:
+            print(f"[LedgerTracker] Validated ledger probe failed: {e}")
+
+    def _follow(self):
+        backoff = 1.0
+        while True:
+            try:
+                with connect(self.ws_url, open_timeout=10) as ws:
+                    ws.send(json.dumps({"id": "ledger-tracker", "command": "subscribe", "streams": ["ledger"]}))
+                    backoff = 1.0
+                    while True:
+                        msg = json.loads(ws.recv(timeout=30))
+                        if msg.get("type") == "response":
+                            self.advance(msg.get("result", {}).get("ledger_index"))
+                            self._streaming = True
+                        elif msg.get("type") == "ledgerClosed":
+                            self.advance(msg.get("ledger_index"))
+            except Exception as e:
+                print(f"[LedgerTracker] Ledger stream error: {e}")
+            self._streaming = False
+            time.sleep(backoff)
+            backoff = min(backoff * 2.0, 30.0)
+
+
+class LedgerCache:
+    """
+    Response cache for validated-ledger lookups (AccountInfo, Ledger, AccountTx, ...).
+    - Keyed by (method, params, validated ledger index); the whole cache is
+      dropped when the validated ledger advances.
+    - LRU eviction at maxsize entries; hit/miss counters via stats().
+    - Anything not pinned to the validated ledger passes straight through.
+    """
+
+    def __init__(self, client, maxsize: int = 1024, tracker: Optional[LedgerTracker] = None):
+        self.client = client
+        self.url = client.url
+        self.maxsize = maxsize
+        self.tracker = tracker or LedgerTracker(client)
+        self._entries: "OrderedDict[str, Response]" = OrderedDict()
+        self._ledger: Optional[int] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def request(self, request: Request) -> Response:
+        key = self._key(request)
+        if key is None:
+            return self.client.request(request)
+
+        ledger = self.tracker.current()
+        if ledger is None:
+            return self.client.request(request)
+
+        with self._lock:
+            if ledger != self._ledger:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._ledger = ledger
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        resp = self.client.request(request)
+        if resp.is_successful():
+            with self._lock:
+                if self._ledger == ledger:
+                    self._entries[key] = resp
+                    if len(self._entries) > self.maxsize:
+                        self._entries.popitem(last=False)
+                        self.evictions += 1
+        return resp
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "ledger_index": self._ledger,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "ledger_probes": self.tracker.probes,
+        }
+
+    @staticmethod
+    def _key(request: Request) -> Optional[str]:
+        params = request.to_dict()
+        method = params.pop("method", None)
+        params.pop("id", None)
+        if method not in _VALIDATED_METHODS or params.get("ledger_hash"):
+            return None
+        ledger_index = params.get("ledger_index")
+        if method == "account_tx":
+            # Default range already ends at the latest validated ledger
+            if ledger_index not in (None, "validated") or params.get("ledger_index_max", -1) != -1:
+                return None
+        elif ledger_index != "validated":
+            return None
+        return f"{method}:{json.dumps(params, sort_keys=True, default=str)}"
+
+
+_caches: Dict[str, LedgerCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cached_client(url: Optional[str] = None) -> LedgerCache:
+    """
+    Process-wide ledger-aware cache in front of rpc_pool.get_client(url).
+    Follows XRPL_WS_URL's ledger stream when set, else probes once per second.
+    """
+    client = get_client(url)
+    cache = _caches.get(client.url)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(client.url)
+            if cache is None:
+                tracker = LedgerTracker(client, ws_url=os.getenv("XRPL_WS_URL"))
+                cache = _caches[client.url] = LedgerCache(
+                    client, maxsize=int(os.getenv("XRPL_CACHE_SIZE", "1024")), tracker=tracker)
+    return cache
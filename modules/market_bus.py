@@ -0,0 +1,369 @@
+# ~/governor_ai/modules/market_bus.py
+"""
+Shared-memory event bus between Governor processes.
+- One channel = one memory-mapped ring of fixed-size records in /dev/shm
+  (MARKET_BUS_DIR), written by exactly one process (flock on the file) and
+  read by any number of readers, each with its own cursor.
+- Record kinds: BOOK_TOP (bid, ask, bid size, ask size), FILL (side,
+  qty, price) and HEARTBEAT (free-form values), tagged with a short string
+  (pair, agent name).
+- Lock-free: the header holds the last published sequence number (one
+  aligned 8-byte store/load); every record carries its own sequence and a
+  CRC32 over sequence + payload. Python has no memory barriers, so instead
+  of relying on store order (x86 keeps it, ARM does not) a reader copies
+  the slot once and accepts it only if sequence and CRC match: a record
+  that is not visible yet, half-written or torn is retried, and one the
+  writer has lapped is counted as an overrun. Never returned torn.
+- Readers spin briefly, then back off to short sleeps while idle (wait()).
+
+  w = get_writer("arbitrage"); w.book_top("USD", 0.5123, 0.5131)
+  r = BusReader("arbitrage"); for ev in r.wait(1.0): ...
+  python -m modules.market_bus arbitrage       # tail a channel
+"""
+
+import fcntl
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import namedtuple
+from typing import Optional, Dict, List, Tuple
+
+BUS_DIR = os.getenv("MARKET_BUS_DIR", "/dev/shm" if os.path.isdir("/dev/shm") else "./run")
+BUS_CAPACITY = int(os.getenv("MARKET_BUS_CAPACITY", "65536"))  # records per channel
+
+BOOK_TOP, FILL, HEARTBEAT = 1, 2, 3
+KIND_NAMES = {BOOK_TOP: "book_top", FILL: "fill", HEARTBEAT: "heartbeat"}
+FLAG_SIM = 1  # FILL: simulated / dry-run
+
+MAGIC = b"GOVBUS02"
+# magic, record size, capacity, write seq, writer pid, created
+HEADER = struct.Struct("<8sIIQId")
+HEADER_SIZE = 64
+SEQ_OFFSET = 16  # write seq (8-aligned)
+PID_OFFSET = 24
+# seq, ts, kind, side, flags, pid, tag, 4 values, crc32 of everything before it
+RECORD = struct.Struct("<QdBbHI16s4dI4x")
+BODY = struct.Struct("<QdBbHI16s4d")
+# Native "Q" is a single memcpy (one aligned 8-byte access); "<Q" goes byte by byte
+SLOT_SEQ = struct.Struct("Q")
+
+Event = namedtuple("Event", "seq ts kind side flags pid tag values")
+
+
+def bus_path(channel: str) -> str:
+    return os.path.join(BUS_DIR, f"governor_ai.{channel}.bus")
+
+
+class BusWriter:
+    """
+    The single producer of a channel.
+    - Reuses an existing ring with the same geometry and keeps counting from
+      its sequence, so readers survive a writer restart; otherwise replaces it.
+    - A second writer on the same channel gets RuntimeError.
+    - Thread-safe within the process (one lock around publish).
+    """
+
+    def __init__(self, channel: str, capacity: int = BUS_CAPACITY):
+        self.channel = channel
+        self.path = bus_path(channel)
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            raise RuntimeError(f"market bus channel {channel!r} already has a writer")
+        size = HEADER_SIZE + capacity * RECORD.size
+        if not self._compatible(fd, size):
+            # New ring under a new inode; readers of the old one notice and reopen
+            os.close(fd)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            fd = os.open(tmp, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            os.ftruncate(fd, size)
+            header = HEADER.pack(MAGIC, RECORD.size, capacity, 0, 0, time.time())
+            os.pwrite(fd, header, 0)
+            os.replace(tmp, self.path)
+        self._fd = fd
+        self._mm = mmap.mmap(fd, size)
+        self._seq = SLOT_SEQ.unpack_from(self._mm, SEQ_OFFSET)[0]
+        self._pid = os.getpid()
+        struct.pack_into("<I", self._mm, PID_OFFSET, self._pid)
+
+    @staticmethod
+    def _compatible(fd: int, size: int) -> bool:
+        if os.fstat(fd).st_size != size:
+            return False
+        magic, rec_size, _, _, _, _ = HEADER.unpack(os.pread(fd, HEADER.size, 0))
+        return magic == MAGIC and rec_size == RECORD.size
+
+    def publish(self, kind: int, tag: str = "", values=(), side: int = 0, flags: int = 0,
+                ts: Optional[float] = None) -> int:
+        """
+        Appends one record; returns its sequence number. values: up to 4 floats.
+        """
+        vals = tuple(values)[:4]
+        vals += (0.0,) * (4 - len(vals))
+        tag_b = tag.encode()[:16]
+        with self._lock:
+            seq = self._seq + 1
+            off = HEADER_SIZE + (seq % self.capacity) * RECORD.size
+            body = BODY.pack(seq, time.time() if ts is None else ts, kind, side, flags, self._pid, tag_b, *vals)
+            # Record (self-validating via its CRC), then the header
+            self._mm[off:off + RECORD.size] = body + struct.pack("<I4x", zlib.crc32(body))
+            SLOT_SEQ.pack_into(self._mm, SEQ_OFFSET, seq)
+            self._seq = seq
+        return seq
+
+    def book_top(self, tag: str, bid: float, ask: float, bid_size: float = 0.0, ask_size: float = 0.0) -> int:
+        return self.publish(BOOK_TOP, tag, (bid, ask, bid_size, ask_size))
+
+    def fill(self, tag: str, side: int, qty: float, price: float, sim: bool = False) -> int:
+        """
+        side: +1 buy, -1 sell (XRP).
+        """
+        return self.publish(FILL, tag, (qty, price), side=side, flags=FLAG_SIM if sim else 0)
+
+    def heartbeat(self, tag: str, *values: float) -> int:
+        return self.publish(HEARTBEAT, tag, values)
+
+    @property
+    def seq(self) -> int:
+        return self._seq
+
+    def close(self):
+        with self._lock:
+            if self._mm is not None:
+                self._mm.close()
+                os.close(self._fd)  # releases the flock
+                self._mm = None
+
+
+class BusReader:
+    """
+    One consumer cursor on a channel.
+    - start="latest" skips history; "oldest" replays what is still in the ring.
+    - poll() returns every record published since the last call (at most
+      max_records); records overwritten before they were read are counted
+      in .overruns and skipped.
+    - .latest keeps the newest event per (kind, tag), e.g. last heartbeat.
+    - Reopens the file when the writer replaced it (new inode).
+    """
+
+    def __init__(self, channel: str, start: str = "latest", spin_secs: float = 50e-6,
+                 max_sleep: float = 0.001):
+        self.channel = channel
+        self.path = bus_path(channel)
+        self.start = start
+        self.spin_secs = spin_secs
+        self.max_sleep = max_sleep
+        self.overruns = 0
+        self.received = 0
+        self.latest: Dict[Tuple[int, str], Event] = {}
+        self._mm = None
+        self._ino = None
+        self._capacity = 0
+        self._next: Optional[int] = None  # next sequence to read
+        self._checked = 0.0
+
+    def is_open(self) -> bool:
+        return self._mm is not None or self._open()
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def write_seq(self) -> int:
+        return SLOT_SEQ.unpack_from(self._mm, SEQ_OFFSET)[0] if self.is_open() else 0
+
+    def writer_pid(self) -> Optional[int]:
+        if not self.is_open():
+            return None
+        return struct.unpack_from("<I", self._mm, PID_OFFSET)[0] or None
+
+    def lag(self) -> int:
+        return max(0, self.write_seq() - self._next + 1) if self.is_open() else 0
+
+    def poll(self, max_records: Optional[int] = None) -> List[Event]:
+        now = time.monotonic()
+        if now - self._checked >= 1.0:
+            self._checked = now
+            self._reopen_if_replaced()
+        if self._mm is None and not self._open():
+            return []
+        mm, cap, size = self._mm, self._capacity, RECORD.size
+        head = SLOT_SEQ.unpack_from(mm, SEQ_OFFSET)[0]
+        if head < self._next - 1:
+            # Sequence went backwards (ring recreated in place): start over
+            self._next = max(1, head - cap + 1)
+        if head - self._next + 1 > cap:
+            lost = head - cap + 1 - self._next
+            self.overruns += lost
+            self._next = head - cap + 1
+        end = head if max_records is None else min(head, self._next + max_records - 1)
+
+        out = []
+        latest = self.latest
+        seq = self._next
+        body_size = BODY.size
+        while seq <= end:
+            off = HEADER_SIZE + (seq % cap) * size
+            raw = mm[off:off + size]  # one copy; validated below
+            rec = RECORD.unpack(raw)
+            if rec[0] != seq or rec[11] != zlib.crc32(raw[:body_size]):
+                head = SLOT_SEQ.unpack_from(mm, SEQ_OFFSET)[0]
+                if head - seq < cap:
+                    break  # not visible yet or mid-write: retry on the next poll
+                # Lapped by the writer while we were behind: resync near the head
+                skip_to = head - cap + 1
+                self.overruns += skip_to - seq
+                seq = skip_to
+                continue
+            ev = Event(seq, rec[1], rec[2], rec[3], rec[4], rec[5], rec[6].rstrip(b"\0").decode(), rec[7:11])
+            out.append(ev)
+            latest[(ev.kind, ev.tag)] = ev
+            seq += 1
+        self._next = seq
+        self.received += len(out)
+        return out
+
+    def wait(self, timeout: Optional[float] = None, max_records: Optional[int] = None) -> List[Event]:
+        """
+        poll(), blocking until at least one record arrives or timeout passes.
+        Spins for spin_secs, then sleeps with doubling intervals up to max_sleep.
+        """
+        events = self.poll(max_records)
+        if events:
+            return events
+        t0 = time.monotonic()
+        deadline = None if timeout is None else t0 + timeout
+        spin_until = t0 + self.spin_secs
+        nap = 0.0
+        while True:
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                return []
+            if self._mm is not None and SLOT_SEQ.unpack_from(self._mm, SEQ_OFFSET)[0] >= self._next:
+                events = self.poll(max_records)
+                if events:
+                    return events
+            if now < spin_until:
+                continue
+            nap = min(self.max_sleep, nap * 2 or 20e-6)
+            time.sleep(nap if deadline is None else min(nap, max(0.0, deadline - now)))
+            if self._mm is None:
+                self._open()
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    def _open(self) -> bool:
+        try:
+            fd = os.open(self.path, os.O_RDONLY)
+        except FileNotFoundError:
+            return False
+        try:
+            st = os.fstat(fd)
+            if st.st_size < HEADER_SIZE:
+                return False
+            magic, rec_size, cap, head, _, _ = HEADER.unpack(os.pread(fd, HEADER.size, 0))
+            if magic != MAGIC or rec_size != RECORD.size or st.st_size < HEADER_SIZE + cap * rec_size:
+                return False
+            self._mm = mmap.mmap(fd, HEADER_SIZE + cap * rec_size, prot=mmap.PROT_READ)
+        finally:
+            os.close(fd)
+        self._ino = st.st_ino
+        self._capacity = cap
+        if self._next is None:
+            self._next = head + 1 if self.start == "latest" else max(1, head - cap + 1)
+        return True
+
+    def _reopen_if_replaced(self):
+        if self._mm is None:
+            return
+        try:
+            ino = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            return
+        if ino != self._ino:
+            # The writer started a new ring: everything in it is new to us
+            self.close()
+            start, self.start, self._next = self.start, "oldest", None
+            self._open()
+            self.start = start
+
+
+_writers: Dict[str, BusWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(channel: str) -> BusWriter:
+    """
+    Process-wide writer per channel (the channel's single producer).
+    """
+    writer = _writers.get(channel)
+    if writer is None:
+        with _writers_lock:
+            writer = _writers.get(channel)
+            if writer is None:
+                writer = BusWriter(channel)
+                _writers[channel] = writer
+    return writer
+
+
+def channel_stats(channel: str, reader: Optional[BusReader] = None) -> Dict[str, object]:
+    """
+    Header view of a channel plus, with a reader, its newest event per (kind, tag).
+    """
+    reader = reader or BusReader(channel)
+    if not reader.is_open():
+        return {"channel": channel, "exists": False}
+    reader.poll()
+    now = time.time()
+    pid = reader.writer_pid()
+    alive = False
+    if pid:
+        try:
+            os.kill(pid, 0)
+            alive = True
+        except PermissionError:
+            alive = True
+        except OSError:
+            pass
+    return {
+        "channel": channel,
+        "exists": True,
+        "path": reader.path,
+        "seq": reader.write_seq(),
+        "capacity": reader.capacity,
+        "writer_pid": pid,
+        "writer_alive": alive,
+        "overruns": reader.overruns,
+        "latest": {f"{KIND_NAMES.get(k, k)}:{tag}": {"seq": ev.seq, "age_secs": round(now - ev.ts, 3),
+                                                     "side": ev.side, "values": list(ev.values)}
+                   for (k, tag), ev in sorted(reader.latest.items())},
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    r = BusReader(sys.argv[1] if len(sys.argv) > 1 else "arbitrage",
+                  start=sys.argv[2] if len(sys.argv) > 2 else "latest")
+    print(f"[MarketBus] Tailing {r.path} (Ctrl-C to stop)")
+    try:
+        while True:
+            for ev in r.wait(1.0):
+                print(f"{ev.seq:>10} {KIND_NAMES.get(ev.kind, ev.kind):<9} {ev.tag:<16} side={ev.side:+d} "
+                      f"flags={ev.flags} pid={ev.pid} {' '.join(f'{v:.6f}' for v in ev.values)} "
+                      f"(+{(time.time() - ev.ts) * 1e6:.0f}us)")
+    except KeyboardInterrupt:
+        print(f"[MarketBus] received={r.received} overruns={r.overruns}")
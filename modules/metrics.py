@@ -0,0 +1,239 @@
+# ~/governor_ai/modules/metrics.py
+"""
+In-process metrics: counters, gauges and log-linear latency histograms,
+rendered in Prometheus text format for /metrics.
+
+  _RPC = metrics.histogram("xrpl_rpc_seconds", "JSON-RPC round trip", method="ledger")
+  with metrics.timer("arb_decision_seconds"):
+      ...
+  @metrics.timed("receipts_write_seconds")
+  def write(...): ...
+
+Histograms use fixed log-spaced buckets (8 per power of two, ~9% relative
+error, 1us..~1000s), so observe() is one bisect plus an increment and the
+memory cost is constant no matter how many samples arrive. Metrics are per
+process: under SERVE_MODE=prefork each worker reports its own.
+"""
+
+import bisect
+import functools
+import threading
+import time
+from typing import Dict, Tuple, List, Optional
+
+# Boundaries exported as Prometheus "le" buckets (seconds)
+EXPORT_BOUNDS = [0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0]
+
+# Fine buckets: 2^(k/8) microseconds, plus the export boundaries so they are exact
+_FINE_BOUNDS = sorted(set([1e-6 * 2 ** (k / 8.0) for k in range(8 * 30)] + EXPORT_BOUNDS))
+_EXPORT_INDEX = [_FINE_BOUNDS.index(b) for b in EXPORT_BOUNDS]
+
+
+def _label_str(labels: Tuple[Tuple[str, str], ...], extra: str = "") -> str:
+    parts = [f'{k}="{_escape(v)}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(v) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, labels):
+        self.name = name
+        self.labels = labels
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, n: float = 1.0):
+        with self._lock:
+            self.value += n
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_label_str(self.labels)} {self.value:g}"]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, v: float):
+        self.value = v
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, labels):
+        self.name = name
+        self.labels = labels
+        self.counts = [0] * (len(_FINE_BOUNDS) + 1)  # last slot: above the top bound
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        i = bisect.bisect_left(_FINE_BOUNDS, seconds)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.sum += seconds
+
+    def time(self) -> "_Timer":
+        return _Timer(self)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Upper bound of the bucket holding the q-quantile (seconds), or None if empty.
+        """
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                return _FINE_BOUNDS[i] if i < len(_FINE_BOUNDS) else float("inf")
+        return float("inf")
+
+    def render(self) -> List[str]:
+        with self._lock:
+            counts, count, total = list(self.counts), self.count, self.sum
+        lines, cumulative, j = [], 0, 0
+        for bound, idx in zip(EXPORT_BOUNDS, _EXPORT_INDEX):
+            cumulative += sum(counts[j:idx + 1])
+            j = idx + 1
+            le = 'le="%g"' % bound
+            lines.append(f"{self.name}_bucket{_label_str(self.labels, le)} {cumulative}")
+        inf = 'le="+Inf"'
+        lines.append(f"{self.name}_bucket{_label_str(self.labels, inf)} {count}")
+        lines.append(f"{self.name}_sum{_label_str(self.labels)} {total:.9g}")
+        lines.append(f"{self.name}_count{_label_str(self.labels)} {count}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("hist", "t0")
+
+    def __init__(self, hist: Histogram):
+        self.hist = hist
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.observe(time.perf_counter() - self.t0)
+        return False
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[Tuple[str, tuple], object] = {}
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, cls, name: str, help: str, labels: Dict[str, str]):
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(key)
+                if metric is None:
+                    known = self._help.get(name)
+                    if known and known[0] != cls.kind:
+                        raise ValueError(f"metric {name} already registered as a {known[0]}")
+                    if not known or (help and not known[1]):
+                        self._help[name] = (cls.kind, help)
+                    metric = self._metrics[key] = cls(name, key[1])
+        return metric
+
+    def render(self) -> str:
+        by_name: Dict[str, list] = {}
+        for (name, _), metric in list(self._metrics.items()):
+            by_name.setdefault(name, []).append(metric)
+        out = []
+        for name in sorted(by_name):
+            kind, help = self._help[name]
+            if help:
+                out.append(f"# HELP {name} {help}")
+            out.append(f"# TYPE {name} {kind}")
+            for metric in by_name[name]:
+                out.extend(metric.render())
+        return "\n".join(out) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, help: str = "", **labels) -> Counter:
+    return REGISTRY.get(Counter, name, help, labels)
+
+
+def gauge(name: str, help: str = "", **labels) -> Gauge:
+    return REGISTRY.get(Gauge, name, help, labels)
+
+
+def histogram(name: str, help: str = "", **labels) -> Histogram:
+    return REGISTRY.get(Histogram, name, help, labels)
+
+
+def timer(name: str, help: str = "", **labels) -> _Timer:
+    """
+    Context manager timing its block into histogram name{labels}.
+    """
+    return _Timer(histogram(name, help, **labels))
+
+
+def timed(name: str, help: str = "", **labels):
+    """
+    Decorator timing every call into histogram name{labels}.
+    """
+    hist = histogram(name, help, **labels)
+
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                hist.observe(time.perf_counter() - t0)
+        return inner
+    return wrap
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+def instrument_app(app, service: str):
+    """
+    Adds GET /metrics to a Flask app and times every request into
+    http_request_seconds{service, endpoint}.
+    """
+    from flask import Response, g, request
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_t0 = time.perf_counter()
+
+    @app.after_request
+    def _stop_timer(response):
+        t0 = getattr(g, "_metrics_t0", None)
+        if t0 is not None:
+            endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+            histogram("http_request_seconds", "Flask request handling time",
+                      service=service, endpoint=endpoint).observe(time.perf_counter() - t0)
+            counter("http_requests_total", "Flask requests by status", service=service,
+                    status=str(response.status_code)).inc()
+        return response
+
+    @app.route("/metrics")
+    def metrics():
+        return Response(render(), mimetype="text/plain; version=0.0.4")
+
+    return app
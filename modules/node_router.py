@@ -0,0 +1,246 @@
+# ~/governor_ai/modules/node_router.py
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Optional, Callable, Dict, Any, List
+
+from xrpl.models.requests.request import Request
+from xrpl.models.response import Response
+
+from modules.rpc_pool import PooledJsonRpcClient
+
+# rippled answers these when the node itself is unhealthy, not the request
+_NODE_ERRORS = {"tooBusy", "noNetwork", "noCurrent", "noClosed", "amendmentBlocked", "slowDown"}
+
+
+class Endpoint:
+    def __init__(self, url: str):
+        self.url = url
+        self.ewma_ms: Optional[float] = None
+        self.failures = 0            # consecutive
+        self.ejections = 0           # consecutive, drives the cooldown
+        self.ejected_until = 0.0
+        self.requests = 0
+        self.errors = 0
+
+    def admitted(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "ewma_ms": round(self.ewma_ms, 2) if self.ewma_ms is not None else None,
+            "admitted": self.admitted(time.monotonic()),
+            "failures": self.failures,
+            "requests": self.requests,
+            "errors": self.errors,
+        }
+
+
+class NodeRouter:
+    """
+    Picks the fastest healthy endpoint for each call.
+    - EWMA of observed latency per endpoint (passive timings, or seeded from
+      sync_network pings via from_registry()); unmeasured endpoints go first once.
+    - Hedging: if the chosen endpoint hasn't answered within
+      max(hedge_min_ms, hedge_factor * its EWMA), the same call goes to the
+      next-best endpoint too and the first success wins.
+    - eject_after consecutive failures eject an endpoint for eject_secs
+      (doubling per repeat, up to max_eject_secs); afterwards it is readmitted
+      on probation and one more failure ejects it again.
+    - A small explore share of calls goes to a random other endpoint so the
+      EWMAs of standbys stay current.
+    """
+
+    def __init__(self,
+                 urls: List[str],
+                 alpha: float = 0.3,
+                 hedge: bool = True,
+                 hedge_factor: float = 2.0,
+                 hedge_min_ms: float = 50.0,
+                 eject_after: int = 3,
+                 eject_secs: float = 5.0,
+                 max_eject_secs: float = 120.0,
+                 explore: float = 0.02,
+                 max_workers: int = 32):
+        if not urls:
+            raise ValueError("NodeRouter needs at least one endpoint")
+        self.endpoints = [Endpoint(u) for u in dict.fromkeys(urls)]
+        self.alpha = alpha
+        self.hedge = hedge and len(self.endpoints) > 1
+        self.hedge_factor = hedge_factor
+        self.hedge_min_ms = hedge_min_ms
+        self.eject_after = eject_after
+        self.eject_secs = eject_secs
+        self.max_eject_secs = max_eject_secs
+        self.explore = explore
+        self.hedges = 0
+        self.rerouted = 0
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="node-router")
+
+    @classmethod
+    def from_registry(cls, path: str, url_key: str = "url", **kwargs) -> "NodeRouter":
+        """
+        Router over registry.json nodes, seeded with their last sync_network
+        status and p50 latency (offline/unresponsive nodes start ejected).
+        """
+        with open(path, "r") as f:
+            nodes = json.load(f).get("nodes", [])
+        router = cls([n[url_key] for n in nodes], **kwargs)
+        for node in nodes:
+            if node.get("status") == "active":
+                router.observe(node[url_key], node.get("latency_p50_ms"), ok=True)
+            elif node.get("status") in ("offline", "unresponsive"):
+                router.eject(node[url_key])
+        return router
+
+    # ---- Health bookkeeping -------------------------------------------------
+
+    def observe(self, url: str, latency_ms: Optional[float], ok: bool = True):
+        ep = self._endpoint(url)
+        if ep is None:
+            return
+        with self._lock:
+            ep.requests += 1
+            # A fast failure (connection refused) must not make a node look fast
+            if latency_ms is not None and (ok or (ep.ewma_ms is not None and latency_ms > ep.ewma_ms)):
+                ep.ewma_ms = latency_ms if ep.ewma_ms is None else \
+                    (1.0 - self.alpha) * ep.ewma_ms + self.alpha * latency_ms
+            if ok:
+                ep.failures = 0
+                ep.ejections = 0
+                return
+            ep.errors += 1
+            ep.failures += 1
+            # Probation: a readmitted endpoint is ejected again on its first failure
+            if ep.failures >= self.eject_after or ep.ejections:
+                self._eject(ep)
+
+    def eject(self, url: str):
+        ep = self._endpoint(url)
+        if ep is not None:
+            with self._lock:
+                self._eject(ep)
+
+    def _eject(self, ep: Endpoint):
+        cooldown = min(self.max_eject_secs, self.eject_secs * (2 ** ep.ejections))
+        ep.ejections += 1
+        ep.failures = 0
+        ep.ejected_until = time.monotonic() + cooldown
+        print(f"[NodeRouter] Ejected {ep.url} for {cooldown:.0f}s")
+
+    def _endpoint(self, url: str) -> Optional[Endpoint]:
+        for ep in self.endpoints:
+            if ep.url == url:
+                return ep
+        return None
+
+    def ranked(self) -> List[Endpoint]:
+        """
+        Admitted endpoints fastest first (unmeasured first of all); if every
+        endpoint is ejected, the one readmitted soonest.
+        """
+        now = time.monotonic()
+        with self._lock:
+            live = [ep for ep in self.endpoints if ep.admitted(now)]
+            if not live:
+                return [min(self.endpoints, key=lambda ep: ep.ejected_until)]
+            live.sort(key=lambda ep: -1.0 if ep.ewma_ms is None else ep.ewma_ms)
+        if len(live) > 1 and random.random() < self.explore:
+            i = random.randrange(1, len(live))
+            live[0], live[i] = live[i], live[0]
+        return live
+
+    def best(self) -> str:
+        return self.ranked()[0].url
+
+    # ---- Calls --------------------------------------------------------------
+
+    def call(self, fn: Callable[[str], Any], is_failure: Optional[Callable[[Any], bool]] = None):
+        """
+        Runs fn(url) on the best endpoint, hedging to the next one when it is
+        slow and failing over on errors. is_failure(result) flags results that
+        mean the node (not the request) is unhealthy.
+        """
+        candidates = self.ranked()
+        last_error: Optional[BaseException] = None
+        inflight: Dict[Any, Endpoint] = {}
+        i = 0
+
+        def launch(ep: Endpoint):
+            inflight[self._pool.submit(self._timed, fn, ep.url, is_failure)] = ep
+
+        launch(candidates[i])
+        while inflight:
+            primary = candidates[i]
+            timeout = None
+            if self.hedge and i + 1 < len(candidates) and len(inflight) == 1:
+                timeout = max(self.hedge_min_ms, self.hedge_factor * (primary.ewma_ms or self.hedge_min_ms)) / 1000.0
+            done, _ = wait(list(inflight), timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # Primary is slow: hedge to the next-best endpoint
+                i += 1
+                self.hedges += 1
+                launch(candidates[i])
+                continue
+            for fut in done:
+                ep = inflight.pop(fut)
+                try:
+                    result = fut.result()
+                except Exception as e:
+                    last_error = e
+                    continue
+                if ep is not candidates[0]:
+                    self.rerouted += 1
+                return result
+            if not inflight and i + 1 < len(candidates):
+                # Everything in flight failed: fail over
+                i += 1
+                launch(candidates[i])
+        raise last_error or RuntimeError("No endpoint available")
+
+    def _timed(self, fn, url: str, is_failure):
+        t0 = time.perf_counter()
+        try:
+            result = fn(url)
+        except Exception:
+            self.observe(url, (time.perf_counter() - t0) * 1000.0, ok=False)
+            raise
+        latency_ms = (time.perf_counter() - t0) * 1000.0
+        if is_failure is not None and is_failure(result):
+            self.observe(url, latency_ms, ok=False)
+            raise RuntimeError(f"{url} unhealthy")
+        self.observe(url, latency_ms, ok=True)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "endpoints": [ep.to_dict() for ep in self.endpoints],
+            "hedges": self.hedges,
+            "rerouted": self.rerouted,
+        }
+
+
+class RoutedJsonRpcClient(PooledJsonRpcClient):
+    """
+    PooledJsonRpcClient over several rippled endpoints chosen by a NodeRouter.
+    Per-endpoint retries are off: the router fails over (and hedges) instead.
+    """
+
+    def __init__(self, urls: List[str], router: Optional[NodeRouter] = None, **kwargs):
+        super().__init__(urls[0], retries=0, **kwargs)
+        self.url = ",".join(urls)  # cache key for get_cached_client & co.
+        self.router = router or NodeRouter(urls)
+
+    def _post(self, request: Request, timeout: float, url: Optional[str] = None) -> Response:
+        if url is not None:
+            return super()._post(request, timeout, url)
+        return self.router.call(lambda u: super(RoutedJsonRpcClient, self)._post(request, timeout, u),
+                                is_failure=lambda resp: resp.result.get("error") in _NODE_ERRORS)
+
+    def close(self):
+        super().close()
+        self.router._pool.shutdown(wait=False)
@@ -0,0 +1,255 @@
+# ~/governor_ai/modules/order_pipeline.py
+import itertools
+import queue
+import threading
+import time
+from typing import Optional, Callable, Dict, Any
+
+from xrpl.models.requests import Tx
+from xrpl.transaction import submit
+
+from modules import metrics
+from modules.autofill import AutofillManager, get_autofill_manager
+
+_STOP = object()
+
+# Preliminary results that still end up in a validated ledger (or may, for ter*)
+_IN_FLIGHT_PREFIXES = ("tes", "tec", "ter")
+
+
+class OrderTicket:
+    """
+    Handle for one transaction handed to OrderPipeline.submit().
+    - status: "queued" -> "submitted" -> "validated" | "failed" | "expired"
+    - result: final engine result (meta TransactionResult when validated).
+    - meta / fee_drops: validated transaction metadata and fee, for callers
+      that need what actually executed (e.g. balance changes of an offer).
+    - wait(timeout) blocks until the outcome is known.
+    """
+
+    def __init__(self, ticket_id: int, tx, on_submitted=None, on_done=None):
+        self.id = ticket_id
+        self.tx = tx
+        self.status = "queued"
+        self.tx_hash: Optional[str] = None
+        self.sequence: Optional[int] = None
+        self.last_ledger_sequence: Optional[int] = None
+        self.engine_result: Optional[str] = None
+        self.result: Optional[str] = None
+        self.ledger_index: Optional[int] = None
+        self.meta: Optional[Dict[str, Any]] = None
+        self.fee_drops: Optional[int] = None
+        self.error: Optional[str] = None
+        self.created_at = time.perf_counter()
+        self.submitted_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._on_submitted = on_submitted
+        self._on_done = on_done
+        self._done = threading.Event()
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def submit_ms(self) -> float:
+        return ((self.submitted_at or time.perf_counter()) - self.created_at) * 1000.0
+
+    def total_ms(self) -> float:
+        return ((self.finished_at or time.perf_counter()) - self.created_at) * 1000.0
+
+    def _finish(self, status: str, result: Optional[str] = None, error: Optional[str] = None):
+        self.status = status
+        self.result = result
+        self.error = error
+        self.finished_at = time.perf_counter()
+        metrics.histogram("order_settle_seconds", "Queued to final outcome",
+                          status=status).observe(self.finished_at - self.created_at)
+        self._done.set()
+        _call(self._on_done, self)
+
+    def __repr__(self):
+        return f"OrderTicket(id={self.id}, status={self.status}, seq={self.sequence}, hash={self.tx_hash})"
+
+
+class OrderPipeline:
+    """
+    Non-blocking transaction submission for one wallet.
+    - submit() returns an OrderTicket at once; a submitter thread signs it via
+      the wallet's AutofillManager (local Sequence/Fee/LastLedgerSequence, no
+      round-trips) and submits without waiting.
+    - A tracker thread checks in-flight hashes each time the validated ledger
+      advances and settles them as validated/failed, or expired once past
+      LastLedgerSequence.
+    - Any submission that does not consume its sequence (tef/tem/tel, expiry)
+      resyncs the AutofillManager.
+    - At most max_in_flight transactions wait for validation at once.
+    - The submitter thread warms the AutofillManager first, so even the first
+      order is signed without a round-trip.
+    """
+
+    def __init__(self,
+                 client,
+                 wallet,
+                 max_in_flight: int = 16,
+                 autofill: Optional[AutofillManager] = None,
+                 poll_interval: float = 0.5):
+        self.client = client
+        self.wallet = wallet
+        self.autofill = autofill or get_autofill_manager(client, wallet)
+        self.tracker = self.autofill.tracker
+        self.poll_interval = poll_interval
+        self.submitted = 0
+
+        self._ids = itertools.count(1)
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._pending: Dict[str, OrderTicket] = {}
+        self._pending_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._stopped = threading.Event()
+        self._submitter = threading.Thread(target=self._submit_loop, name="order-submitter", daemon=True)
+        self._tracker = threading.Thread(target=self._track_loop, name="order-tracker", daemon=True)
+        self._submitter.start()
+        self._tracker.start()
+
+    # ---- Public API ---------------------------------------------------------
+
+    def submit(self, tx, on_submitted: Optional[Callable[[OrderTicket], None]] = None,
+               on_done: Optional[Callable[[OrderTicket], None]] = None) -> OrderTicket:
+        """
+        Queues an unsigned transaction (no Sequence) and returns its ticket.
+        on_submitted runs once rippled has the transaction; on_done once the
+        outcome is final. Both run on pipeline threads and must not block.
+        """
+        ticket = OrderTicket(next(self._ids), tx, on_submitted, on_done)
+        self._queue.put(ticket)
+        return ticket
+
+    def in_flight(self) -> int:
+        with self._pending_lock:
+            return len(self._pending)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize(),
+            "in_flight": self.in_flight(),
+            "submitted": self.submitted,
+            "autofill": self.autofill.stats(),
+        }
+
+    def close(self):
+        self._stopped.set()
+        self._queue.put(_STOP)
+        self._submitter.join(timeout=5.0)
+        self._tracker.join(timeout=5.0)
+
+    # ---- Submitter ----------------------------------------------------------
+
+    def _submit_loop(self):
+        try:
+            self.autofill.warm()
+        except Exception as e:
+            print(f"[OrderPipeline] Autofill warm-up failed (first order fetches instead): {e}")
+        while True:
+            ticket = self._queue.get()
+            if ticket is _STOP:
+                return
+            self._slots.acquire()
+            try:
+                sent = self._send(ticket)
+                if sent is False:
+                    sent = self._send(ticket, retry=True)
+                if not sent:
+                    self._slots.release()
+            except Exception as e:
+                self.autofill.resync()
+                self._slots.release()
+                ticket._finish("failed", error=str(e))
+                print(f"[OrderPipeline] Submit failed for ticket {ticket.id}: {e}")
+
+    def _send(self, ticket: OrderTicket, retry: bool = False) -> Optional[bool]:
+        """
+        Signs and submits one ticket. Returns True when it is in flight, False
+        when the sequence was stale and a retry is worthwhile, None when failed.
+        """
+        with metrics.timer("order_sign_seconds", "Local autofill + signing"):
+            signed = self.autofill.sign(ticket.tx)
+        ticket.sequence = signed.sequence
+        ticket.last_ledger_sequence = signed.last_ledger_sequence
+        ticket.tx_hash = signed.get_hash()
+
+        with metrics.timer("order_submit_seconds", "submit round trip"):
+            resp = submit(signed, self.client)
+        ticket.engine_result = resp.result.get("engine_result")
+        ticket.submitted_at = time.perf_counter()
+        metrics.histogram("order_to_wire_seconds", "Queued to rippled accepted/rejected").observe(
+            ticket.submitted_at - ticket.created_at)
+        metrics.counter("order_submits_total", "Submissions by preliminary result class",
+                        result=(ticket.engine_result or "none")[:3]).inc()
+        self.submitted += 1
+
+        if ticket.engine_result and ticket.engine_result.startswith(_IN_FLIGHT_PREFIXES):
+            ticket.status = "submitted"
+            _call(ticket._on_submitted, ticket)
+            with self._pending_lock:
+                self._pending[ticket.tx_hash] = ticket
+            return True
+
+        # Sequence not consumed: refetch before the next allocation
+        self.autofill.resync()
+        if ticket.engine_result == "tefPAST_SEQ" and not retry:
+            return False
+        ticket._finish("failed", result=ticket.engine_result,
+                       error=resp.result.get("engine_result_message"))
+        return None
+
+    # ---- Tracker ------------------------------------------------------------
+
+    def _track_loop(self):
+        checked: Optional[int] = None
+        while not self._stopped.wait(self.poll_interval):
+            if not self.in_flight():
+                continue
+            ledger = self.tracker.current()
+            if ledger is None or ledger == checked:
+                continue
+            checked = ledger
+            with self._pending_lock:
+                tickets = list(self._pending.values())
+            for ticket in tickets:
+                try:
+                    self._check(ticket, ledger)
+                except Exception as e:
+                    print(f"[OrderPipeline] Tx lookup failed for {ticket.tx_hash}: {e}")
+
+    def _check(self, ticket: OrderTicket, validated_ledger: int):
+        resp = self.client.request(Tx(transaction=ticket.tx_hash))
+        result = resp.result
+        if resp.is_successful() and result.get("validated"):
+            code = (result.get("meta") or {}).get("TransactionResult")
+            ticket.ledger_index = result.get("ledger_index")
+            ticket.meta = result.get("meta")
+            fee = result.get("Fee", (result.get("tx_json") or {}).get("Fee"))
+            ticket.fee_drops = int(fee) if fee is not None else None
+            self._settle(ticket, "validated" if code == "tesSUCCESS" else "failed", code)
+        elif ticket.last_ledger_sequence and validated_ledger > ticket.last_ledger_sequence:
+            # Can never validate now; its sequence was never consumed
+            self.autofill.resync()
+            self._settle(ticket, "expired", ticket.engine_result)
+
+    def _settle(self, ticket: OrderTicket, status: str, result: Optional[str]):
+        with self._pending_lock:
+            if self._pending.pop(ticket.tx_hash, None) is None:
+                return
+        self._slots.release()
+        ticket._finish(status, result=result)
+
+
+def _call(fn, ticket):
+    if fn is None:
+        return
+    try:
+        fn(ticket)
+    except Exception as e:
+        print(f"[OrderPipeline] Callback failed for ticket {ticket.id}: {e}")
@@ -0,0 +1,211 @@
+# ~/governor_ai/modules/orderbook.py
+from bisect import bisect_left, bisect_right
+from typing import Optional, Tuple, Dict, Any, Iterable, List
+
+
+def offer_side(offer: Dict[str, Any], quote_currency: str, quote_issuer: str) -> Optional[str]:
+    """
+    Classifies a raw Offer ledger object for the XRP/QUOTE pair.
+    - "ask": taker gets XRP, pays QUOTE (someone selling XRP)
+    - "bid": taker gets QUOTE, pays XRP (someone buying XRP)
+    Returns None for offers on any other book.
+    """
+    gets = offer.get("TakerGets", offer.get("taker_gets"))
+    pays = offer.get("TakerPays", offer.get("taker_pays"))
+
+    def _is_quote(a) -> bool:
+        return isinstance(a, dict) and a.get("currency") == quote_currency and a.get("issuer") == quote_issuer
+
+    if isinstance(gets, str) and _is_quote(pays):
+        return "ask"
+    if _is_quote(gets) and isinstance(pays, str):
+        return "bid"
+    return None
+
+
+def parse_offer(offer: Dict[str, Any], side: str) -> Optional[Tuple[float, float]]:
+    """
+    Parses a raw Offer into (price QUOTE per 1 XRP, size in XRP), using the
+    funded amounts when rippled reports them (book snapshots include
+    taker_gets_funded). Returns None for empty or malformed offers.
+    IOU/IOU books parse the same way, with the base IOU in place of XRP.
+    """
+    gets = offer.get("taker_gets_funded", offer.get("TakerGets", offer.get("taker_gets")))
+    pays = offer.get("taker_pays_funded", offer.get("TakerPays", offer.get("taker_pays")))
+
+    def _amt(a):
+        if isinstance(a, str):
+            return float(a) / 1_000_000.0  # drops -> XRP
+        return float(a["value"])
+
+    try:
+        if side == "ask":
+            xrp, quote = _amt(gets), _amt(pays)
+        else:  # "bid"
+            xrp, quote = _amt(pays), _amt(gets)
+        if xrp <= 0 or quote <= 0:
+            return None
+        return (quote / xrp, xrp)
+    except Exception:
+        return None
+
+
+class BookSide:
+    """
+    One side of an order book as price levels in sorted arrays, best first.
+    - Offers are aggregated per price level; updates are keyed by offer id.
+    - best() is O(1); fill() and depth_within() are O(log n) over levels,
+      using prefix sums rebuilt at most once per update batch.
+    """
+
+    def __init__(self, ascending: bool):
+        self.ascending = ascending  # asks: lowest first; bids: highest first
+        self._keys = []    # sort keys (price, or -price for bids)
+        self._prices = []
+        self._sizes = []   # XRP resting at each level
+        self._offers: Dict[str, Tuple[float, float]] = {}  # offer id -> (price, xrp)
+        self._cum_xrp = None
+        self._cum_quote = None
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    def _key(self, price: float) -> float:
+        return price if self.ascending else -price
+
+    def upsert(self, offer_id: str, price: float, xrp: float):
+        self.remove(offer_id)
+        key = self._key(price)
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            self._sizes[i] += xrp
+        else:
+            self._keys.insert(i, key)
+            self._prices.insert(i, price)
+            self._sizes.insert(i, xrp)
+        self._offers[offer_id] = (price, xrp)
+        self._cum_xrp = None
+
+    def remove(self, offer_id: str):
+        old = self._offers.pop(offer_id, None)
+        if old is None:
+            return
+        price, xrp = old
+        i = bisect_left(self._keys, self._key(price))
+        if i < len(self._keys) and self._prices[i] == price:
+            self._sizes[i] -= xrp
+            if self._sizes[i] <= 1e-12:
+                del self._keys[i], self._prices[i], self._sizes[i]
+        self._cum_xrp = None
+
+    def clear(self):
+        self._keys, self._prices, self._sizes = [], [], []
+        self._offers = {}
+        self._cum_xrp = None
+
+    def copy(self) -> "BookSide":
+        other = BookSide(self.ascending)
+        other._keys = self._keys[:]
+        other._prices = self._prices[:]
+        other._sizes = self._sizes[:]
+        other._offers = dict(self._offers)
+        return other
+
+    def best(self) -> Optional[float]:
+        return self._prices[0] if self._prices else None
+
+    def levels(self, n: Optional[int] = None) -> List[Tuple[float, float]]:
+        """
+        (price, xrp) per level, best first; the top n if given.
+        """
+        return list(zip(self._prices[:n], self._sizes[:n]))
+
+    def _prefix(self):
+        if self._cum_xrp is None:
+            cum_xrp, cum_quote, x, q = [], [], 0.0, 0.0
+            for price, size in zip(self._prices, self._sizes):
+                x += size
+                q += size * price
+                cum_xrp.append(x)
+                cum_quote.append(q)
+            self._cum_xrp, self._cum_quote = cum_xrp, cum_quote
+        return self._cum_xrp, self._cum_quote
+
+    def depth(self) -> float:
+        cum_xrp, _ = self._prefix()
+        return cum_xrp[-1] if cum_xrp else 0.0
+
+    def depth_within(self, slippage_bps: float) -> float:
+        """
+        XRP available at prices no worse than best +/- slippage_bps.
+        """
+        best = self.best()
+        if best is None:
+            return 0.0
+        factor = slippage_bps / 10000.0
+        worst = best * (1.0 + factor) if self.ascending else best * (1.0 - factor)
+        j = bisect_right(self._keys, self._key(worst))
+        cum_xrp, _ = self._prefix()
+        return cum_xrp[j - 1] if j else 0.0
+
+    def fill(self, amount_xrp: float) -> Optional[Tuple[float, float]]:
+        """
+        Walks the book for amount_xrp.
+        Returns (volume-weighted price, worst level price), or None if depth is short.
+        """
+        if amount_xrp <= 0:
+            return None
+        cum_xrp, cum_quote = self._prefix()
+        j = bisect_left(cum_xrp, amount_xrp - 1e-12)
+        if j >= len(cum_xrp):
+            return None
+        prev_x = cum_xrp[j - 1] if j else 0.0
+        prev_q = cum_quote[j - 1] if j else 0.0
+        quote = prev_q + (amount_xrp - prev_x) * self._prices[j]
+        return (quote / amount_xrp, self._prices[j])
+
+
+class OrderBook:
+    """
+    XRP/QUOTE order book (prices in QUOTE per 1 XRP).
+    - asks: offers selling XRP, lowest price first
+    - bids: offers buying XRP, highest price first
+    """
+
+    def __init__(self):
+        self.asks = BookSide(ascending=True)
+        self.bids = BookSide(ascending=False)
+
+    @classmethod
+    def from_offers(cls, asks: Iterable[Dict[str, Any]], bids: Iterable[Dict[str, Any]]) -> "OrderBook":
+        book = cls()
+        for n, offer in enumerate(asks):
+            book.apply("ask", offer.get("index", f"ask-{n}"), offer)
+        for n, offer in enumerate(bids):
+            book.apply("bid", offer.get("index", f"bid-{n}"), offer)
+        return book
+
+    def side(self, side: str) -> BookSide:
+        return self.asks if side == "ask" else self.bids
+
+    def apply(self, side: str, offer_id: str, offer: Dict[str, Any]):
+        parsed = parse_offer(offer, side)
+        if parsed is None:
+            self.side(side).remove(offer_id)
+        else:
+            self.side(side).upsert(offer_id, *parsed)
+
+    def remove(self, side: str, offer_id: str):
+        self.side(side).remove(offer_id)
+
+    def copy(self) -> "OrderBook":
+        other = OrderBook()
+        other.asks = self.asks.copy()
+        other.bids = self.bids.copy()
+        return other
+
+    def best_bid_ask(self) -> Optional[Tuple[float, float]]:
+        best_bid, best_ask = self.bids.best(), self.asks.best()
+        if best_bid is None or best_ask is None:
+            return None
+        return (best_bid, best_ask)
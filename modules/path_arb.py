@@ -0,0 +1,185 @@
+# ~/governor_ai/modules/path_arb.py
+import math
+import time
+from collections import deque
+from typing import Optional, List, Dict
+
+from modules.orderbook import OrderBook
+
+
+def node_key(currency: str, issuer: Optional[str] = None) -> str:
+    """
+    Graph node name: "XRP" or "USD.rIssuer".
+    """
+    return currency if currency == "XRP" or not issuer else f"{currency}.{issuer}"
+
+
+class CurrencyGraph:
+    """
+    Currency graph for multi-hop (e.g. XRP->USD->EUR->XRP) arbitrage.
+    - Nodes are currencies; an edge src->dst carries the rate (dst per 1 src)
+      obtainable at the top of a book, weighted by -log(rate * (1 - hop cost)).
+    - A negative-weight cycle is a loop whose rates multiply to > 1.
+    - Distances from a virtual source are kept between calls; set_rate() only
+      queues the touched edge, and find_cycle() re-relaxes from there (SPFA),
+      invalidating the shortest-path subtree when a tree edge gets worse.
+    """
+
+    def __init__(self, hop_cost_bps: float = 0.0):
+        self.hop_cost_bps = hop_cost_bps  # fees/slippage charged per hop
+        self.rates: Dict[str, Dict[str, float]] = {}
+        self._out: Dict[str, Dict[str, float]] = {}  # u -> {v: weight}
+        self._in: Dict[str, Dict[str, float]] = {}   # v -> {u: weight}
+        self._dist: Dict[str, float] = {}
+        self._pred: Dict[str, Optional[str]] = {}
+        self._hops: Dict[str, int] = {}
+        self._children: Dict[str, set] = {}
+        self._queue = deque()
+        self._queued = set()
+        self.last_detect_secs = 0.0
+        self.relaxations = 0
+
+    # ---- Public API ---------------------------------------------------------
+
+    def set_rate(self, src: str, dst: str, rate: Optional[float]):
+        """
+        Sets the src->dst rate (units of dst received per 1 src); None or <= 0 removes the edge.
+        """
+        self._add_node(src)
+        self._add_node(dst)
+        old = self._out[src].get(dst)
+        if rate is None or rate <= 0:
+            if old is None:
+                return
+            del self._out[src][dst], self._in[dst][src]
+            self.rates[src].pop(dst, None)
+            new = math.inf
+        else:
+            new = -math.log(rate * (1.0 - self.hop_cost_bps / 10000.0))
+            self._out[src][dst] = new
+            self._in[dst][src] = new
+            self.rates[src][dst] = rate
+
+        if old is not None and new > old and self._pred[dst] == src:
+            self._invalidate(dst)
+        self._push(src)
+
+    def update_book(self, base: str, quote: str, book: OrderBook):
+        """
+        Feeds a book quoted in `quote` per 1 `base` (e.g. XRP/USD, or USD/EUR):
+        selling base at the best bid and buying it back at the best ask.
+        """
+        best_bid, best_ask = book.bids.best(), book.asks.best()
+        self.set_rate(base, quote, best_bid)
+        self.set_rate(quote, base, 1.0 / best_ask if best_ask else None)
+
+    def find_cycle(self) -> Optional[List[str]]:
+        """
+        Processes pending edge updates. Returns a profitable cycle as a node
+        list (first node repeated at the end, starting at XRP when it is on
+        the cycle), or None.
+        """
+        t0 = time.perf_counter()
+        try:
+            return self._relax()
+        finally:
+            self.last_detect_secs = time.perf_counter() - t0
+
+    def cycle_rate(self, cycle: List[str]) -> float:
+        """
+        Product of raw rates around the cycle (> 1.0 is profitable before hop costs).
+        """
+        product = 1.0
+        for u, v in zip(cycle, cycle[1:]):
+            product *= self.rates[u][v]
+        return product
+
+    # ---- Internals ----------------------------------------------------------
+
+    def _add_node(self, n: str):
+        if n in self._out:
+            return
+        self._out[n], self._in[n], self.rates[n] = {}, {}, {}
+        self._dist[n], self._pred[n], self._hops[n] = 0.0, None, 0
+        self._children[n] = set()
+
+    def _push(self, n: str):
+        if n not in self._queued:
+            self._queued.add(n)
+            self._queue.append(n)
+
+    def _set_pred(self, v: str, u: Optional[str]):
+        old = self._pred[v]
+        if old is not None:
+            self._children[old].discard(v)
+        self._pred[v] = u
+        if u is not None:
+            self._children[u].add(v)
+
+    def _invalidate(self, root: str):
+        """
+        Detaches the shortest-path subtree under root back onto the virtual
+        source and queues every node that can relax into it again.
+        """
+        stack, seen = [root], {root}
+        while stack:
+            x = stack.pop()
+            for c in self._children[x]:
+                if c not in seen:
+                    seen.add(c)
+                    stack.append(c)
+        for x in seen:
+            self._set_pred(x, None)
+            self._dist[x], self._hops[x] = 0.0, 0
+        for x in seen:
+            self._push(x)
+            for y in self._in[x]:
+                self._push(y)
+
+    def _relax(self) -> Optional[List[str]]:
+        n = len(self._out)
+        while self._queue:
+            u = self._queue.popleft()
+            self._queued.discard(u)
+            du = self._dist[u]
+            for v, w in self._out[u].items():
+                nd = du + w
+                if nd < self._dist[v] - 1e-12:
+                    self.relaxations += 1
+                    self._dist[v] = nd
+                    self._hops[v] = self._hops[u] + 1
+                    self._set_pred(v, u)
+                    if self._hops[v] >= n:
+                        cycle = self._extract(v)
+                        self._reset()
+                        return cycle
+                    self._push(v)
+        return None
+
+    def _extract(self, v: str) -> Optional[List[str]]:
+        # Step back n times to land inside the cycle, then walk it once.
+        x = v
+        for _ in range(len(self._out)):
+            x = self._pred[x]
+            if x is None:
+                return None
+        cycle, y = [x], self._pred[x]
+        while y != x:
+            if y is None:
+                return None
+            cycle.append(y)
+            y = self._pred[y]
+        cycle.reverse()
+        if "XRP" in cycle:
+            i = cycle.index("XRP")
+            cycle = cycle[i:] + cycle[:i]
+        return cycle + [cycle[0]]
+
+    def _reset(self):
+        # Distances are meaningless once a negative cycle is found: start over
+        # from the virtual source and relax everything on the next call.
+        for x in self._out:
+            self._dist[x], self._pred[x], self._hops[x] = 0.0, None, 0
+            self._children[x] = set()
+        self._queue = deque(self._out)
+        self._queued = set(self._out)
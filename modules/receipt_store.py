@@ -0,0 +1,240 @@
+# ~/governor_ai/modules/receipt_store.py
+"""
+Append-only typed receipt store.
+- Fixed-size binary records in numbered segment files (seg-000001.bin, ...).
+- Sidecar time index (index.tsv): first/last timestamp and count per sealed segment.
+- Records are non-decreasing in time, so a query opens only the segments
+  overlapping [t1, t2] and bisects straight to t1 inside each one.
+
+  python -m modules.receipt_store ./logs/receipts.d --side SELL --since 2025-11-03T00:00:00
+"""
+
+import argparse
+import json
+import os
+import struct
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, Iterator, List, Tuple
+
+# Codes are stored on disk: only ever append
+EVENTS = ["heartbeat", "quote", "decision", "dry_run", "submitted", "filled", "error", "placed"]
+SIDES = [None, "BUY", "SELL"]
+
+# ts, event, side, qty, price, latency_ms, tx hash (raw 32 bytes)
+_RECORD = struct.Struct("<dBBddf32s")
+RECORD_SIZE = _RECORD.size
+
+
+def _to_ts(t) -> float:
+    if t is None or isinstance(t, (int, float)):
+        return t
+    return datetime.fromisoformat(t).timestamp()
+
+
+class ReceiptStore:
+    """
+    Single-writer, many-reader segmented store of typed receipts.
+    """
+
+    def __init__(self, root: str, segment_bytes: int = 8 * 1024 * 1024):
+        self.root = root
+        self.segment_bytes = segment_bytes - segment_bytes % RECORD_SIZE
+        os.makedirs(root, exist_ok=True)
+        self._index_path = os.path.join(root, "index.tsv")
+        self._file = None
+        self._seg = 0
+        self._first_ts = None
+        self._last_ts = None
+        self._count = 0
+
+    # ---- Writing ------------------------------------------------------------
+
+    def append(self, ts: float, event: str, side: Optional[str] = None, qty: float = 0.0,
+               price: float = 0.0, latency_ms: float = 0.0, tx_hash: Optional[str] = None):
+        if self._file is None:
+            self._open_active()
+        ts = ts if self._last_ts is None else max(ts, self._last_ts)  # keep segments sorted
+        raw_hash = bytes.fromhex(tx_hash) if tx_hash else b""
+        self._file.write(_RECORD.pack(ts, EVENTS.index(event), SIDES.index(side),
+                                      qty, price, latency_ms, raw_hash))
+        if self._first_ts is None:
+            self._first_ts = ts
+        self._last_ts = ts
+        self._count += 1
+        if self._count * RECORD_SIZE >= self.segment_bytes:
+            self._seal()
+
+    def flush(self, fsync: bool = False):
+        if self._file is not None:
+            self._file.flush()
+            if fsync:
+                os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _segment_path(self, n: int) -> str:
+        return os.path.join(self.root, f"seg-{n:06d}.bin")
+
+    def _open_active(self):
+        sealed = self._sealed(repair=True)
+        self._seg = (sealed[-1][0] if sealed else 0) + 1
+        path = self._segment_path(self._seg)
+        self._file = open(path, "ab")
+        # Drop a torn trailing record from a crash, then pick up where we left off
+        size = self._file.tell()
+        if size % RECORD_SIZE:
+            self._file.truncate(size - size % RECORD_SIZE)
+        self._count = self._file.tell() // RECORD_SIZE
+        self._first_ts = self._last_ts = None
+        if self._count:
+            first, last = _read_at(path, 0), _read_at(path, self._count - 1)
+            self._first_ts, self._last_ts = first[0], last[0]
+
+    def _seal(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+        with open(self._index_path, "a") as f:
+            f.write(f"{self._seg}\t{self._first_ts!r}\t{self._last_ts!r}\t{self._count}\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _write_index(self, rows: List[Tuple[int, float, float, int]]):
+        tmp = self._index_path + ".tmp"
+        with open(tmp, "w") as f:
+            f.writelines(f"{n}\t{a!r}\t{b!r}\t{c}\n" for n, a, b, c in rows)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._index_path)
+
+    # ---- Reading ------------------------------------------------------------
+
+    def _sealed(self, repair: bool = False) -> List[Tuple[int, float, float, int]]:
+        """
+        Index rows for sealed segments. A torn or garbled row (crash mid-append)
+        is skipped and the segment's row rebuilt from its file; with repair
+        (the writer, on open) the cleaned index is written back atomically.
+        """
+        rows, bad = {}, 0
+        try:
+            with open(self._index_path, "r") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        n, a, b, c = line.rstrip("\n").split("\t")
+                        rows[int(n)] = (int(n), float(a), float(b), int(c))
+                    except ValueError:
+                        bad += 1
+        except FileNotFoundError:
+            pass
+
+        on_disk = sorted(int(name[4:10]) for name in os.listdir(self.root)
+                         if name.startswith("seg-") and name.endswith(".bin") and name[4:10].isdigit())
+        rebuilt = 0
+        for n in on_disk:
+            if n in rows:
+                continue
+            path = self._segment_path(n)
+            count = os.path.getsize(path) // RECORD_SIZE
+            # The newest file is the active segment unless it is already full
+            if not count or (n == on_disk[-1] and count * RECORD_SIZE < self.segment_bytes):
+                continue
+            rows[n] = (n, _read_at(path, 0)[0], _read_at(path, count - 1)[0], count)
+            rebuilt += 1
+
+        sealed = [rows[n] for n in sorted(rows)]
+        if repair and (bad or rebuilt):
+            print(f"[ReceiptStore] Repaired index: {bad} malformed rows dropped, {rebuilt} rebuilt from segments")
+            self._write_index(sealed)
+        return sealed
+
+    def segments(self) -> List[Tuple[int, float, float, int]]:
+        """
+        (segment, first_ts, last_ts, count) for sealed segments plus the active one.
+        """
+        segs = self._sealed()
+        active = (segs[-1][0] if segs else 0) + 1
+        path = self._segment_path(active)
+        count = os.path.getsize(path) // RECORD_SIZE if os.path.exists(path) else 0
+        if count:
+            segs.append((active, _read_at(path, 0)[0], _read_at(path, count - 1)[0], count))
+        return segs
+
+    def query(self, since=None, until=None, event: Optional[str] = None,
+              side: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yields records with since <= ts <= until (epoch seconds or ISO strings),
+        optionally filtered by event type and side, in time order.
+        """
+        t1, t2 = _to_ts(since), _to_ts(until)
+        for seg, first, last, count in self.segments():
+            if (t1 is not None and last < t1) or (t2 is not None and first > t2):
+                continue
+            path = self._segment_path(seg)
+            with open(path, "rb") as f:
+                lo = 0 if t1 is None else _bisect(f, count, t1)
+                f.seek(lo * RECORD_SIZE)
+                for _ in range(lo, count):
+                    rec = _RECORD.unpack(f.read(RECORD_SIZE))
+                    if t2 is not None and rec[0] > t2:
+                        break
+                    row = _decode(rec)
+                    if (event and row["event"] != event) or (side and row["side"] != side):
+                        continue
+                    yield row
+
+
+def _read_at(path: str, i: int):
+    with open(path, "rb") as f:
+        f.seek(i * RECORD_SIZE)
+        return _RECORD.unpack(f.read(RECORD_SIZE))
+
+
+def _bisect(f, count: int, ts: float) -> int:
+    lo, hi = 0, count
+    while lo < hi:
+        mid = (lo + hi) // 2
+        f.seek(mid * RECORD_SIZE)
+        if _RECORD.unpack(f.read(RECORD_SIZE))[0] < ts:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def _decode(rec) -> Dict[str, Any]:
+    ts, event, side, qty, price, latency_ms, raw_hash = rec
+    return {
+        "time": datetime.fromtimestamp(ts, timezone.utc).isoformat(),
+        "ts": ts,
+        "event": EVENTS[event],
+        "side": SIDES[side],
+        "qty": qty,
+        "price": price,
+        "latency_ms": latency_ms,
+        "tx_hash": raw_hash.hex().upper() if raw_hash.strip(b"\0") else None,
+    }
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("root", nargs="?", default="./logs/receipts.d")
+    ap.add_argument("--since", default=None, help="ISO time or epoch seconds")
+    ap.add_argument("--until", default=None, help="ISO time or epoch seconds")
+    ap.add_argument("--event", choices=EVENTS, default=None)
+    ap.add_argument("--side", choices=["BUY", "SELL"], default=None)
+    args = ap.parse_args()
+
+    def _arg(v):
+        try:
+            return float(v)
+        except (TypeError, ValueError):
+            return v
+
+    for row in ReceiptStore(args.root).query(_arg(args.since), _arg(args.until), args.event, args.side):
+        print(json.dumps(row))
@@ -1,19 +1,223 @@
 # ~/governor_ai/modules/receipts.py
+import atexit
 import os
+import queue
+import threading
+import time
 from datetime import datetime, timezone
+from typing import Optional
+
+from modules import metrics
+from modules.receipt_store import ReceiptStore
+
+_STOP = object()
+
+_WRITE = metrics.histogram("receipts_write_seconds", "Receipt batch write (file + store + fsync)")
+_WRITTEN = metrics.counter("receipts_written_total", "Receipt lines written")
+_DROPPED = metrics.counter("receipts_dropped_total", "Receipt lines dropped on a full queue")
+
+
+class _Flush:
+    def __init__(self):
+        self.done = threading.Event()
+
 
 class ReceiptHandler:
     """
     Timestamped logger to file + stdout.
+    - log() only timestamps and enqueues; a background thread keeps the file
+      open and writes in batches (every batch_size lines or flush_interval secs).
+    - fsync policy: "never" (OS decides), "batch" (after each batch), "always" (per line).
+    - Bounded queue: when full, log() blocks up to block_secs, then drops the line (counted).
+    - Rotation by size (max_bytes) and/or age (rotate_secs): receipts.log -> .1 ... .backups
+    - flush() waits for everything queued so far; close() drains and runs at exit.
+      Both give up after their timeout instead of hanging on a stuck writer.
+    - record() also appends a typed record (event, side, qty, price, tx hash,
+      latency) to a ReceiptStore under store_dir, queryable without regexes.
     """
 
-    def __init__(self, log_path="./logs/receipts.log"):
+    def __init__(self,
+                 log_path="./logs/receipts.log",
+                 queue_size: int = 10000,
+                 batch_size: int = 256,
+                 flush_interval: float = 0.5,
+                 fsync: str = "batch",
+                 block_secs: float = 1.0,
+                 max_bytes: int = 50 * 1024 * 1024,
+                 rotate_secs: float = 0.0,
+                 backups: int = 5,
+                 echo: bool = True,
+                 store_dir: Optional[str] = None):
+        if fsync not in ("never", "batch", "always"):
+            raise ValueError("fsync must be 'never', 'batch' or 'always'")
         self.log_path = log_path
         os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.block_secs = block_secs
+        self.max_bytes = max_bytes
+        self.rotate_secs = rotate_secs
+        self.backups = backups
+        self.echo = echo
+        self.dropped = 0
+        self.written = 0
+
+        self.store = ReceiptStore(store_dir) if store_dir else None
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._file = None
+        self._opened_at = 0.0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="receipt-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
 
     def log(self, message: str):
-        ts = datetime.now(timezone.utc).isoformat()
-        line = f"[{ts}] {message}\n"
+        self._enqueue(message, None)
+
+    def record(self, event: str, message: str, side: Optional[str] = None, qty: float = 0.0,
+               price: float = 0.0, tx_hash: Optional[str] = None, latency_ms: float = 0.0):
+        """
+        Logs message like log() and, with a store, appends the typed record.
+        event is one of receipt_store.EVENTS; side is "BUY", "SELL" or None.
+        """
+        # Same order as ReceiptStore.append() after ts
+        self._enqueue(message, (event, side, qty, price, latency_ms, tx_hash))
+
+    def _enqueue(self, message: str, typed):
+        now = datetime.now(timezone.utc)
+        line = f"[{now.isoformat()}] {message}\n"
+        if self._closed:
+            self._write_direct(line, message)
+            return
+        try:
+            self._queue.put((line, message, now.timestamp(), typed), timeout=self.block_secs)
+        except queue.Full:
+            self.dropped += 1
+            _DROPPED.inc()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Blocks until every line queued before this call is written (False on timeout)."""
+        if self._closed:
+            return True
+        if not self._thread.is_alive():
+            return False
+        deadline = time.monotonic() + timeout
+        marker = _Flush()
+        try:
+            self._queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return False
+        return marker.done.wait(max(0.0, deadline - time.monotonic()))
+
+    def close(self, timeout: float = 10.0):
+        if self._closed:
+            return
+        self._closed = True
+        if not self._thread.is_alive():
+            return
+        deadline = time.monotonic() + timeout
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            print(f"[ReceiptHandler] Writer stuck; {self._queue.qsize()} queued lines not written")
+            return
+        self._thread.join(timeout=max(0.0, deadline - time.monotonic()))
+
+    # ---- Writer thread ------------------------------------------------------
+
+    def _run(self):
+        self._open()
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            # Collect until batch_size lines or flush_interval after the first one;
+            # flush()/close() cut the wait short
+            batch, markers, stop = [], [], False
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, _Flush):
+                    markers.append(item)
+                else:
+                    batch.append(item)
+                if stop or markers or len(batch) >= self.batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                print(f"[ReceiptHandler] Write failed: {e}")
+            for m in markers:
+                m.done.set()
+            if stop:
+                self._file.close()
+                if self.store is not None:
+                    self.store.close()
+                return
+
+    def _write_batch(self, batch):
+        if not batch:
+            return
+        with _WRITE.time():
+            self._write_batch_timed(batch)
+        _WRITTEN.inc(len(batch))
+
+    def _write_batch_timed(self, batch):
+        if self.fsync == "always":
+            for line, *_ in batch:
+                self._file.write(line)
+                self._file.flush()
+                os.fsync(self._file.fileno())
+        else:
+            self._file.write("".join(line for line, *_ in batch))
+            self._file.flush()
+            if self.fsync == "batch":
+                os.fsync(self._file.fileno())
+        typed_rows = [(ts, typed) for _, _, ts, typed in batch if typed is not None]
+        if self.store is not None and typed_rows:
+            # The log lines are already on disk; a store error must not skip echo/rotation
+            try:
+                for ts, typed in typed_rows:
+                    self.store.append(ts, *typed)
+                self.store.flush(fsync=self.fsync != "never")
+            except Exception as e:
+                print(f"[ReceiptHandler] Store append failed: {e}")
+        self.written += len(batch)
+        if self.echo:
+            print("".join(f"[ReceiptHandler] {message}\n" for _, message, *_ in batch), end="")
+        self._maybe_rotate()
+
+    def _write_direct(self, line, message):
+        # After close(): keep the old synchronous behaviour
         with open(self.log_path, "a") as f:
             f.write(line)
-        print(f"[ReceiptHandler] {message}")
+        if self.echo:
+            print(f"[ReceiptHandler] {message}")
+
+    def _open(self):
+        self._file = open(self.log_path, "a")
+        self._opened_at = time.time()
+
+    def _maybe_rotate(self):
+        too_big = self.max_bytes and self._file.tell() >= self.max_bytes
+        too_old = self.rotate_secs and time.time() - self._opened_at >= self.rotate_secs
+        if not (too_big or too_old):
+            return
+        self._file.close()
+        for n in range(self.backups - 1, 0, -1):
+            src = f"{self.log_path}.{n}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.log_path}.{n + 1}")
+        if self.backups > 0:
+            os.replace(self.log_path, f"{self.log_path}.1")
+        else:
+            os.remove(self.log_path)
+        self._open()
@@ -0,0 +1,172 @@
+# ~/governor_ai/modules/rpc_pool.py
+import os
+import random
+import threading
+import time
+from json import JSONDecodeError
+from typing import Optional, Dict
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from xrpl.asyncio.clients import AsyncJsonRpcClient, XRPLRequestFailureException
+from xrpl.asyncio.clients.utils import json_to_response, request_to_json_rpc
+from xrpl.clients import JsonRpcClient
+from xrpl.models.requests.request import Request
+from xrpl.models.response import Response
+
+from modules import metrics
+
+DEFAULT_RPC_URL = "https://s.altnet.rippletest.net:51234"
+
+POOL_SIZE = int(os.getenv("XRPL_RPC_POOL_SIZE", "10"))
+REQUEST_TIMEOUT = float(os.getenv("XRPL_RPC_TIMEOUT", "10.0"))
+RETRIES = int(os.getenv("XRPL_RPC_RETRIES", "3"))
+BACKOFF = float(os.getenv("XRPL_RPC_BACKOFF", "0.2"))
+MAX_BACKOFF = float(os.getenv("XRPL_RPC_MAX_BACKOFF", "2.0"))
+
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF, cap: float = MAX_BACKOFF) -> float:
+    """
+    Exponential backoff with full jitter.
+    """
+    return random.uniform(0.0, min(cap, base * (2 ** attempt)))
+
+
+class PooledJsonRpcClient(JsonRpcClient):
+    """
+    JsonRpcClient over a keep-alive requests.Session.
+    - One connection pool per endpoint (pool_size connections), so calls
+      after the first skip TCP+TLS setup.
+    - Per-request timeout; connection errors, timeouts and 429/5xx are
+      retried with jittered exponential backoff.
+    - Works for direct .request() calls and for xrpl.transaction helpers
+      (submit_and_wait etc.), which go through _request_impl.
+    """
+
+    def __init__(self,
+                 url: str,
+                 pool_size: int = POOL_SIZE,
+                 timeout: float = REQUEST_TIMEOUT,
+                 retries: int = RETRIES):
+        super().__init__(url)
+        self.timeout = timeout
+        self.retries = retries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, request: Request, timeout: Optional[float] = None) -> Response:
+        return self._post(request, timeout or self.timeout)
+
+    async def _request_impl(self, request: Request, *, timeout: float = REQUEST_TIMEOUT) -> Response:
+        # xrpl's sync helpers run their async core under asyncio.run(); a blocking
+        # call here keeps them on the shared pool.
+        return self._post(request, timeout)
+
+    def _post(self, request: Request, timeout: float, url: Optional[str] = None) -> Response:
+        payload = request_to_json_rpc(request)
+        method = payload["method"]
+        attempt = 0
+        t0 = time.perf_counter()
+        while True:
+            try:
+                resp = self.session.post(url or self.url, json=payload, timeout=timeout)
+                if resp.status_code in _RETRY_STATUS and attempt < self.retries:
+                    raise requests.HTTPError(f"HTTP {resp.status_code}")
+                try:
+                    result = json_to_response(resp.json())
+                except (JSONDecodeError, ValueError, KeyError):
+                    metrics.counter("xrpl_rpc_errors_total", "Failed JSON-RPC calls", method=method).inc()
+                    raise XRPLRequestFailureException({"error": resp.status_code, "error_message": resp.text})
+                metrics.histogram("xrpl_rpc_seconds", "JSON-RPC round trip incl. retries",
+                                  method=method).observe(time.perf_counter() - t0)
+                return result
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                if attempt >= self.retries:
+                    metrics.counter("xrpl_rpc_errors_total", "Failed JSON-RPC calls", method=method).inc()
+                    raise
+                metrics.counter("xrpl_rpc_retries_total", "Retried JSON-RPC attempts", method=method).inc()
+                delay = backoff_delay(attempt)
+                print(f"[RpcPool] {request.method} failed ({e}); retry {attempt + 1}/{self.retries} in {delay:.2f}s")
+                time.sleep(delay)
+                attempt += 1
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncPooledJsonRpcClient(AsyncJsonRpcClient):
+    """
+    AsyncJsonRpcClient that keeps one httpx.AsyncClient (and its SSL context)
+    open instead of building one per request. Bound to the event loop it is
+    first used on, so each long-lived loop owns its own instance.
+    """
+
+    def __init__(self, url: str, max_connections: int = POOL_SIZE, timeout: float = REQUEST_TIMEOUT):
+        super().__init__(url)
+        self.timeout = timeout
+        self._http = httpx.AsyncClient(limits=httpx.Limits(max_connections=max_connections,
+                                                           max_keepalive_connections=max_connections))
+
+    async def _request_impl(self, request: Request, *, timeout: Optional[float] = None) -> Response:
+        payload = request_to_json_rpc(request)
+        t0 = time.perf_counter()
+        response = await self._http.post(self.url, json=payload, timeout=timeout or self.timeout)
+        try:
+            result = json_to_response(response.json())
+        except (JSONDecodeError, ValueError, KeyError):
+            metrics.counter("xrpl_rpc_errors_total", "Failed JSON-RPC calls", method=payload["method"]).inc()
+            raise XRPLRequestFailureException({"error": response.status_code, "error_message": response.text})
+        metrics.histogram("xrpl_rpc_seconds", "JSON-RPC round trip incl. retries",
+                          method=payload["method"]).observe(time.perf_counter() - t0)
+        return result
+
+    async def aclose(self):
+        await self._http.aclose()
+
+
+def split_urls(url: str):
+    return [u.strip() for u in url.split(",") if u.strip()]
+
+
+_clients: Dict[str, PooledJsonRpcClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(url: Optional[str] = None) -> PooledJsonRpcClient:
+    """
+    Process-wide pooled client for url (default: XRPL_RPC_URL).
+    A comma-separated list ("https://a:51234,https://b:51234") gives a
+    node_router.RoutedJsonRpcClient that picks the fastest healthy node.
+    Every module should get its JSON-RPC client here.
+    """
+    url = url or os.getenv("XRPL_RPC_URL", DEFAULT_RPC_URL)
+    client = _clients.get(url)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(url)
+            if client is None:
+                urls = split_urls(url)
+                if len(urls) > 1:
+                    from modules.node_router import RoutedJsonRpcClient
+                    client = RoutedJsonRpcClient(urls)
+                else:
+                    client = PooledJsonRpcClient(url)
+                _clients[url] = client
+    return client
+
+
+def get_async_client(url: Optional[str] = None, max_connections: int = POOL_SIZE) -> AsyncPooledJsonRpcClient:
+    """
+    Pooled async client for one event loop (not shared: httpx pools are loop-bound).
+    With a comma-separated list, uses the router's current best node if one exists.
+    """
+    url = url or os.getenv("XRPL_RPC_URL", DEFAULT_RPC_URL)
+    routed = _clients.get(url)
+    if getattr(routed, "router", None) is not None:
+        return AsyncPooledJsonRpcClient(routed.router.best(), max_connections)
+    return AsyncPooledJsonRpcClient(split_urls(url)[0], max_connections)
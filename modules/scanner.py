@@ -0,0 +1,190 @@
+# ~/governor_ai/modules/scanner.py
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Optional, List, Tuple, Dict, Any
+
+from xrpl.models.currencies import XRP, IssuedCurrency
+from xrpl.models.requests import BookOffers
+
+from modules.arbitrage import ArbitrageEngine
+from modules.orderbook import OrderBook
+from modules.path_arb import CurrencyGraph, node_key
+from modules.rpc_pool import get_async_client
+
+Pair = Tuple[str, str]  # (quote_currency, quote_issuer)
+
+
+def parse_pairs(spec: Optional[str]) -> List[Pair]:
+    """
+    Parses "USD:rIssuerA,EUR:rIssuerB" (e.g. ARB_PAIRS in .env) into pairs.
+    """
+    pairs = []
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        currency, _, issuer = item.partition(":")
+        if not (currency and issuer):
+            raise ValueError(f"Bad pair '{item}', expected CURRENCY:ISSUER")
+        pairs.append((currency.strip(), issuer.strip()))
+    return pairs
+
+
+def parse_cross_pairs(spec: Optional[str]) -> List[Tuple[Pair, Pair]]:
+    """
+    Parses "USD:rIssuerA/EUR:rIssuerB,..." (e.g. ARB_CROSS_PAIRS) into (base, quote) pairs.
+    """
+    cross = []
+    for item in (spec or "").split(","):
+        if not item.strip():
+            continue
+        base, sep, quote = item.partition("/")
+        if not sep:
+            raise ValueError(f"Bad cross pair '{item.strip()}', expected CUR:ISSUER/CUR:ISSUER")
+        cross.append((parse_pairs(base)[0], parse_pairs(quote)[0]))
+    return cross
+
+
+class MultiPairScanner:
+    """
+    Watches many XRP/IOU books from one shared asyncio loop.
+    - Fetches every configured book concurrently, bounded by max_concurrency
+      (a live BookStream snapshot is used instead when the engine has one).
+    - Runs each pair's ArbitrageEngine.evaluate() and ranks the edges.
+    - Dispatches only the best edge per cycle.
+    - Feeds every book (plus optional IOU/IOU cross books) into a CurrencyGraph
+      and reports multi-hop cycles such as XRP->USD->EUR->XRP.
+    """
+
+    def __init__(self,
+                 rpc_url: str,
+                 pairs: List[Pair],
+                 max_concurrency: int = 8,
+                 cross_pairs: Optional[List[Tuple[Pair, Pair]]] = None,
+                 hop_cost_bps: float = 0.0,
+                 **engine_kwargs):
+        self.max_concurrency = max_concurrency
+        self.client = get_async_client(rpc_url, max_connections=max_concurrency * 2)
+        self.engines: Dict[Pair, ArbitrageEngine] = {
+            pair: ArbitrageEngine(rpc_url, quote_currency=pair[0], quote_issuer=pair[1], **engine_kwargs)
+            for pair in pairs
+        }
+        self.cross_pairs = cross_pairs or []  # ((base cur, base iss), (quote cur, quote iss))
+        self.graph = CurrencyGraph(hop_cost_bps=hop_cost_bps)
+        self.last_cycle: Optional[List[str]] = None
+        self.books: Dict[Pair, Optional[OrderBook]] = {}
+        self.last_scan_secs = 0.0
+        self._loop = asyncio.new_event_loop()
+
+    # ---- Public API ---------------------------------------------------------
+
+    def cycle(self, wallet_service, receipts, ref_prices: Optional[Dict[Pair, float]] = None):
+        """
+        One scan over all pairs; places (or dry-runs) the single best edge.
+        ref_prices maps (currency, issuer) -> reference QUOTE per 1 XRP.
+        """
+        ts = datetime.now(timezone.utc).isoformat()
+        ranked = self.scan(ref_prices)
+        live = sum(1 for b in self.books.values() if b is not None)
+        receipts.log(f"[Scan] {ts} | {live}/{len(self.engines)} books in {self.last_scan_secs * 1000:.1f}ms, "
+                     f"{len(ranked)} actionable")
+        if self.last_cycle:
+            receipts.log(f"[Scan] {ts} | Path cycle {' -> '.join(self.last_cycle)} "
+                         f"x{self.graph.cycle_rate(self.last_cycle):.6f} "
+                         f"(found in {self.graph.last_detect_secs * 1e6:.0f}us)")
+        if not ranked:
+            return None
+
+        best = ranked[0]
+        currency, issuer = best["pair"]
+        receipts.log(f"[Scan] {ts} | Best edge {best['edge_bps']:.1f}bps {best['side'].upper()} on {currency}:{issuer}")
+        self.engines[best["pair"]].execute(wallet_service, receipts, best["side"],
+                                           best["amount_xrp"], best["limit_price"])
+        return best
+
+    def scan(self, ref_prices: Optional[Dict[Pair, float]] = None) -> List[Dict[str, Any]]:
+        return self._loop.run_until_complete(self.scan_async(ref_prices))
+
+    async def scan_async(self, ref_prices: Optional[Dict[Pair, float]] = None) -> List[Dict[str, Any]]:
+        """
+        Fetches all books concurrently and returns actionable edges, best first.
+        """
+        sem = asyncio.Semaphore(self.max_concurrency)
+        pairs = list(self.engines)
+
+        t0 = time.perf_counter()
+        books, cross = await asyncio.gather(
+            asyncio.gather(*(self._fetch(pair, sem) for pair in pairs)),
+            asyncio.gather(*(self._fetch_cross(base, quote, sem) for base, quote in self.cross_pairs)),
+        )
+        self.last_scan_secs = time.perf_counter() - t0
+        self.books = dict(zip(pairs, books))
+
+        for pair, book in self.books.items():
+            if book is not None:
+                self.graph.update_book("XRP", node_key(*pair), book)
+                self.engines[pair].publish_top(book)
+        for (base, quote), book in zip(self.cross_pairs, cross):
+            if book is not None:
+                self.graph.update_book(node_key(*base), node_key(*quote), book)
+        self.last_cycle = self.graph.find_cycle()
+
+        ranked = []
+        for pair, book in self.books.items():
+            ref = (ref_prices or {}).get(pair)
+            if book is None or ref is None:
+                continue
+            side, amount, limit, buy_bps, sell_bps = self.engines[pair].evaluate(book, ref)
+            if side is None:
+                continue
+            ranked.append({
+                "pair": pair,
+                "side": side,
+                "amount_xrp": amount,
+                "limit_price": limit,
+                "edge_bps": buy_bps if side == "buy" else sell_bps,
+            })
+        ranked.sort(key=lambda c: c["edge_bps"], reverse=True)
+        return ranked
+
+    def close(self):
+        for engine in self.engines.values():
+            if engine.stream is not None:
+                engine.stream.stop()
+        self._loop.run_until_complete(self.client.aclose())
+        self._loop.close()
+
+    # ---- Internals ----------------------------------------------------------
+
+    async def _fetch(self, pair: Pair, sem: asyncio.Semaphore) -> Optional[OrderBook]:
+        engine = self.engines[pair]
+        if engine.stream is not None and engine.stream.is_live():
+            return engine.stream.snapshot()
+
+        quote = IssuedCurrency(currency=pair[0], issuer=pair[1])
+        async with sem:
+            try:
+                asks, bids = await asyncio.gather(
+                    self.client.request(BookOffers(taker_gets=XRP(), taker_pays=quote, limit=engine.book_depth)),
+                    self.client.request(BookOffers(taker_gets=quote, taker_pays=XRP(), limit=engine.book_depth)),
+                )
+                return OrderBook.from_offers(asks.result.get("offers", []), bids.result.get("offers", []))
+            except Exception as e:
+                print(f"[Scanner] Book fetch failed for {pair[0]}:{pair[1]}: {e}")
+                return None
+
+    async def _fetch_cross(self, base: Pair, quote: Pair, sem: asyncio.Semaphore) -> Optional[OrderBook]:
+        # IOU/IOU book, priced in quote per 1 base
+        b = IssuedCurrency(currency=base[0], issuer=base[1])
+        q = IssuedCurrency(currency=quote[0], issuer=quote[1])
+        async with sem:
+            try:
+                asks, bids = await asyncio.gather(
+                    self.client.request(BookOffers(taker_gets=b, taker_pays=q, limit=1)),
+                    self.client.request(BookOffers(taker_gets=q, taker_pays=b, limit=1)),
+                )
+                return OrderBook.from_offers(asks.result.get("offers", []), bids.result.get("offers", []))
+            except Exception as e:
+                print(f"[Scanner] Cross book fetch failed for {base[0]}/{quote[0]}: {e}")
+                return None
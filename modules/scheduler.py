@@ -0,0 +1,162 @@
+# ~/governor_ai/modules/scheduler.py
+import threading
+import time
+from collections import deque
+from typing import Optional, Callable, Dict, Any, Set
+
+from modules import metrics
+
+_WINDOW = 500  # latency samples kept for percentiles
+
+
+class EventScheduler:
+    """
+    Runs cycle(reasons) when something happens instead of on a fixed sleep.
+    - trigger(reason) from any thread (ledger close, book change, ...).
+    - Triggers that arrive while a cycle is pending or running coalesce into
+      the next one; cycles start at most once per min_interval.
+    - If nothing fires for max_staleness secs, a "stale" cycle runs anyway.
+    - should_run(reasons) can veto a cycle (counted as skipped), e.g. a ledger
+      close that changed nothing this cycle cares about.
+    - stats(): trigger -> cycle-done latency (p50/p99), cycle duration,
+      coalesced/skipped counts and triggers per reason.
+    """
+
+    def __init__(self,
+                 cycle: Callable[[Set[str]], None],
+                 min_interval: float = 1.0,
+                 max_staleness: float = 10.0,
+                 should_run: Optional[Callable[[Set[str]], bool]] = None,
+                 name: str = "scheduler"):
+        self.cycle = cycle
+        self.min_interval = min_interval
+        self.max_staleness = max_staleness
+        self.should_run = should_run
+        self.name = name
+
+        self.cycles = 0
+        self.skipped = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.by_reason: Dict[str, int] = {}
+        self._latencies = deque(maxlen=_WINDOW)
+        self._durations = deque(maxlen=_WINDOW)
+
+        self._cond = threading.Condition()
+        self._reasons: Set[str] = set()
+        self._pending = 0
+        self._first_trigger: Optional[float] = None
+        self._last_start = 0.0
+        self._last_run = time.monotonic()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---- Public API ---------------------------------------------------------
+
+    def trigger(self, reason: str):
+        with self._cond:
+            self._reasons.add(reason)
+            self._pending += 1
+            self.by_reason[reason] = self.by_reason.get(reason, 0) + 1
+            if self._first_trigger is None:
+                self._first_trigger = time.monotonic()
+            self._cond.notify()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        with self._cond:
+            self._cond.notify()
+
+    def run(self):
+        """
+        Scheduler loop; blocks until stop(). start() runs it on a daemon thread.
+        """
+        while not self._stopped.is_set():
+            reasons, first = self._next_batch()
+            if reasons is None:
+                return
+            started = time.monotonic()
+            self._last_start = started
+            if self.should_run is not None and "stale" not in reasons:
+                try:
+                    if not self.should_run(reasons):
+                        self.skipped += 1
+                        metrics.counter("scheduler_cycles_total", "Cycles by outcome",
+                                        scheduler=self.name, outcome="skipped").inc()
+                        continue
+                except Exception as e:
+                    print(f"[EventScheduler] should_run failed, running anyway: {e}")
+            try:
+                self.cycle(reasons)
+            except Exception as e:
+                self.errors += 1
+                print(f"[EventScheduler] Cycle failed: {e}")
+            done = time.monotonic()
+            self._last_run = done
+            self.cycles += 1
+            self._latencies.append((done - first) * 1000.0)
+            self._durations.append((done - started) * 1000.0)
+            metrics.counter("scheduler_cycles_total", "Cycles by outcome", scheduler=self.name, outcome="run").inc()
+            metrics.histogram("scheduler_trigger_latency_seconds", "First trigger to cycle done",
+                              scheduler=self.name).observe(done - first)
+            metrics.histogram("scheduler_cycle_seconds", "Cycle duration", scheduler=self.name).observe(done - started)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cycles": self.cycles,
+            "skipped": self.skipped,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "triggers": dict(self.by_reason),
+            "latency_ms": _summary(self._latencies),
+            "duration_ms": _summary(self._durations),
+            "min_interval": self.min_interval,
+            "max_staleness": self.max_staleness,
+        }
+
+    # ---- Internals ----------------------------------------------------------
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._reasons and not self._stopped.is_set():
+                remaining = self._last_run + self.max_staleness - time.monotonic()
+                if remaining <= 0:
+                    self._reasons.add("stale")
+                    self._pending += 1
+                    self.by_reason["stale"] = self.by_reason.get("stale", 0) + 1
+                    self._first_trigger = time.monotonic()
+                    break
+                self._cond.wait(remaining)
+        if self._stopped.is_set():
+            return None, None
+
+        # Rate limit; anything arriving meanwhile folds into this cycle
+        hold = self._last_start + self.min_interval - time.monotonic()
+        if hold > 0 and self._stopped.wait(hold):
+            return None, None
+
+        with self._cond:
+            reasons, first = self._reasons, self._first_trigger
+            self.coalesced += max(0, self._pending - 1)
+            metrics.counter("scheduler_coalesced_total", "Triggers folded into another cycle",
+                            scheduler=self.name).inc(max(0, self._pending - 1))
+            self._reasons, self._pending, self._first_trigger = set(), 0, None
+        return reasons, first
+
+
+def _summary(samples) -> Dict[str, Any]:
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "last": round(samples[-1], 2),
+        "p50": round(ordered[len(ordered) // 2], 2),
+        "p99": round(ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))], 2),
+        "max": round(ordered[-1], 2),
+    }
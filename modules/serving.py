@@ -0,0 +1,137 @@
+# ~/governor_ai/modules/serving.py
+"""
+Production serving for the Flask apps (governor, agent hub, agents).
+
+  SERVE_MODE=threaded  one process, a thread per connection (default)
+  SERVE_MODE=prefork   SERVE_WORKERS processes accept on one shared socket,
+                       each threaded; a supervisor respawns dead workers
+  SERVE_MODE=dev       Flask's development server (debug convenience)
+
+Background loops are handed to serve() separately so they run once per
+deployment: in-process for threaded/dev, in one dedicated child for prefork.
+A prefork background child shares nothing with the workers (globals,
+metrics), so apps whose endpoints read background state (governor.py,
+agent_hub.py) serve threaded only.
+"""
+
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from typing import Optional, Callable, Dict
+
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+SERVE_MODE = os.getenv("SERVE_MODE", "threaded")
+SERVE_WORKERS = int(os.getenv("SERVE_WORKERS", str(os.cpu_count() or 2)))
+SERVE_HOST = os.getenv("SERVE_HOST", "0.0.0.0")
+ACCESS_LOG = os.getenv("SERVE_ACCESS_LOG", "0") == "1"
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        if ACCESS_LOG:
+            super().log_request(*args, **kwargs)
+
+
+def serve(create_app: Callable, port: int, background: Optional[Callable[[], None]] = None,
+          host: str = SERVE_HOST, mode: str = SERVE_MODE, workers: int = SERVE_WORKERS):
+    """
+    Serves create_app() on host:port until interrupted. create_app is called
+    inside each worker (after fork), so clients, pools and stream threads are
+    never shared across processes. background() runs once.
+    """
+    if mode == "prefork" and workers > 1:
+        _Prefork(create_app, host, port, workers, background).run()
+        return
+
+    if background is not None:
+        threading.Thread(target=background, name="background", daemon=True).start()
+    app = create_app()
+    if mode == "dev":
+        app.run(host=host, port=port)
+        return
+    print(f"[Serving] {app.name} on {host}:{port} (threaded, pid {os.getpid()})")
+    make_server(host, port, app, threaded=True, request_handler=_QuietHandler).serve_forever()
+
+
+class _Prefork:
+    """
+    Supervisor: binds once, forks the workers (and the background process)
+    before starting any thread of its own, respawns children that die.
+    """
+
+    def __init__(self, create_app, host, port, workers, background):
+        self.create_app = create_app
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.background = background
+        self.children: Dict[int, str] = {}
+        self.started: Dict[str, float] = {}
+        self.backoff: Dict[str, float] = {}
+        self.stopping = False
+        self.sock = socket.create_server((host, port), backlog=1024, reuse_port=False)
+        self.sock.set_inheritable(True)
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        if self.background is not None:
+            self._spawn("background")
+        for n in range(self.workers):
+            self._spawn(f"worker-{n}")
+        print(f"[Serving] {self.host}:{self.port} prefork: {self.workers} workers, supervisor pid {os.getpid()}")
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            role = self.children.pop(pid, None)
+            if role is None or self.stopping:
+                continue
+            # Children that die young back off (0.5s doubling to 30s), e.g. a bad config
+            lived = time.monotonic() - self.started.get(role, 0.0)
+            delay = 0.5 if lived > 10.0 else min(30.0, self.backoff.get(role, 0.25) * 2)
+            self.backoff[role] = delay
+            print(f"[Serving] {role} (pid {pid}) exited with {status}; respawning in {delay:.1f}s")
+            time.sleep(delay)
+            if not self.stopping:
+                self._spawn(role)
+
+    def _spawn(self, role: str):
+        sys.stdout.flush()  # or the child re-prints whatever is still buffered
+        pid = os.fork()
+        if pid:
+            self.children[pid] = role
+            self.started[role] = time.monotonic()
+            return
+        # Child
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        code = 0
+        try:
+            if role == "background":
+                self.sock.close()
+                self.background()
+            else:
+                app = self.create_app()
+                make_server(self.host, self.port, app, threaded=True, request_handler=_QuietHandler,
+                            fd=self.sock.fileno()).serve_forever()
+        except Exception as e:
+            print(f"[Serving] {role} failed: {e}")
+            code = 1
+        finally:
+            os._exit(code)
+
+    def _stop(self, signum, frame):
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
@@ -0,0 +1,164 @@
+# ~/governor_ai/modules/startup.py
+"""
+Startup timing: how long a process takes from exec to serving /health and
+to being fully initialized, broken down by phase and by heavy import.
+
+  from modules import startup
+  startup.mark("imports")                    # phase boundaries, relative to process start
+  wallet_mod = startup.timed_import("modules.wallet")
+  with startup.phase("wallet"): ...
+  startup.report()                           # JSON for /startup
+
+STARTUP_IMPORT_PROFILE=1 also records every module import (cumulative and
+self time, like python -X importtime) and reports the slowest ones.
+"""
+
+import importlib
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List
+
+from modules import metrics
+
+IMPORT_PROFILE = os.getenv("STARTUP_IMPORT_PROFILE", "0") == "1"
+
+
+def _process_age() -> float:
+    """
+    Seconds since this process was exec'd (Linux /proc), so interpreter
+    start-up counts too; 0 where /proc is unavailable.
+    """
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+# Process start on the monotonic clock
+_T0 = time.monotonic() - _process_age()
+_lock = threading.Lock()
+_marks: Dict[str, float] = {}
+_phases: Dict[str, float] = {}
+_imports: Dict[str, float] = {}
+_profile: List[tuple] = []  # (module, cumulative secs, self secs)
+
+
+def elapsed() -> float:
+    return time.monotonic() - _T0
+
+
+def mark(name: str, once: bool = True) -> float:
+    """
+    Records name at the current time since process start (first call wins if once).
+    """
+    t = elapsed()
+    with _lock:
+        if once and name in _marks:
+            return _marks[name]
+        _marks[name] = t
+    metrics.gauge("startup_mark_seconds", "Seconds from process start to each startup mark",
+                  mark=name).set(t)
+    return t
+
+
+@contextmanager
+def phase(name: str):
+    t0 = time.monotonic()
+    try:
+        yield
+    finally:
+        d = time.monotonic() - t0
+        with _lock:
+            _phases[name] = d
+        metrics.gauge("startup_phase_seconds", "Duration of each startup phase", phase=name).set(d)
+
+
+def timed_import(name: str):
+    """
+    importlib.import_module(name), recording how long it took if it was not loaded yet.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    t0 = time.monotonic()
+    module = importlib.import_module(name)
+    with _lock:
+        _imports[name] = time.monotonic() - t0
+    return module
+
+
+def report(top: int = 25) -> Dict[str, Any]:
+    with _lock:
+        out = {
+            "pid": os.getpid(),
+            "uptime_secs": round(elapsed(), 3),
+            "marks": {k: round(v, 4) for k, v in sorted(_marks.items(), key=lambda kv: kv[1])},
+            "phases": {k: round(v, 4) for k, v in _phases.items()},
+            "imports": {k: round(v, 4) for k, v in sorted(_imports.items(), key=lambda kv: -kv[1])},
+        }
+        if _profile:
+            slowest = sorted(_profile, key=lambda r: -r[2])[:top]
+            out["import_profile"] = {
+                "modules": len(_profile),
+                "total_self_secs": round(sum(r[2] for r in _profile), 4),
+                "slowest_self": [{"module": m, "cumulative": round(c, 5), "self": round(s, 5)} for m, c, s in slowest],
+            }
+    return out
+
+
+# ---- Optional per-module import profile --------------------------------------
+
+class _TimedLoader:
+    def __init__(self, loader, name):
+        self._loader = loader
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        stack = _ImportProfiler.stack
+        stack.append(0.0)  # children's cumulative time
+        t0 = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            total = time.perf_counter() - t0
+            children = stack.pop()
+            if stack:
+                stack[-1] += total
+            _profile.append((self._name, total, total - children))
+
+
+class _ImportProfiler:
+    """
+    Meta path hook: lets the other finders find the spec, then times the
+    loader's exec_module (nested imports subtracted for self time).
+    """
+    stack: List[float] = []
+
+    @classmethod
+    def find_spec(cls, name, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is cls:
+                continue
+            find = getattr(finder, "find_spec", None)
+            spec = find(name, path, target) if find else None
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, name)
+                return spec
+        return None
+
+
+if IMPORT_PROFILE and _ImportProfiler not in sys.meta_path:
+    sys.meta_path.insert(0, _ImportProfiler)
@@ -0,0 +1,462 @@
+# ~/governor_ai/modules/state_store.py
+"""
+Key/value state persistence for AIStrategy (and anything else with a small
+dict of state that changes a few keys per cycle).
+
+  STATE_BACKEND=sqlite   .state.db, WAL mode (default)
+  STATE_BACKEND=journal  .state.journal, append-only JSON lines + snapshot
+  STATE_BACKEND=json     .state, whole-dict rewrite (atomic, legacy format)
+
+Only changed keys are written. put() just queues them; a writer thread
+commits every commit_secs (or flush()), so a crash loses at most that
+window and never corrupts what was already committed. Keys listed in
+history_keys are also kept as a time series, queried with history()
+straight from disk:
+
+  python -m modules.state_store ./.state.db last_balance --since 2025-11-03T00:00:00
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, Iterable, Iterator, Tuple
+
+STATE_BACKEND = os.getenv("STATE_BACKEND", "sqlite")
+STATE_COMMIT_SECS = float(os.getenv("STATE_COMMIT_SECS", "1.0"))
+STATE_HISTORY_DAYS = float(os.getenv("STATE_HISTORY_DAYS", "30"))  # 0 = keep forever
+
+_DELETED = object()
+
+
+def _to_ts(t) -> Optional[float]:
+    if t is None or isinstance(t, (int, float)):
+        return t
+    return datetime.fromisoformat(t).timestamp()
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, separators=(",", ":"))
+
+
+def _atomic_write(path: str, data: str):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class StateStore:
+    """
+    Base store: queues changes and commits them from a writer thread.
+    - load() -> dict of current values.
+    - put({key: value}) / delete(key): cheap, coalesced per key until commit.
+    - history(key, since, until, limit) -> iterator of (ts, value).
+    - compact() runs every compact_secs on the writer thread.
+    Subclasses implement _load, _commit(changes, rows), _history and _compact.
+    """
+
+    def __init__(self, path: str, history_keys: Iterable[str] = (),
+                 commit_secs: float = STATE_COMMIT_SECS,
+                 history_days: float = STATE_HISTORY_DAYS,
+                 compact_secs: float = 3600.0):
+        self.path = path
+        self.history_keys = set(history_keys)
+        self.commit_secs = commit_secs
+        self.history_days = history_days
+        self.compact_secs = compact_secs
+        self.commits = 0
+        self.keys_written = 0
+        self.errors = 0
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # commits stay in put() order
+        self._changes: Dict[str, Any] = {}
+        self._rows = []  # (ts, key, value) history rows
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._last_compact = time.monotonic()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---- Public API ---------------------------------------------------------
+
+    def load(self) -> Dict[str, Any]:
+        return self._load()
+
+    def put(self, changes: Dict[str, Any], ts: Optional[float] = None):
+        if not changes:
+            return
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            self._changes.update(changes)
+            for key, value in changes.items():
+                if key in self.history_keys:
+                    self._rows.append((ts, key, value))
+        if self.commit_secs <= 0:
+            self.flush()
+        else:
+            self._ensure_thread()
+
+    def delete(self, key: str):
+        self.put({key: _DELETED})
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                changes, rows = self._changes, self._rows
+                self._changes, self._rows = {}, []
+            if not changes and not rows:
+                return
+            try:
+                self._commit(changes, rows)
+                self.commits += 1
+                self.keys_written += len(changes)
+            except Exception as e:
+                self.errors += 1
+                print(f"[{type(self).__name__}] Commit failed: {e}")
+                with self._lock:  # requeue under anything put() meanwhile
+                    changes.update(self._changes)
+                    self._changes = changes
+                    self._rows = rows + self._rows
+
+    def history(self, key: str, since=None, until=None, limit: Optional[int] = None) -> Iterator[Tuple[float, Any]]:
+        return self._history(key, _to_ts(since), _to_ts(until), limit)
+
+    def compact(self):
+        try:
+            self._compact()
+        except Exception as e:
+            print(f"[{type(self).__name__}] Compaction failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self).__name__,
+            "path": self.path,
+            "commits": self.commits,
+            "keys_written": self.keys_written,
+            "pending": len(self._changes),
+            "errors": self.errors,
+        }
+
+    def close(self):
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+        self.flush()
+
+    # ---- Writer thread ------------------------------------------------------
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="state-writer", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.commit_secs)
+            self._wake.clear()
+            self.flush()
+            if self.compact_secs and time.monotonic() - self._last_compact >= self.compact_secs:
+                self._last_compact = time.monotonic()
+                self.compact()
+
+    def _cutoff(self) -> Optional[float]:
+        return time.time() - self.history_days * 86400 if self.history_days > 0 else None
+
+    # ---- Backend hooks ------------------------------------------------------
+
+    def _load(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def _commit(self, changes: Dict[str, Any], rows):
+        raise NotImplementedError
+
+    def _history(self, key, since, until, limit):
+        raise NotImplementedError
+
+    def _compact(self):
+        pass
+
+
+class SQLiteStateStore(StateStore):
+    """
+    state(key, value, ts) plus history(ts, key, value) in one SQLite file.
+    - WAL + synchronous=NORMAL: a commit is one WAL append, readers never block it.
+    - Each flush is one transaction (upserts + history inserts).
+    - Compaction drops history older than history_days, checkpoints the WAL
+      and returns free pages (incremental vacuum).
+    """
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(path, **kwargs)
+        self._db = self._connect()
+        self._db_lock = threading.Lock()
+        with self._db:
+            self._db.execute("PRAGMA auto_vacuum=INCREMENTAL")  # only effective on a new file
+            self._db.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT NOT NULL, ts REAL NOT NULL)")
+            self._db.execute("CREATE TABLE IF NOT EXISTS history (ts REAL NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS history_key_ts ON history (key, ts)")
+
+    def _connect(self, readonly: bool = False):
+        if readonly:
+            db = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def _load(self):
+        with self._db_lock:
+            rows = self._db.execute("SELECT key, value FROM state").fetchall()
+        return {k: json.loads(v) for k, v in rows}
+
+    def _commit(self, changes, rows):
+        now = time.time()
+        upserts = [(k, _dumps(v), now) for k, v in changes.items() if v is not _DELETED]
+        deletes = [(k,) for k, v in changes.items() if v is _DELETED]
+        with self._db_lock, self._db:
+            if upserts:
+                self._db.executemany(
+                    "INSERT INTO state (key, value, ts) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value=excluded.value, ts=excluded.ts", upserts)
+            if deletes:
+                self._db.executemany("DELETE FROM state WHERE key = ?", deletes)
+            if rows:
+                self._db.executemany("INSERT INTO history (ts, key, value) VALUES (?, ?, ?)",
+                                     [(ts, k, _dumps(v)) for ts, k, v in rows if v is not _DELETED])
+
+    def _history(self, key, since, until, limit):
+        sql, args = "SELECT ts, value FROM history WHERE key = ?", [key]
+        if since is not None:
+            sql += " AND ts >= ?"
+            args.append(since)
+        if until is not None:
+            sql += " AND ts <= ?"
+            args.append(until)
+        sql += " ORDER BY ts"
+        if limit:
+            sql += " LIMIT ?"
+            args.append(limit)
+        db = self._connect(readonly=True)
+        try:
+            for ts, value in db.execute(sql, args):
+                yield ts, json.loads(value)
+        finally:
+            db.close()
+
+    def _compact(self):
+        cutoff = self._cutoff()
+        with self._db_lock:
+            if cutoff is not None:
+                with self._db:
+                    self._db.execute("DELETE FROM history WHERE ts < ?", (cutoff,))
+            self._db.execute("PRAGMA incremental_vacuum")
+            self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        super().close()
+        with self._db_lock:
+            self._db.close()
+
+
+class JournalStateStore(StateStore):
+    """
+    Append-only journal: one JSON line per commit ({"ts": .., "set": {..}, "del": [..],
+    "hist": [[ts, key, value], ..]}) after a snapshot file of the full state.
+    - A commit is one append + fsync. A torn last line (crash mid-append) is cut
+      off before the first append, so later commits land on a clean line.
+    - Compaction (once the journal passes compact_bytes) writes a fresh snapshot
+      atomically and rotates the journal to .1, so history() covers the current
+      and previous journal generation. Use the sqlite backend for long history.
+    """
+
+    def __init__(self, path: str, compact_bytes: int = 4 * 1024 * 1024, **kwargs):
+        super().__init__(path, **kwargs)
+        self.compact_bytes = compact_bytes
+        self.snapshot_path = f"{path}.snapshot"
+        self._state: Dict[str, Any] = {}
+        self._file = None
+        self._file_lock = threading.Lock()
+
+    def _load(self):
+        state = {}
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path) as f:
+                raw = f.read().strip()
+                state = json.loads(raw) if raw else {}
+        for entry in self._entries(self.path):
+            state.update(entry.get("set", {}))
+            for key in entry.get("del", []):
+                state.pop(key, None)
+        self._state = dict(state)
+        return state
+
+    def _commit(self, changes, rows):
+        entry = {
+            "ts": time.time(),
+            "set": {k: v for k, v in changes.items() if v is not _DELETED},
+            "del": [k for k, v in changes.items() if v is _DELETED],
+        }
+        if rows:
+            entry["hist"] = [[ts, k, v] for ts, k, v in rows if v is not _DELETED]
+        line = _dumps(entry) + "\n"
+        with self._file_lock:
+            if self._file is None:
+                self._trim_torn_tail(self.path)
+                self._file = open(self.path, "a")
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._state.update(entry["set"])
+            for key in entry["del"]:
+                self._state.pop(key, None)
+            full = self._file.tell() >= self.compact_bytes
+        if full:
+            self.compact()
+
+    def _history(self, key, since, until, limit):
+        n = 0
+        for path in (f"{self.path}.1", self.path):
+            for entry in self._entries(path):
+                for ts, k, value in entry.get("hist", []):
+                    if k != key or (since is not None and ts < since) or (until is not None and ts > until):
+                        continue
+                    yield ts, value
+                    n += 1
+                    if limit and n >= limit:
+                        return
+
+    def _compact(self):
+        with self._file_lock:
+            _atomic_write(self.snapshot_path, _dumps(self._state))
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if os.path.exists(self.path):
+                os.replace(self.path, f"{self.path}.1")
+
+    def close(self):
+        super().close()
+        with self._file_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    @staticmethod
+    def _entries(path: str) -> Iterator[Dict[str, Any]]:
+        if not os.path.exists(path):
+            return
+        with open(path) as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # torn line from a crash mid-append
+
+    @staticmethod
+    def _trim_torn_tail(path: str):
+        """
+        Truncate the journal back to its last complete line.
+        """
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return
+        with open(path, "rb+") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) == b"\n":
+                return
+            f.seek(0)
+            end = f.read().rfind(b"\n") + 1
+            f.truncate(end)
+            f.flush()
+            os.fsync(f.fileno())
+        print(f"[JournalStateStore] Dropped torn tail of {path} at byte {end}")
+
+
+class JsonFileStateStore(StateStore):
+    """
+    Legacy single JSON file, now written atomically (tmp + fsync + rename).
+    Still rewrites the whole dict per commit; history() is not supported.
+    """
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(path, **kwargs)
+        self._state: Dict[str, Any] = {}
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path) as f:
+            raw = f.read().strip()
+        self._state = json.loads(raw) if raw else {}
+        return dict(self._state)
+
+    def _commit(self, changes, rows):
+        for key, value in changes.items():
+            if value is _DELETED:
+                self._state.pop(key, None)
+            else:
+                self._state[key] = value
+        _atomic_write(self.path, json.dumps(self._state, indent=2))
+
+    def _history(self, key, since, until, limit):
+        return iter(())
+
+
+_BACKENDS = {
+    "sqlite": (SQLiteStateStore, ".db"),
+    "journal": (JournalStateStore, ".journal"),
+    "json": (JsonFileStateStore, ""),
+}
+
+
+def open_state_store(base_path: str = "./.state", backend: str = STATE_BACKEND, **kwargs) -> StateStore:
+    """
+    Opens base_path + the backend's suffix (.state.db, .state.journal, .state).
+    A legacy JSON file at base_path is imported once into an empty sqlite/journal store.
+    """
+    if backend not in _BACKENDS:
+        raise ValueError(f"STATE_BACKEND must be one of {', '.join(_BACKENDS)}")
+    cls, suffix = _BACKENDS[backend]
+    store = cls(base_path + suffix, **kwargs)
+    if suffix and os.path.exists(base_path) and not store.load():
+        try:
+            legacy = JsonFileStateStore(base_path).load()
+        except Exception as e:
+            print(f"[StateStore] Could not import legacy {base_path}: {e}")
+            legacy = {}
+        if legacy:
+            store.put(legacy)
+            store.flush()
+            print(f"[StateStore] Imported {len(legacy)} keys from {base_path} into {store.path}")
+    return store
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Query state history")
+    ap.add_argument("path", help=".state.db or .state.journal")
+    ap.add_argument("key", nargs="?", help="history key; omit to print current state")
+    ap.add_argument("--since")
+    ap.add_argument("--until")
+    ap.add_argument("--limit", type=int)
+    args = ap.parse_args()
+
+    cls = JournalStateStore if args.path.endswith(".journal") else SQLiteStateStore
+    store = cls(args.path)
+    if args.key is None:
+        print(json.dumps(store.load(), indent=2))
+        return
+    for ts, value in store.history(args.key, args.since, args.until, args.limit):
+        print(f"{datetime.fromtimestamp(ts, timezone.utc).isoformat()}\t{_dumps(value)}")
+
+
+if __name__ == "__main__":
+    main()
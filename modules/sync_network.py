@@ -1,38 +1,145 @@
-import json, requests, os, time
+import argparse, json, requests, os, time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from requests.adapters import HTTPAdapter
 
 REGISTRY_PATH = os.path.expanduser("~/governor_ai/network/registry.json")
 
-def ping_node(node):
-    """Ping a node's /health endpoint and return status."""
+HISTORY_SIZE = 100   # latency samples kept per node
+P50_DRIFT = 0.25     # --watch rewrites an entry when its p50 moves by more than this
+P50_DRIFT_MIN_MS = 5.0  # ... and by more than this many ms (ignores jitter on fast nodes)
+
+def make_session(workers=128):
+    """One pooled session shared by all pings (keep-alive across --watch rounds)."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def probe_node(node, session=None, timeout=5):
+    """Ping a node's /health endpoint and return (status, latency_ms)."""
+    t0 = time.perf_counter()
     try:
-        r = requests.get(f"{node['url'].rstrip('/')}/health", timeout=5)
+        r = (session or requests).get(f"{node['url'].rstrip('/')}/health", timeout=timeout)
+        latency_ms = (time.perf_counter() - t0) * 1000.0
         if r.status_code == 200 and "ok" in r.text.lower():
-            return "active"
-        return "unresponsive"
+            return "active", latency_ms
+        return "unresponsive", latency_ms
     except Exception:
-        return "offline"
+        return "offline", None
+
+def ping_node(node):
+    """Ping a node's /health endpoint and return status."""
+    return probe_node(node)[0]
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
 
-def sync_registry():
-    """Ping all nodes and update registry.json dynamically."""
-    if not os.path.exists(REGISTRY_PATH):
+def load_registry(path=REGISTRY_PATH):
+    with open(path, "r") as f:
+        return json.load(f)
+
+def save_registry(registry, path=REGISTRY_PATH):
+    """Atomic write: temp file in the same directory, fsync, rename over."""
+    tmp = f"{path}.tmp.{os.getpid()}"
+    with open(tmp, "w") as f:
+        json.dump(registry, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def _node_key(node):
+    return node.get("id") or node["url"]
+
+def ping_all(nodes, session, history, timeout=5, workers=128):
+    """
+    Pings every node concurrently; returns {node key: fields to store}.
+    history maps node key -> deque of recent latencies (kept by the caller across rounds).
+    """
+    if not nodes:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(workers, len(nodes))) as pool:
+        results = list(pool.map(lambda n: probe_node(n, session, timeout), nodes))
+
+    now = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+    updates = {}
+    for node, (status, latency_ms) in zip(nodes, results):
+        samples = history.setdefault(_node_key(node), deque(maxlen=HISTORY_SIZE))
+        if latency_ms is not None:
+            samples.append(latency_ms)
+        fields = {"status": status, "last_ping": now,
+                  "latency_ms": round(latency_ms, 1) if latency_ms is not None else None}
+        if samples:
+            fields["latency_p50_ms"] = round(percentile(samples, 0.50), 1)
+            fields["latency_p99_ms"] = round(percentile(samples, 0.99), 1)
+        updates[_node_key(node)] = fields
+        label = f"{latency_ms:.0f}ms" if latency_ms is not None else "-"
+        print(f"[{node.get('name', _node_key(node))}] {status} ({label})")
+    return updates
+
+def _changed(node, fields):
+    if node.get("status") != fields["status"]:
+        return True
+    old, new = node.get("latency_p50_ms"), fields.get("latency_p50_ms")
+    if old is None or new is None:
+        return old != new
+    return abs(new - old) > max(P50_DRIFT * old, P50_DRIFT_MIN_MS)
+
+def sync_registry(path=REGISTRY_PATH, session=None, history=None, timeout=5, workers=128, only_changed=False):
+    """
+    Ping all nodes and update registry.json dynamically.
+    With only_changed, entries keep their stored values unless the status flipped
+    or p50 latency drifted, and the file is not rewritten if nothing changed.
+    Returns the number of entries written.
+    """
+    if not os.path.exists(path):
         print("Registry file not found.")
-        return
+        return 0
 
-    with open(REGISTRY_PATH, "r") as f:
-        registry = json.load(f)
+    registry = load_registry(path)
+    nodes = registry.get("nodes", [])
+    t0 = time.perf_counter()
+    updates = ping_all(nodes, session or make_session(workers), history if history is not None else {},
+                       timeout=timeout, workers=workers)
 
-    for node in registry.get("nodes", []):
-        status = ping_node(node)
-        node["status"] = status
-        node["last_ping"] = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-        print(f"[{node['name']}] {status}")
+    written = 0
+    for node in nodes:
+        fields = updates.get(_node_key(node))
+        if fields and (not only_changed or _changed(node, fields)):
+            node.update(fields)
+            written += 1
 
     # Save updated registry
-    with open(REGISTRY_PATH, "w") as f:
-        json.dump(registry, f, indent=2)
+    if written:
+        save_registry(registry, path)
+    print(f"Registry sync complete: {len(nodes)} nodes in {time.perf_counter() - t0:.2f}s, "
+          f"{written} entries updated.")
+    return written
 
-    print("Registry sync complete.")
+def watch(path=REGISTRY_PATH, interval=30.0, timeout=5, workers=128):
+    """Re-pings on an interval, reusing one session and keeping latency history."""
+    session, history = make_session(workers), {}
+    while True:
+        started = time.monotonic()
+        try:
+            sync_registry(path, session=session, history=history, timeout=timeout,
+                          workers=workers, only_changed=True)
+        except Exception as e:
+            print(f"Registry sync failed: {e}")
+        time.sleep(max(0.0, interval - (time.monotonic() - started)))
 
 if __name__ == "__main__":
-    sync_registry()
+    ap = argparse.ArgumentParser(description="Ping every node in the registry and record health/latency.")
+    ap.add_argument("--registry", default=REGISTRY_PATH)
+    ap.add_argument("--timeout", type=float, default=5.0)
+    ap.add_argument("--workers", type=int, default=128)
+    ap.add_argument("--watch", action="store_true", help="re-ping forever, persisting only changed entries")
+    ap.add_argument("--interval", type=float, default=30.0)
+    args = ap.parse_args()
+    if args.watch:
+        watch(args.registry, args.interval, args.timeout, args.workers)
+    else:
+        sync_registry(args.registry, timeout=args.timeout, workers=args.workers)
@@ -0,0 +1,299 @@
+# ~/governor_ai/modules/trade_analytics.py
+"""
+Fill analytics on NumPy columns: FIFO inventory matching, realized and
+unrealized P&L, drawdown, rolling win rate and per-hour stats.
+
+Fills are (ts, side +1 buy / -1 sell, qty XRP, price QUOTE/XRP). Quantities
+are matched in integer micro-XRP, so FIFO lot boundaries are exact:
+the k-th unit bought is closed by the k-th unit sold (a sell beyond the
+long inventory opens a short that later buys cover), which is what a FIFO
+queue does, computed with two cumsums and a searchsorted.
+"""
+
+import re
+import time
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, Tuple
+
+import numpy as np
+
+UNITS = 1_000_000  # micro-XRP per XRP
+
+# "[2025-11-03T14:40:17.384784] ... [Arb][SIM] BUY 5.000000 XRP @ 0.512345"
+FILL_PATTERN = re.compile(
+    rb"^(?:\[(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(?:\.\d+)?)[^\]\n]*\])?[^\n]*?"
+    rb"\[Arb\]\[SIM\] (BUY|SELL) (\d+\.\d+) XRP @ (\d+\.\d+)", re.M)
+
+
+class Fills:
+    """
+    Append-only fill columns (ts, side, qty, price) in amortized-doubling arrays.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._ts = np.empty(capacity, dtype=np.float64)
+        self._side = np.empty(capacity, dtype=np.int8)
+        self._qty = np.empty(capacity, dtype=np.float64)
+        self._price = np.empty(capacity, dtype=np.float64)
+        self.n = 0
+
+    def __len__(self) -> int:
+        return self.n
+
+    @classmethod
+    def from_arrays(cls, ts, side, qty, price) -> "Fills":
+        fills = cls(max(1, len(ts)))
+        fills.extend(ts, side, qty, price)
+        return fills
+
+    def extend(self, ts, side, qty, price):
+        k = len(ts)
+        if self.n + k > len(self._ts):
+            cap = max(self.n + k, 2 * len(self._ts))
+            for name in ("_ts", "_side", "_qty", "_price"):
+                old = getattr(self, name)
+                new = np.empty(cap, dtype=old.dtype)
+                new[:self.n] = old[:self.n]
+                setattr(self, name, new)
+        end = self.n + k
+        self._ts[self.n:end] = ts
+        self._side[self.n:end] = side
+        self._qty[self.n:end] = qty
+        self._price[self.n:end] = price
+        self.n = end
+
+    @property
+    def ts(self):
+        return self._ts[:self.n]
+
+    @property
+    def side(self):
+        return self._side[:self.n]
+
+    @property
+    def qty(self):
+        return self._qty[:self.n]
+
+    @property
+    def price(self):
+        return self._price[:self.n]
+
+
+def parse_fills(data: bytes) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Extracts every simulated fill from a block of complete log lines.
+    Lines without a leading ISO timestamp get ts = nan.
+    """
+    found = FILL_PATTERN.findall(_sim_lines(data))
+    if not found:
+        empty = np.empty(0)
+        return empty, np.empty(0, dtype=np.int8), empty, empty
+    ts_raw, side_raw, qty_raw, price_raw = zip(*found)
+    stamps = np.array(ts_raw).astype("U32")
+    ts = np.full(len(found), np.nan)
+    has_ts = stamps != ""
+    if has_ts.any():
+        ts[has_ts] = stamps[has_ts].astype("datetime64[us]").astype(np.int64) / 1e6
+    side = np.where(np.array(side_raw) == b"BUY", 1, -1).astype(np.int8)
+    return ts, side, np.array(qty_raw).astype(np.float64), np.array(price_raw).astype(np.float64)
+
+
+def _sim_lines(data: bytes) -> bytes:
+    # Jump between "[Arb][SIM]" hits; the regex then only sees fill lines
+    out, pos = [], data.find(b"[Arb][SIM]")
+    while pos != -1:
+        start = data.rfind(b"\n", 0, pos) + 1
+        end = data.find(b"\n", pos)
+        if end == -1:
+            out.append(data[start:])
+            break
+        out.append(data[start:end + 1])
+        pos = data.find(b"[Arb][SIM]", end)
+    return b"".join(out)
+
+
+def load_fills(path: str, chunk_size: int = 64 << 20) -> Fills:
+    """
+    Reads a whole log into Fills, chunk by chunk (cut at line boundaries).
+    """
+    fills, partial = Fills(), b""
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            data = partial + chunk
+            cut = data.rfind(b"\n") + 1
+            partial = data[cut:]
+            fills.extend(*parse_fills(data[:cut]))
+    if partial:
+        fills.extend(*parse_fills(partial))
+    return fills
+
+
+def fifo_match(side, qty, price) -> Dict[str, Any]:
+    """
+    FIFO round trips between buys and sells.
+    Returns per matched lot: buy (fill index), sell (fill index), qty, pnl;
+    plus the open position (signed XRP) and its FIFO cost basis (QUOTE).
+    """
+    units = np.rint(qty * UNITS).astype(np.int64)
+    buys, sells = np.flatnonzero(side > 0), np.flatnonzero(side < 0)
+    cb, cs = np.cumsum(units[buys]), np.cumsum(units[sells])
+    total_b = int(cb[-1]) if len(cb) else 0
+    total_s = int(cs[-1]) if len(cs) else 0
+    matched = min(total_b, total_s)
+
+    # Segment boundaries: every lot edge on either side up to the matched total
+    # (both cumsums are sorted, so a stable sort is a linear merge of two runs)
+    edges = np.concatenate(([0], cb[cb < matched], cs[cs < matched], [matched]))
+    edges.sort(kind="stable")
+    edges = edges[np.concatenate(([True], edges[1:] != edges[:-1]))]
+    lo, seg = edges[:-1], np.diff(edges)
+    bi = np.searchsorted(cb, lo, side="right")
+    si = np.searchsorted(cs, lo, side="right")
+    buy_idx, sell_idx = buys[bi], sells[si]
+    seg_qty = seg / UNITS
+    pnl = seg_qty * (price[sell_idx] - price[buy_idx])
+
+    # Open inventory: the units of the heavier side past the matched total
+    if total_b > total_s:
+        lots, cum, sign = buys, cb, 1
+    else:
+        lots, cum, sign = sells, cs, -1
+    start = cum - units[lots]
+    remaining = np.clip(cum - np.maximum(start, matched), 0, None)
+    open_units = int(remaining.sum())
+    return {
+        "buy": buy_idx,
+        "sell": sell_idx,
+        "qty": seg_qty,
+        "pnl": pnl,
+        "position": sign * open_units / UNITS,
+        "open_cost": float(np.dot(remaining / UNITS, price[lots])) if open_units else 0.0,
+    }
+
+
+def analyze(fills: Fills, mark: Optional[float] = None, window: int = 100,
+            curve_points: int = 200) -> Dict[str, Any]:
+    """
+    Full report over all fills. mark prices the open position (default: last fill).
+    Trades are FIFO round trips (matched lots), dated by their closing fill.
+    """
+    t0 = time.perf_counter()
+    ts, side, qty, price = fills.ts, fills.side, fills.qty, fills.price
+    n = len(fills)
+    report = {
+        "total_trades": 0, "total_profit": 0.0, "average_profit": 0.0, "win_rate": 0,
+        "fills": n, "buys": int((side > 0).sum()), "sells": int((side < 0).sum()),
+        "volume_xrp": float(qty.sum()),
+    }
+    if n == 0:
+        report["last_updated"] = _now_iso()
+        return report
+
+    m = fifo_match(side, qty, price)
+    close = np.maximum(m["buy"], m["sell"])
+    order = np.argsort(close, kind="stable")
+    pnl, close = m["pnl"][order], close[order]
+    trades = len(pnl)
+    realized = float(pnl.sum())
+    wins = pnl > 0
+
+    mark = float(price[-1]) if mark is None else mark
+    position = m["position"]
+    if position > 0:
+        unrealized = position * mark - m["open_cost"]
+    elif position < 0:
+        unrealized = m["open_cost"] + position * mark
+    else:
+        unrealized = 0.0
+
+    # Mark-to-market equity after each fill, marked at that fill's price
+    signed = side * qty
+    equity = np.cumsum(-signed * price) + np.cumsum(signed) * price
+    peak = np.maximum.accumulate(equity)
+    drawdown = peak - equity
+    trough = int(np.argmax(drawdown))
+    peak_at = int(np.argmax(equity[:trough + 1]))
+
+    report.update({
+        "total_trades": trades,
+        "total_profit": realized,
+        "average_profit": realized / trades if trades else 0,
+        "win_rate": float(wins.mean() * 100) if trades else 0,
+        "realized_pnl": realized,
+        "unrealized_pnl": float(unrealized),
+        "total_pnl": realized + float(unrealized),
+        "position_xrp": position,
+        "avg_entry_price": m["open_cost"] / abs(position) if position else None,
+        "mark_price": mark,
+        "gross_profit": float(pnl[wins].sum()),
+        "gross_loss": float(pnl[~wins].sum()),
+        "max_drawdown": float(drawdown[trough]),
+        "max_drawdown_from": _iso(ts[peak_at]),
+        "max_drawdown_to": _iso(ts[trough]),
+        "current_drawdown": float(drawdown[-1]),
+        "rolling_win_rate": _rolling_win_rate(wins, ts[close], window, curve_points),
+        "per_hour": _per_hour(ts, qty, close, pnl, wins),
+        "equity_curve": _sample(ts, equity, curve_points),
+    })
+    report["analytics_ms"] = round((time.perf_counter() - t0) * 1000.0, 2)
+    report["last_updated"] = _now_iso()
+    return report
+
+
+def _rolling_win_rate(wins, ts, window: int, points: int) -> Dict[str, Any]:
+    if len(wins) < window:
+        return {"window": window, "last": float(wins.mean() * 100) if len(wins) else None, "series": []}
+    c = np.concatenate(([0], np.cumsum(wins)))
+    rate = (c[window:] - c[:-window]) * (100.0 / window)
+    return {
+        "window": window,
+        "last": float(rate[-1]),
+        "min": float(rate.min()),
+        "max": float(rate.max()),
+        "series": _sample(ts[window - 1:], rate, points),
+    }
+
+
+def _per_hour(ts, qty, close, pnl, wins):
+    """
+    Activity by UTC hour of day: fills and volume by fill time, trades,
+    wins and realized P&L by closing-fill time.
+    """
+    valid = ~np.isnan(ts)
+    hour = np.zeros(len(ts), dtype=np.int64)
+    hour[valid] = ts[valid].astype(np.int64) // 3600 % 24
+    fills = np.bincount(hour[valid], minlength=24)
+    volume = np.bincount(hour[valid], weights=qty[valid], minlength=24)
+    closed = valid[close]
+    h = hour[close][closed]
+    trades = np.bincount(h, minlength=24)
+    won = np.bincount(h, weights=wins[closed], minlength=24)
+    profit = np.bincount(h, weights=pnl[closed], minlength=24)
+    return [{
+        "hour": int(i),
+        "fills": int(fills[i]),
+        "volume_xrp": float(volume[i]),
+        "trades": int(trades[i]),
+        "profit": float(profit[i]),
+        "win_rate": float(won[i] / trades[i] * 100) if trades[i] else None,
+    } for i in range(24) if fills[i] or trades[i]]
+
+
+def _sample(ts, values, points: int):
+    if len(values) == 0:
+        return []
+    idx = np.unique(np.linspace(0, len(values) - 1, min(points, len(values))).astype(np.int64))
+    return [[_iso(ts[i]), round(float(values[i]), 6)] for i in idx]
+
+
+def _iso(t) -> Optional[str]:
+    if t is None or np.isnan(t):
+        return None
+    return datetime.fromtimestamp(float(t), timezone.utc).isoformat()
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
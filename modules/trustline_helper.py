@@ -1,57 +1,118 @@
 # ~/governor_ai/modules/trustline_helper.py
-from xrpl.clients import JsonRpcClient
+import time
+from typing import Optional, Dict, Any, List, Tuple
+
 from xrpl.models.transactions import TrustSet
-from xrpl.transaction import safe_sign_and_autofill_transaction, send_reliable_submission
 from xrpl.models.requests import AccountLines
 from datetime import datetime, timezone
 
+from modules.autofill import get_autofill_manager
+from modules.order_pipeline import OrderPipeline
+from modules.rpc_pool import get_client
+
 class TrustlineHelper:
     """
     Handles XRPL trustlines for the Governor AI wallet.
     Allows the wallet to hold issued tokens (like USD, EUR, etc).
+    - Existing lines are loaded once (following AccountLines markers) into a
+      (currency, issuer) index.
+    - ensure_trustlines() submits every missing TrustSet back to back on
+      consecutive sequences and waits for them together.
     """
 
     def __init__(self, xrpl_url: str, wallet):
-        self.client = JsonRpcClient(xrpl_url)
+        self.client = get_client(xrpl_url)
         self.wallet = wallet
         self.address = wallet.classic_address
+        self.autofill = get_autofill_manager(self.client, wallet)
+        self.pipeline: Optional[OrderPipeline] = None
+
+    def load_lines(self, page_size: int = 400) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """
+        All of the wallet's trustlines keyed by (currency, issuer).
+        """
+        lines, marker = {}, None
+        while True:
+            resp = self.client.request(AccountLines(account=self.address, ledger_index="validated",
+                                                    limit=page_size, marker=marker))
+            if not resp.is_successful():
+                if resp.result.get("error") == "actNotFound":
+                    return lines
+                raise RuntimeError(f"account_lines failed: {resp.result.get('error')}")
+            for line in resp.result.get("lines", []):
+                lines[(line["currency"], line["account"])] = line
+            marker = resp.result.get("marker")
+            if marker is None:
+                return lines
 
     def has_trustline(self, issuer: str, currency: str) -> bool:
         """
         Checks if the wallet already has a trustline for a specific issuer + currency.
         """
         try:
-            req = AccountLines(account=self.address)
-            resp = self.client.request(req)
-            for line in resp.result.get("lines", []):
-                if line["account"] == issuer and line["currency"] == currency:
-                    return True
-            return False
+            return (currency, issuer) in self.load_lines()
         except Exception as e:
             print(f"[TrustlineHelper] Trustline check failed: {e}")
             return False
 
-    def create_trustline(self, issuer: str, currency: str, limit="1000000000"):
+    def ensure_trustlines(self, wanted: List[Tuple[str, str, str]], timeout: float = 60.0) -> List[Dict[str, Any]]:
         """
-        Creates a trustline to a given issuer (like a USD gateway).
+        Makes sure a trustline exists for each (currency, issuer, limit).
+        Returns one result per distinct line, with status "exists", "validated",
+        "failed", "expired" or "timeout".
         """
-        try:
-            if self.has_trustline(issuer, currency):
-                print(f"[TrustlineHelper] Wallet already has trustline for {currency}:{issuer}")
-                return
-
-            print(f"[TrustlineHelper] Creating trustline for {currency}:{issuer}...")
+        t0 = time.perf_counter()
+        existing = self.load_lines()
+        results, tickets, seen = [], [], set()
+        for currency, issuer, limit in wanted:
+            if (currency, issuer) in seen:
+                continue
+            seen.add((currency, issuer))
+            row = {"currency": currency, "issuer": issuer, "limit": str(limit)}
+            results.append(row)
+            if (currency, issuer) in existing:
+                row["status"] = "exists"
+                continue
             tx = TrustSet(
                 account=self.address,
                 limit_amount={
                     "currency": currency,
                     "issuer": issuer,
-                    "value": limit,
+                    "value": str(limit),
                 }
             )
-            signed_tx = safe_sign_and_autofill_transaction(tx, self.wallet, self.client)
-            tx_result = send_reliable_submission(signed_tx, self.client)
+            tickets.append((row, self._pipeline().submit(tx)))
+
+        if tickets:
+            print(f"[TrustlineHelper] Creating {len(tickets)} trustline(s) "
+                  f"({len(results) - len(tickets)} already present)...")
+        deadline = time.monotonic() + timeout
+        for row, ticket in tickets:
+            done = ticket.wait(max(0.0, deadline - time.monotonic()))
+            row.update(status=ticket.status if done else "timeout", result=ticket.result or ticket.error,
+                       tx_hash=ticket.tx_hash, sequence=ticket.sequence, ledger_index=ticket.ledger_index)
+
+        ts = datetime.now(timezone.utc).isoformat()
+        ok = sum(1 for r in results if r["status"] in ("exists", "validated"))
+        print(f"[TrustlineHelper] {ts} | {ok}/{len(results)} trustlines in place "
+              f"({time.perf_counter() - t0:.1f}s)")
+        return results
+
+    def create_trustline(self, issuer: str, currency: str, limit="1000000000"):
+        """
+        Creates a trustline to a given issuer (like a USD gateway).
+        """
+        try:
+            row = self.ensure_trustlines([(currency, issuer, limit)])[0]
+            if row["status"] == "exists":
+                print(f"[TrustlineHelper] Wallet already has trustline for {currency}:{issuer}")
+                return
             ts = datetime.now(timezone.utc).isoformat()
-            print(f"[TrustlineHelper] {ts} | Trustline transaction result: {tx_result.result['engine_result']}")
+            print(f"[TrustlineHelper] {ts} | Trustline transaction result: {row['result']} ({row['status']})")
         except Exception as e:
             print(f"[TrustlineHelper] Failed: {e}")
+
+    def _pipeline(self) -> OrderPipeline:
+        if self.pipeline is None:
+            self.pipeline = OrderPipeline(self.client, self.wallet, max_in_flight=256, autofill=self.autofill)
+        return self.pipeline
@@ -0,0 +1,146 @@
+# ~/governor_ai/modules/tx_export.py
+"""
+Full-history AccountTx export.
+- Follows AccountTx markers page by page (bounded memory: one page at a time).
+- Writes compact NDJSON (one transaction per line) or flat CSV columns.
+- Checkpoints the next marker and the output size after every page, so an
+  interrupted export resumes where it stopped.
+
+  python -m modules.tx_export rADDRESS --out logs/rADDRESS.ndjson
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+from typing import Optional, Dict, Any, Iterator, List, Tuple
+
+from xrpl.models.requests import AccountTx
+
+from modules.rpc_pool import get_client
+
+CSV_COLUMNS = ["hash", "ledger_index", "date", "type", "account", "destination",
+               "amount", "fee", "sequence", "result"]
+
+
+def iter_pages(client, account: str, marker: Optional[Any] = None,
+               page_size: int = 200, forward: bool = True) -> Iterator[Tuple[List[Dict[str, Any]], Optional[Any]]]:
+    """
+    Yields (transactions, next_marker) for each AccountTx page; next_marker is None on the last page.
+    """
+    while True:
+        resp = client.request(AccountTx(account=account, limit=page_size, marker=marker, forward=forward))
+        if not resp.is_successful():
+            raise RuntimeError(f"account_tx failed: {resp.result.get('error_message') or resp.result.get('error')}")
+        marker = resp.result.get("marker")
+        yield resp.result.get("transactions", []), marker
+        if marker is None:
+            return
+
+
+def flatten(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    One AccountTx entry (API v1 "tx" or v2 "tx_json") as CSV_COLUMNS.
+    """
+    tx = entry.get("tx_json") or entry.get("tx") or {}
+    meta = entry.get("meta") or {}
+    amount = tx.get("Amount", tx.get("DeliverMax", ""))
+    if isinstance(amount, dict):
+        amount = f"{amount.get('value')} {amount.get('currency')}.{amount.get('issuer')}"
+    return {
+        "hash": entry.get("hash", tx.get("hash", "")),
+        "ledger_index": entry.get("ledger_index", tx.get("ledger_index", "")),
+        "date": entry.get("close_time_iso", tx.get("date", "")),
+        "type": tx.get("TransactionType", ""),
+        "account": tx.get("Account", ""),
+        "destination": tx.get("Destination", ""),
+        "amount": amount,
+        "fee": tx.get("Fee", ""),
+        "sequence": tx.get("Sequence", ""),
+        "result": meta.get("TransactionResult", "") if isinstance(meta, dict) else "",
+    }
+
+
+def ndjson_line(entry: Dict[str, Any]) -> str:
+    return json.dumps(entry, separators=(",", ":")) + "\n"
+
+
+def csv_line(entry: Dict[str, Any]) -> str:
+    buf = io.StringIO()
+    csv.DictWriter(buf, fieldnames=CSV_COLUMNS, lineterminator="\n").writerow(flatten(entry))
+    return buf.getvalue()
+
+
+def _load_checkpoint(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _save_checkpoint(path: str, state: Dict[str, Any]):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def export_account_tx(account: str,
+                      out_path: str,
+                      fmt: str = "ndjson",
+                      checkpoint_path: Optional[str] = None,
+                      page_size: int = 200,
+                      client=None) -> Dict[str, Any]:
+    """
+    Exports the account's full history to out_path, resuming from checkpoint_path
+    (default: out_path + ".ckpt") if present. Returns the final checkpoint state.
+    """
+    if fmt not in ("ndjson", "csv"):
+        raise ValueError("fmt must be 'ndjson' or 'csv'")
+    client = client or get_client()
+    checkpoint_path = checkpoint_path or f"{out_path}.ckpt"
+    render = ndjson_line if fmt == "ndjson" else csv_line
+
+    state = _load_checkpoint(checkpoint_path)
+    if state and (state.get("account") != account or state.get("format") != fmt):
+        raise ValueError(f"Checkpoint {checkpoint_path} belongs to a different export")
+    if state and state.get("done"):
+        return state
+    if not state:
+        state = {"account": account, "format": fmt, "marker": None, "count": 0, "offset": 0, "done": False}
+
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    with open(out_path, "a+b") as out:
+        # Drop anything written after the last checkpoint (page cut off mid-write)
+        out.truncate(state["offset"])
+        out.seek(state["offset"])
+        if state["offset"] == 0 and fmt == "csv":
+            out.write((",".join(CSV_COLUMNS) + "\n").encode())
+
+        pages = iter_pages(client, account, marker=state["marker"], page_size=page_size)
+        for txs, marker in pages:
+            out.write("".join(render(t) for t in txs).encode())
+            out.flush()
+            os.fsync(out.fileno())
+            state.update(marker=marker, count=state["count"] + len(txs), offset=out.tell(), done=marker is None)
+            _save_checkpoint(checkpoint_path, state)
+            print(f"[TxExport] {account}: {state['count']} transactions exported")
+    return state
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("account")
+    ap.add_argument("--out", required=True)
+    ap.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    ap.add_argument("--checkpoint", default=None)
+    ap.add_argument("--page-size", type=int, default=200)
+    ap.add_argument("--rpc", default=None, help="rippled JSON-RPC URL (default: XRPL_RPC_URL)")
+    args = ap.parse_args()
+    final = export_account_tx(args.account, args.out, fmt=args.format, checkpoint_path=args.checkpoint,
+                              page_size=args.page_size, client=get_client(args.rpc))
+    print(f"[TxExport] Done: {final['count']} transactions -> {args.out}")
@@ -2,21 +2,24 @@
 
 from datetime import datetime, timezone
 from xrpl.wallet import Wallet
-from xrpl.clients import JsonRpcClient
 from xrpl.models.requests import AccountInfo
 
+from modules.rpc_pool import get_client
+from modules.ledger_cache import get_cached_client
+
 class WalletService:
     """
     XRPL wallet wrapper for Governor AI.
     - Loads wallet from family seed
     - Exposes .wallet and .address
-    - Provides get_balance() via AccountInfo
+    - Provides get_balance() via AccountInfo (cached per validated ledger)
     """
 
     def __init__(self, xrpl_url: str, seed: str):
         if not seed:
             raise ValueError("Missing XRPL seed")
-        self.client = JsonRpcClient(xrpl_url)
+        self.client = get_client(xrpl_url)
+        self.cache = get_cached_client(xrpl_url)
         self.wallet = Wallet.from_seed(seed)   # correct for family seed
         self.address = self.wallet.classic_address
 
@@ -26,13 +29,26 @@ class WalletService:
         """
         try:
             req = AccountInfo(account=self.address, ledger_index="validated", strict=True)
-            resp = self.client.request(req)
+            resp = self.cache.request(req)
             drops = int(resp.result["account_data"]["Balance"])
             return drops / 1_000_000.0
         except Exception as e:
             print(f"[WalletService] Balance fetch failed: {e}")
             return None
 
+    def last_changed_ledger(self):
+        """
+        Validated ledger that last modified this account (AccountRoot
+        PreviousTxnLgrSeq), or None. Shares get_balance()'s cached request.
+        """
+        try:
+            req = AccountInfo(account=self.address, ledger_index="validated", strict=True)
+            resp = self.cache.request(req)
+            return resp.result["account_data"].get("PreviousTxnLgrSeq")
+        except Exception as e:
+            print(f"[WalletService] Account lookup failed: {e}")
+            return None
+
     def log_balance(self):
         ts = datetime.now(timezone.utc).isoformat()
         bal = self.get_balance()
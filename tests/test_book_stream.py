@@ -0,0 +1,132 @@
+# ~/governor_ai/tests/test_book_stream.py
+"""
+BookStream against a fake websocket: snapshot, Offer create/modify/delete
+from validated transactions, then a reconnect that re-seeds the book.
+"""
+
+import json
+import threading
+
+import pytest
+
+from modules import book_stream
+from modules.book_stream import BookStream
+
+USD = "USD"
+ISSUER = "rhub8VRN55s94qWKDv6jmDy1pUykJzF3wq"
+
+
+def usd(value):
+    return {"currency": USD, "issuer": ISSUER, "value": str(value)}
+
+
+def ask(index, xrp, price):
+    # Selling XRP: taker gets XRP (drops), pays USD
+    return {"index": index, "TakerGets": str(int(xrp * 1_000_000)), "TakerPays": usd(xrp * price)}
+
+
+def bid(index, xrp, price):
+    # Buying XRP: taker gets USD, pays XRP (drops)
+    return {"index": index, "TakerGets": usd(xrp * price), "TakerPays": str(int(xrp * 1_000_000))}
+
+
+def snapshot(asks, bids):
+    # rippled with both=true: the subscribed book (taker gets XRP) comes back as "bids"
+    return {"type": "response", "status": "success", "id": "book-stream",
+            "result": {"bids": asks, "asks": bids}}
+
+
+def offer_tx(*nodes):
+    return {"type": "transaction", "validated": True, "meta": {"AffectedNodes": list(nodes)}}
+
+
+def node(kind, index, offer):
+    fields = {k: v for k, v in offer.items() if k != "index"}
+    body = {"LedgerEntryType": "Offer", "LedgerIndex": index}
+    body["NewFields" if kind == "CreatedNode" else "FinalFields"] = fields
+    return {kind: body}
+
+
+class FakeWebSocket:
+    def __init__(self, messages, on_drained):
+        self.messages = list(messages)
+        self.on_drained = on_drained
+        self.sent = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def send(self, data):
+        self.sent.append(json.loads(data))
+
+    def recv(self, timeout=None):
+        if self.messages:
+            return json.dumps(self.messages.pop(0))
+        self.on_drained()
+        raise ConnectionError("connection dropped")
+
+    def close(self):
+        pass
+
+
+def make_stream():
+    return BookStream("ws://fake", USD, ISSUER, recv_timeout=0.1)
+
+
+def test_snapshot_sides():
+    stream = make_stream()
+    stream._handle(snapshot([ask("A1", 10, 0.51), ask("A2", 5, 0.52)], [bid("B1", 8, 0.50)]))
+    book = stream.snapshot()
+    assert stream.best_bid_ask() == pytest.approx((0.50, 0.51))
+    assert book.asks.levels() == pytest.approx([(0.51, 10.0), (0.52, 5.0)])
+    assert book.bids.levels() == pytest.approx([(0.50, 8.0)])
+
+
+def test_offer_create_modify_delete():
+    stream = make_stream()
+    stream._handle(snapshot([ask("A1", 10, 0.51)], [bid("B1", 8, 0.50)]))
+
+    stream._handle(offer_tx(node("CreatedNode", "A0", ask("A0", 3, 0.505))))
+    assert stream.best_bid_ask() == pytest.approx((0.50, 0.505))
+
+    stream._handle(offer_tx(node("ModifiedNode", "A0", ask("A0", 1, 0.505))))
+    assert stream.snapshot().asks.levels(1) == pytest.approx([(0.505, 1.0)])
+
+    stream._handle(offer_tx(node("DeletedNode", "A0", ask("A0", 1, 0.505)),
+                            node("CreatedNode", "B2", bid("B2", 2, 0.502))))
+    assert stream.best_bid_ask() == pytest.approx((0.502, 0.51))
+
+
+def test_reconnect_reseeds_book(monkeypatch):
+    second_snapshot = threading.Event()
+    sessions = [
+        [snapshot([ask("A1", 10, 0.51)], [bid("B1", 8, 0.50)]),
+         offer_tx(node("CreatedNode", "B2", bid("B2", 2, 0.505)))],
+        [snapshot([ask("A9", 4, 0.53)], [bid("B9", 6, 0.49)])],
+    ]
+    stream = make_stream()
+    seen = []
+
+    def fake_connect(url, open_timeout=None):
+        messages = sessions.pop(0) if sessions else []
+        last = not sessions
+        return FakeWebSocket(messages, on_drained=(second_snapshot.set if last else lambda: None))
+
+    def on_update(kind):
+        seen.append((kind, stream.best_bid_ask()))
+
+    monkeypatch.setattr(book_stream, "connect", fake_connect)
+    stream.on_update = on_update
+    stream.start()
+    assert second_snapshot.wait(5.0)
+    stream.stop()
+
+    assert seen == [
+        ("snapshot", pytest.approx((0.50, 0.51))),
+        ("book", pytest.approx((0.505, 0.51))),
+        ("snapshot", pytest.approx((0.49, 0.53))),
+    ]
+    assert stream.reconnects >= 1
@@ -0,0 +1,105 @@
+# Tests for modules/node_router.py against local JSON-RPC stubs
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from xrpl.models.requests import ServerInfo
+
+from modules.node_router import NodeRouter, RoutedJsonRpcClient
+
+
+def stub(name, delay=0.0, error=None):
+    """
+    Local rippled stand-in: answers every JSON-RPC call after delay seconds
+    with info.node=name, or with a node-level error (e.g. tooBusy).
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(delay)
+            if error:
+                result = {"status": "error", "error": error}
+            else:
+                result = {"status": "success", "info": {"node": name}}
+            body = json.dumps({"result": result}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+@pytest.fixture
+def nodes():
+    servers = {}
+
+    def make(name, delay=0.0, error=None):
+        server, url = stub(name, delay, error)
+        servers[name] = server
+        return url
+
+    yield make
+    for server in servers.values():
+        server.shutdown()
+        server.server_close()
+
+
+def node_of(resp):
+    return resp.result["info"]["node"]
+
+
+def test_fastest_healthy_node_is_chosen(nodes):
+    fast, slow = nodes("fast"), nodes("slow", delay=0.08)
+    client = RoutedJsonRpcClient([slow, fast], router=NodeRouter([slow, fast], hedge=False, explore=0.0))
+    try:
+        # Both start unmeasured and get tried once; then the fast one wins every call
+        for _ in range(2):
+            client.request(ServerInfo())
+        assert client.router.best() == fast
+        assert [node_of(client.request(ServerInfo())) for _ in range(5)] == ["fast"] * 5
+    finally:
+        client.close()
+
+
+def test_failing_node_leaves_rotation(nodes):
+    bad, good = nodes("bad", error="tooBusy"), nodes("good", delay=0.01)
+    router = NodeRouter([bad, good], hedge=False, explore=0.0, eject_after=2, eject_secs=60.0)
+    router.observe(bad, 1.0)  # looks fastest until it starts failing
+    client = RoutedJsonRpcClient([bad, good], router=router)
+    try:
+        answers = [node_of(client.request(ServerInfo())) for _ in range(4)]
+        assert answers == ["good"] * 4
+        bad_ep = router._endpoint(bad)
+        assert not bad_ep.admitted(time.monotonic())
+        assert bad_ep.errors == 2
+        assert [ep.url for ep in router.ranked()] == [good]
+    finally:
+        client.close()
+
+
+def test_hedged_request_returns_faster_answer(nodes):
+    stalled, quick = nodes("stalled", delay=0.5), nodes("quick", delay=0.01)
+    router = NodeRouter([stalled, quick], hedge_min_ms=20.0, explore=0.0)
+    router.observe(stalled, 1.0)  # ranked first, so it is the primary
+    router.observe(quick, 5.0)
+    client = RoutedJsonRpcClient([stalled, quick], router=router)
+    try:
+        t0 = time.perf_counter()
+        resp = client.request(ServerInfo())
+        elapsed = time.perf_counter() - t0
+        assert node_of(resp) == "quick"
+        assert elapsed < 0.4
+        assert router.hedges == 1
+        assert router.rerouted == 1
+    finally:
+        client.close()
@@ -0,0 +1,39 @@
+# Tests for modules/receipts.py
+import threading
+import time
+
+from modules.receipts import ReceiptHandler
+
+
+def test_store_error_still_echoes_and_rotates(tmp_path, capsys):
+    handler = ReceiptHandler(str(tmp_path / "receipts.log"), max_bytes=1, backups=2,
+                             store_dir=str(tmp_path / "store"))
+
+    def broken_append(*args, **kwargs):
+        raise OSError("disk full")
+
+    handler.store.append = broken_append
+    handler.record("placed", "BUY 10 @ 0.5", side="BUY", qty=10, price=0.5)
+    assert handler.flush()
+    handler.close()
+    out = capsys.readouterr().out
+    assert "Store append failed: disk full" in out
+    assert "[ReceiptHandler] BUY 10 @ 0.5" in out
+    assert handler.written == 1
+    assert (tmp_path / "receipts.log.1").exists()
+
+
+def test_flush_and_close_do_not_hang_on_stuck_writer(tmp_path):
+    handler = ReceiptHandler(str(tmp_path / "receipts.log"), queue_size=1, block_secs=0.05, echo=False)
+    release = threading.Event()
+    handler._write_batch = lambda batch: release.wait()
+    handler.log("first")   # taken by the writer, which then blocks
+    time.sleep(0.1)
+    handler.log("second")  # fills the queue
+    try:
+        t0 = time.monotonic()
+        assert handler.flush(timeout=0.2) is False
+        handler.close(timeout=0.2)
+        assert time.monotonic() - t0 < 1.0
+    finally:
+        release.set()
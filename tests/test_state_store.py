@@ -0,0 +1,54 @@
+# Tests for modules/state_store.py
+from modules.intel import AIStrategy
+from modules.state_store import JournalStateStore
+
+
+def test_journal_torn_tail_keeps_later_commits(tmp_path):
+    path = str(tmp_path / ".state.journal")
+    store = JournalStateStore(path, commit_secs=0)
+    store.put({"a": 1})
+    store.close()
+    with open(path, "a") as f:
+        f.write('{"ts":1,"set":{"a":')  # crash mid-append
+
+    store = JournalStateStore(path, commit_secs=0)
+    assert store.load() == {"a": 1}
+    store.put({"b": 2})
+    store.put({"c": 3})
+    store.close()
+
+    store = JournalStateStore(path, commit_secs=0)
+    assert store.load() == {"a": 1, "b": 2, "c": 3}
+    store.close()
+
+
+def test_journal_skips_torn_line_in_middle(tmp_path):
+    path = str(tmp_path / ".state.journal")
+    with open(path, "w") as f:
+        f.write('{"set":{"a":1}}\n{"set":{"b"\n{"set":{"c":3}}\n')
+    store = JournalStateStore(path, commit_secs=0)
+    assert store.load() == {"a": 1, "c": 3}
+    store.close()
+
+
+class _FailingStore(JournalStateStore):
+    fail = True
+
+    def put(self, changes, ts=None):
+        if self.fail:
+            raise OSError("disk full")
+        super().put(changes, ts)
+
+
+def test_save_state_keeps_dirty_on_failure(tmp_path):
+    store = _FailingStore(str(tmp_path / ".state.journal"), commit_secs=0)
+    ai = AIStrategy(store=store)
+    ai.state["last_run"] = "t1"
+    ai.save_state()
+    assert "last_run" in ai.state.dirty
+
+    store.fail = False
+    ai.save_state()
+    assert not ai.state.dirty
+    assert store.load() == {"last_run": "t1"}
+    store.close()
@@ -0,0 +1,98 @@
+"""
+Benchmark: vectorized fill analytics (modules/trade_analytics.py) on synthetic fills.
+- analyze() over --fills fills (FIFO match, P&L, drawdown, rolling win rate, per hour)
+- a plain-Python FIFO deque on the first --check fills, as the reference
+- log parsing throughput (load_fills) on --parse-fills synthetic log lines
+
+  python tools_bench_analytics.py --fills 10000000 --check 1000000 --parse-fills 1000000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from collections import deque
+
+import numpy as np
+
+from modules.trade_analytics import Fills, analyze, load_fills
+
+
+def synthetic_fills(n: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    ts = 1_762_000_000 + np.cumsum(rng.exponential(2.0, n))
+    side = np.where(rng.random(n) < 0.5, 1, -1).astype(np.int8)
+    qty = np.round(rng.choice([1.0, 2.5, 5.0, 10.0], n) * rng.uniform(0.5, 1.5, n), 6)
+    price = np.round(0.5 * np.exp(np.cumsum(rng.normal(0, 1e-4, n))), 6)
+    return ts, side, qty, price
+
+
+def python_fifo(side, qty, price):
+    """Reference: lot queue, one Python step per fill. Returns realized P&L and trades."""
+    lots, realized, trades = deque(), 0.0, 0
+    for s, q, p in zip(side.tolist(), qty.tolist(), price.tolist()):
+        q = round(q * 1_000_000)
+        while q and lots and lots[0][0] != s:
+            lot_side, lot_q, lot_p = lots[0]
+            take = min(q, lot_q)
+            realized += take / 1_000_000 * (p - lot_p) * lot_side
+            trades += 1
+            q -= take
+            if take == lot_q:
+                lots.popleft()
+            else:
+                lots[0] = (lot_side, lot_q - take, lot_p)
+        if q:
+            lots.append((s, q, p))
+    return realized, trades
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--fills", type=int, default=10_000_000)
+    ap.add_argument("--check", type=int, default=1_000_000, help="fills for the Python FIFO reference")
+    ap.add_argument("--parse-fills", type=int, default=1_000_000, help="log lines for the parse benchmark")
+    args = ap.parse_args()
+
+    ts, side, qty, price = synthetic_fills(args.fills)
+    fills = Fills.from_arrays(ts, side, qty, price)
+    t0 = time.perf_counter()
+    report = analyze(fills)
+    dt = time.perf_counter() - t0
+    print(f"analyze: {args.fills:,} fills in {dt:.2f}s ({args.fills / dt:,.0f} fills/s) -> "
+          f"{report['total_trades']:,} round trips, realized {report['realized_pnl']:.4f}, "
+          f"unrealized {report['unrealized_pnl']:.4f}, max drawdown {report['max_drawdown']:.4f}")
+
+    if args.check:
+        k = min(args.check, args.fills)
+        sub = Fills.from_arrays(ts[:k], side[:k], qty[:k], price[:k])
+        t0 = time.perf_counter()
+        fast = analyze(sub)
+        t_fast = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        realized, trades = python_fifo(side[:k], qty[:k], price[:k])
+        t_slow = time.perf_counter() - t0
+        print(f"python FIFO on {k:,} fills: {t_slow:.2f}s vs analyze {t_fast:.2f}s ({t_slow / t_fast:.1f}x); "
+              f"realized {realized:.6f} vs {fast['realized_pnl']:.6f}, trades {trades:,} vs {fast['total_trades']:,}")
+        assert abs(realized - fast["realized_pnl"]) < 1e-6 * max(1.0, abs(realized))
+
+    if args.parse_fills:
+        k = min(args.parse_fills, args.fills)
+        fd, path = tempfile.mkstemp(prefix="arb_fills_", suffix=".log")
+        with os.fdopen(fd, "w") as f:
+            stamps = np.datetime_as_string((ts[:k] * 1e6).astype("datetime64[us]"), unit="us")
+            for t, s, q, p in zip(stamps, side[:k], qty[:k], price[:k]):
+                f.write(f"[{t}] [Arb][SIM] {'BUY' if s > 0 else 'SELL'} {q:.6f} XRP @ {p:.6f}\n")
+        try:
+            t0 = time.perf_counter()
+            parsed = load_fills(path)
+            dt = time.perf_counter() - t0
+            print(f"load_fills: {len(parsed):,} fills ({os.path.getsize(path) / 1024 / 1024:.0f} MB) in {dt:.2f}s "
+                  f"({len(parsed) / dt:,.0f} fills/s)")
+            assert len(parsed) == k and np.allclose(parsed.price, price[:k])
+        finally:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark: shared-memory market bus (modules/market_bus.py) between processes.
+- one writer process publishing --events BOOK_TOP records (paced in bursts of --burst)
+- --readers reader processes, each timing publish -> receive on CLOCK_MONOTONIC
+- raw publish / poll throughput in one process
+
+  python tools_bench_bus.py --events 100000 --readers 2
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import tempfile
+import time
+
+CHANNEL = "bench"
+
+
+def writer(events: int, burst: int, gap: float, ready):
+    from modules.market_bus import BusWriter
+    w = BusWriter(CHANNEL)
+    ready.wait()
+    for i in range(events):
+        w.book_top("USD", 0.5, 0.51, time.monotonic(), i)
+        if gap and i % burst == burst - 1:
+            time.sleep(gap)
+    w.heartbeat("end")
+    w.close()
+
+
+def reader(results, ready):
+    from modules.market_bus import BusReader, HEARTBEAT
+    r = BusReader(CHANNEL, start="oldest")
+    while not r.is_open():
+        time.sleep(0.001)
+    ready.wait()
+    lat = []
+    while True:
+        for ev in r.wait(5.0):
+            if ev.kind == HEARTBEAT:
+                results.put((lat, r.overruns))
+                return
+            lat.append(time.monotonic() - ev.values[2])
+
+
+def pct(sorted_vals, p):
+    return sorted_vals[min(len(sorted_vals) - 1, int(len(sorted_vals) * p))] * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--events", type=int, default=100_000)
+    ap.add_argument("--readers", type=int, default=2)
+    ap.add_argument("--burst", type=int, default=10, help="events per burst")
+    ap.add_argument("--gap", type=float, default=0.0005, help="secs between bursts (0: flat out)")
+    args = ap.parse_args()
+
+    os.environ["MARKET_BUS_DIR"] = tempfile.mkdtemp(prefix="market_bus_")
+    from modules.market_bus import BusReader, BusWriter, bus_path
+
+    # Create the ring first so readers can map it before the writer starts
+    BusWriter(CHANNEL).close()
+    ready = mp.Barrier(args.readers + 1)
+    results = mp.Queue()
+    readers = [mp.Process(target=reader, args=(results, ready)) for _ in range(args.readers)]
+    for p in readers:
+        p.start()
+    t0 = time.perf_counter()
+    w = mp.Process(target=writer, args=(args.events, args.burst, args.gap, ready))
+    w.start()
+    for i in range(args.readers):
+        lat, overruns = results.get()
+        lat.sort()
+        print(f"reader {i}: {len(lat):,}/{args.events:,} events, {overruns} overruns, latency "
+              f"p50 {pct(lat, 0.5):.0f}us p99 {pct(lat, 0.99):.0f}us max {lat[-1] * 1e6:.0f}us")
+    w.join()
+    for p in readers:
+        p.join()
+    print(f"cross-process run: {time.perf_counter() - t0:.2f}s")
+
+    n = 200_000
+    bw = BusWriter("throughput")
+    t0 = time.perf_counter()
+    for i in range(n):
+        bw.book_top("USD", 0.5, 0.51, 100.0, 200.0)
+    dt = time.perf_counter() - t0
+    br = BusReader("throughput", start="oldest")
+    t0 = time.perf_counter()
+    got = len(br.poll())
+    dr = time.perf_counter() - t0
+    print(f"publish {n / dt:,.0f} events/s; poll {got / dr:,.0f} events/s ({got:,} still in the ring)")
+    bw.close()
+    for name in (CHANNEL, "throughput"):
+        os.remove(bus_path(name))
+    os.rmdir(os.environ["MARKET_BUS_DIR"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark: arbitrage_monitor full reread (parse_trades + summarize) vs. the
+incremental TradeTail on a synthetic arbitrage log.
+Per-poll parsing cost of TradeTail stays flat as the log grows; summary()
+reruns the vectorized analytics over all fills (see tools_bench_analytics.py).
+
+  python tools_bench_monitor.py --size-mb 2048 --append-lines 1000 --polls 5
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "agents"))
+from arbitrage_monitor import TradeTail, parse_trades, summarize  # noqa: E402
+
+
+def _lines(n, rng):
+    out = []
+    for _ in range(n):
+        price = 0.5 + rng.uniform(-0.01, 0.01)
+        r = rng.random()
+        if r < 0.1:
+            out.append(f"[2025-11-03T14:40:17.384784] [Arb][SIM] BUY 5.000000 XRP @ {price:.6f}\n")
+        elif r < 0.2:
+            out.append(f"[2025-11-03T14:40:17.384784] [Arb][SIM] SELL 5.000000 XRP @ {price:.6f}\n")
+        else:
+            out.append(f"[2025-11-03T14:40:17.384784] [Arb] XRPL best bid {price:.6f} USD/XRP, best ask {price:.6f}\n")
+    return "".join(out)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--size-mb", type=int, default=256)
+    ap.add_argument("--append-lines", type=int, default=1000)
+    ap.add_argument("--polls", type=int, default=5)
+    ap.add_argument("--skip-full", action="store_true", help="skip the full-reread baseline")
+    args = ap.parse_args()
+
+    rng = random.Random(7)
+    fd, path = tempfile.mkstemp(prefix="arb_bench_", suffix=".log")
+    block = _lines(10_000, rng)
+    with os.fdopen(fd, "w") as f:
+        while f.tell() < args.size_mb * 1024 * 1024:
+            f.write(block)
+    size_mb = os.path.getsize(path) / 1024 / 1024
+    print(f"synthetic log: {size_mb:.0f} MB at {path}")
+
+    try:
+        tail = TradeTail(path)
+        t0 = time.perf_counter()
+        tail.poll()
+        print(f"initial catch-up:     {time.perf_counter() - t0:8.2f}s ({tail.summary()['total_trades']} trades)")
+
+        for n in range(args.polls):
+            with open(path, "a") as f:
+                f.write(_lines(args.append_lines, rng))
+            t0 = time.perf_counter()
+            lines = tail.poll()
+            tail.summary()
+            print(f"incremental poll {n + 1}:   {(time.perf_counter() - t0) * 1000:8.2f}ms ({lines} new lines)")
+
+        if not args.skip_full:
+            t0 = time.perf_counter()
+            full = summarize(parse_trades(path))
+            print(f"full reread per poll: {time.perf_counter() - t0:8.2f}s ({full['total_trades']} trades)")
+            assert full["total_trades"] == tail.summary()["total_trades"]
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
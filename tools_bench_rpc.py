@@ -0,0 +1,50 @@
+"""
+Benchmark: stock JsonRpcClient (new HTTP client + connection per call) vs. the
+pooled keep-alive client from modules.rpc_pool, against a local mock rippled.
+Reports first-call and p50/p99 latency per request.
+
+  python tools_bench_rpc.py --requests 200 --delay-ms 0
+"""
+
+import argparse
+import statistics
+import time
+
+from xrpl.clients import JsonRpcClient
+from xrpl.models.requests import Ledger
+
+from tools_mock_rippled import start_mock_rippled
+from modules.rpc_pool import PooledJsonRpcClient
+
+
+def _timed(client, n):
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        client.request(Ledger(ledger_index="validated"))
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    return samples
+
+
+def _report(label, samples):
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(f"{label:6s} first={samples[0]:7.2f}ms  p50={statistics.median(samples):7.2f}ms  p99={p99:7.2f}ms")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--requests", type=int, default=200)
+    ap.add_argument("--delay-ms", type=float, default=0.0)
+    args = ap.parse_args()
+
+    server, url = start_mock_rippled(delay_ms=args.delay_ms)
+    _report("cold", _timed(JsonRpcClient(url), args.requests))
+    pooled = PooledJsonRpcClient(url)
+    _report("warm", _timed(pooled, args.requests))
+    pooled.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
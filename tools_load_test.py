@@ -0,0 +1,130 @@
+"""
+Load test: validator agent (/health, /ledger, /account/<address>) against a
+local mock rippled, once per serving mode. Reports requests/sec, p50 and p99.
+
+  python tools_load_test.py --modes dev,threaded,prefork --workers 4 --seconds 5
+  python tools_load_test.py --no-cache --delay-ms 20   # every request reaches the mock
+"""
+
+import argparse
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+
+from tools_mock_rippled import start_mock_rippled
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ACCOUNT = "rHb9CJAWyB4rj91VRWn96DkukG4bwdtyTh"
+PATHS = ["/health", "/ledger", f"/account/{ACCOUNT}"]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for(url: str, timeout: float = 15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.1)
+    raise RuntimeError(f"{url} did not come up")
+
+
+def _hammer(url: str, seconds: float, threads: int, out):
+    latencies, errors = [], [0]
+    deadline = time.monotonic() + seconds
+
+    def run():
+        session = requests.Session()
+        while time.monotonic() < deadline:
+            t0 = time.perf_counter()
+            try:
+                ok = session.get(url, timeout=10).status_code == 200
+            except requests.RequestException:
+                ok = False
+            if ok:
+                latencies.append((time.perf_counter() - t0) * 1000.0)
+            else:
+                errors[0] += 1
+
+    pool = [threading.Thread(target=run) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    out.put((latencies, errors[0]))
+
+
+def load(url: str, seconds: float, procs: int, threads: int):
+    out = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=_hammer, args=(url, seconds, threads, out)) for _ in range(procs)]
+    for w in workers:
+        w.start()
+    latencies, errors = [], 0
+    for _ in workers:
+        lat, err = out.get()
+        latencies += lat
+        errors += err
+    for w in workers:
+        w.join()
+    latencies.sort()
+    n = len(latencies)
+    return {
+        "rps": n / seconds,
+        "p50": latencies[n // 2] if n else float("nan"),
+        "p99": latencies[min(n - 1, int(0.99 * n))] if n else float("nan"),
+        "errors": errors,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--modes", default="dev,threaded,prefork")
+    ap.add_argument("--workers", type=int, default=4, help="SERVE_WORKERS for prefork")
+    ap.add_argument("--seconds", type=float, default=5.0)
+    ap.add_argument("--procs", type=int, default=4, help="load generator processes")
+    ap.add_argument("--threads", type=int, default=8, help="connections per load generator process")
+    ap.add_argument("--delay-ms", type=float, default=5.0, help="mock rippled latency")
+    ap.add_argument("--no-cache", action="store_true", help="disable the ledger cache (XRPL_CACHE_SIZE=0)")
+    args = ap.parse_args()
+
+    mock, rpc_url = start_mock_rippled(0, args.delay_ms)
+    print(f"mock rippled {rpc_url} (+{args.delay_ms:.0f}ms), {args.procs}x{args.threads} connections, "
+          f"{args.seconds:.0f}s per endpoint")
+    print(f"{'mode':10} {'endpoint':46} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    try:
+        for mode in args.modes.split(","):
+            port = _free_port()
+            env = dict(os.environ, XRPL_RPC_URL=rpc_url, VALIDATOR_PORT=str(port), SERVE_MODE=mode,
+                       SERVE_WORKERS=str(args.workers), SERVE_HOST="127.0.0.1")
+            env.pop("XRPL_WS_URL", None)
+            if args.no_cache:
+                env["XRPL_CACHE_SIZE"] = "0"
+            proc = subprocess.Popen([sys.executable, os.path.join(ROOT, "agents", "validator_agent.py")],
+                                    env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                base = f"http://127.0.0.1:{port}"
+                _wait_for(base + "/")
+                for path in PATHS:
+                    r = load(base + path, args.seconds, args.procs, args.threads)
+                    print(f"{mode:10} {path:46} {r['rps']:9.0f} {r['p50']:8.2f} {r['p99']:8.2f} {r['errors']:7d}")
+            finally:
+                proc.terminate()
+                proc.wait(timeout=10)
+    finally:
+        mock.shutdown()
+
+
+if __name__ == "__main__":
+    main()
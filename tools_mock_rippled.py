@@ -0,0 +1,135 @@
+"""
+Local mock rippled JSON-RPC server for benchmarks.
+Answers a handful of methods with synthetic data; an optional per-request
+delay simulates network + server latency.
+
+  python tools_mock_rippled.py --port 51234 --delay-ms 20
+"""
+
+import argparse
+import json
+import multiprocessing
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LEDGER_INDEX = 1_000_000
+
+
+def _book_offers(params):
+    gets, pays = params.get("taker_gets", {}), params.get("taker_pays", {})
+    mid = 0.5
+    offers = []
+    for n in range(int(params.get("limit", 20))):
+        xrp_drops = str(random.randint(1, 500) * 1_000_000)
+        xrp = int(xrp_drops) / 1_000_000.0
+        if gets.get("currency") == "XRP":  # asks: taker gets XRP, pays IOU
+            price = mid * (1.0 + 0.0005 * (n + 1))
+            offers.append({"index": f"A{n}", "TakerGets": xrp_drops,
+                           "TakerPays": {**pays, "value": f"{xrp * price:.6f}"}})
+        else:  # bids: taker gets IOU, pays XRP
+            price = mid * (1.0 - 0.0005 * (n + 1))
+            offers.append({"index": f"B{n}", "TakerPays": xrp_drops,
+                           "TakerGets": {**gets, "value": f"{xrp * price:.6f}"}})
+    return {"offers": offers, "ledger_current_index": LEDGER_INDEX}
+
+
+def _account_info(params):
+    return {"account_data": {"Account": params.get("account"), "Balance": "100000000", "Sequence": 1},
+            "ledger_index": LEDGER_INDEX, "validated": True}
+
+
+def _ledger(params):
+    return {"ledger_index": LEDGER_INDEX, "ledger_hash": "0" * 64, "validated": True,
+            "ledger": {"ledger_index": str(LEDGER_INDEX), "close_time": int(time.time())}}
+
+
+def _account_tx(params):
+    return {"account": params.get("account"), "transactions": [], "limit": params.get("limit", 10)}
+
+
+HANDLERS = {
+    "book_offers": _book_offers,
+    "account_info": _account_info,
+    "ledger": _ledger,
+    "account_tx": _account_tx,
+}
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # many concurrent connects from the benchmarks
+
+
+def make_handler(delay_ms: float = 0.0):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if delay_ms:
+                time.sleep(delay_ms / 1000.0)
+            method = body.get("method")
+            params = (body.get("params") or [{}])[0]
+            fn = HANDLERS.get(method)
+            if fn is None:
+                result = {"status": "error", "error": "unknownCmd"}
+            else:
+                result = dict(fn(params), status="success")
+            raw = json.dumps({"result": result}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def _serve(port: int, delay_ms: float, ready):
+    server = _Server(("127.0.0.1", port), make_handler(delay_ms))
+    ready.put(server.server_address[1])
+    server.serve_forever()
+
+
+class MockRippled:
+    """
+    Handle for a mock server running in its own process, so its request
+    handling does not compete with the benchmarked client for the GIL.
+    """
+
+    def __init__(self, port: int = 0, delay_ms: float = 0.0):
+        ready = multiprocessing.Queue()
+        self.process = multiprocessing.Process(target=_serve, args=(port, delay_ms, ready), daemon=True)
+        self.process.start()
+        self.url = f"http://127.0.0.1:{ready.get(timeout=10)}"
+
+    def shutdown(self):
+        self.process.terminate()
+        self.process.join()
+
+
+def start_mock_rippled(port: int = 0, delay_ms: float = 0.0):
+    """
+    Starts the mock in a child process. Returns (server, url).
+    """
+    server = MockRippled(port, delay_ms)
+    return server, server.url
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--port", type=int, default=51234)
+    ap.add_argument("--delay-ms", type=float, default=0.0)
+    args = ap.parse_args()
+    srv, url = start_mock_rippled(args.port, args.delay_ms)
+    print(f"Mock rippled listening on {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        srv.shutdown()